@@ -0,0 +1,217 @@
+"""Batch transcription of recorded audio files.
+
+Runs every WAV/AIFF/FLAC file in a directory through the same STT path as
+the live assistant, using a bounded pool of worker threads, and streams one
+JSON object per file::
+
+    python -m voice_assistant.batch recordings/ --workers 4 --route
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, TextIO
+
+import speech_recognition as sr
+
+from voice_assistant.config import load_settings
+from voice_assistant.core.audio_encoder import EncoderConfig
+from voice_assistant.core.command_router import CommandRouter
+from voice_assistant.core.providers import GroqProvider
+from voice_assistant.core.recognizer import RecognizerConfig, SpeechRecognizer, TranscriptionError
+from voice_assistant.core.resilience import BreakerConfig
+from voice_assistant.core.vad import VADConfig
+from voice_assistant.utils.logger import LoggingConfig, configure_logging, get_logger
+
+
+AUDIO_SUFFIXES = (".wav", ".aif", ".aiff", ".flac")
+
+
+@dataclass
+class BatchStats:
+	files: int = 0
+	failed: int = 0
+	audio_seconds: float = 0.0
+	wall_seconds: float = 0.0
+
+	def summary(self) -> str:
+		wall = self.wall_seconds or 1e-9
+		return (
+			f"{self.files} files ({self.failed} failed) in {self.wall_seconds:.2f}s: "
+			f"{self.files / wall:.2f} files/s, {self.audio_seconds / wall:.2f} audio-s per wall-s"
+		)
+
+
+def find_audio_files(root: Path, *, recursive: bool) -> Iterator[Path]:
+	pattern = "**/*" if recursive else "*"
+	for path in sorted(root.glob(pattern)):
+		if path.is_file() and path.suffix.lower() in AUDIO_SUFFIXES:
+			yield path
+
+
+def load_audio(path: Path) -> sr.AudioData:
+	with sr.AudioFile(str(path)) as source:
+		return sr.Recognizer().record(source)
+
+
+def create_file_recognizer(logger, settings: Dict[str, Any]) -> SpeechRecognizer:
+	"""A recognizer for recorded audio: the live STT path without a microphone."""
+
+	stt_settings = settings.get("stt", {})
+	vad_settings = settings.get("vad", {})
+	return SpeechRecognizer(
+		logger=logger,
+		config=RecognizerConfig(
+			wake_word=settings["wake_word"],
+			language=settings.get("language", "en-US"),
+			use_groq=stt_settings.get("provider", "groq").lower() == "groq",
+			groq_model=stt_settings.get("model", "whisper-large-v3"),
+			upload=EncoderConfig.from_settings(stt_settings),
+			vad=VADConfig.from_settings(vad_settings) if vad_settings.get("enabled", True) else None,
+			hedge_after=stt_settings.get("hedge_after_seconds", 1.5),
+			breaker=BreakerConfig.from_settings(stt_settings.get("breaker", {})),
+		),
+		provider=GroqProvider.from_settings(logger, settings),
+	)
+
+
+class BatchTranscriber:
+	"""Transcribe files concurrently with retry and exponential backoff."""
+
+	def __init__(
+		self,
+		logger,
+		recognizer: SpeechRecognizer,
+		*,
+		workers: int = 4,
+		retries: int = 3,
+		backoff: float = 0.5,
+		router: Optional[CommandRouter] = None,
+	) -> None:
+		self.logger = logger
+		self.recognizer = recognizer
+		self.workers = max(1, workers)
+		self.retries = max(0, retries)
+		self.backoff = backoff
+		self.router = router
+
+	def run(self, paths: Sequence[Path], out: TextIO) -> BatchStats:
+		"""Write one JSON line per file to ``out`` as results complete."""
+
+		stats = BatchStats()
+		started = time.perf_counter()
+		pending: Set[Future] = set()
+		window = self.workers * 2
+		remaining = iter(paths)
+
+		with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="stt-batch") as pool:
+			while True:
+				for path in remaining:
+					pending.add(pool.submit(self._process, path))
+					if len(pending) >= window:
+						break
+				if not pending:
+					break
+
+				done, pending = wait(pending, return_when=FIRST_COMPLETED)
+				for future in done:
+					result = future.result()
+					stats.files += 1
+					stats.failed += 1 if result.get("error") else 0
+					stats.audio_seconds += result.get("audio_seconds", 0.0)
+					out.write(json.dumps(result, ensure_ascii=False) + "\n")
+					out.flush()
+
+		stats.wall_seconds = time.perf_counter() - started
+		return stats
+
+	def _process(self, path: Path) -> Dict[str, Any]:
+		result: Dict[str, Any] = {"file": str(path)}
+		started = time.perf_counter()
+		try:
+			audio = load_audio(path)
+		except Exception as exc:
+			result["error"] = f"load failed: {exc}"
+			return result
+
+		result["audio_seconds"] = round(len(audio.frame_data) / (audio.sample_rate * audio.sample_width), 3)
+		for attempt in range(1, self.retries + 2):
+			result["attempts"] = attempt
+			try:
+				result["text"] = self.recognizer.transcribe(audio)
+				result.pop("error", None)
+				break
+			except TranscriptionError as exc:
+				result["error"] = str(exc)
+				if attempt > self.retries:
+					break
+				delay = self.backoff * (2 ** (attempt - 1)) * (0.5 + random.random())
+				self.logger.warning("Transcription of %s failed (%s); retrying in %.2fs", path.name, exc, delay)
+				time.sleep(delay)
+		result["latency_ms"] = round((time.perf_counter() - started) * 1000.0, 1)
+
+		if self.router is not None and result.get("text"):
+			route = self.router.route(result["text"])
+			result["intent"] = route.intent
+			result["matched_by"] = route.matched_by
+			result["args"] = list(route.args)
+		return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	parser = argparse.ArgumentParser(description="Transcribe a directory of recorded audio files.")
+	parser.add_argument("directory", type=Path)
+	parser.add_argument("-r", "--recursive", action="store_true", help="Include subdirectories.")
+	parser.add_argument("-w", "--workers", type=int, default=4, help="Concurrent transcription workers.")
+	parser.add_argument("--retries", type=int, default=3, help="Retries per file after a failed transcription.")
+	parser.add_argument("--backoff", type=float, default=0.5, help="Initial retry delay in seconds.")
+	parser.add_argument("--route", action="store_true", help="Route each transcript through CommandRouter.")
+	parser.add_argument("-o", "--output", type=Path, help="Write JSONL here instead of stdout.")
+	args = parser.parse_args(argv)
+
+	settings = load_settings()
+	configure_logging(LoggingConfig.from_settings(settings.get("logging", {})))
+	logger = get_logger("voice_assistant.batch")
+
+	if not args.directory.is_dir():
+		logger.error("Not a directory: %s", args.directory)
+		return 2
+	paths = list(find_audio_files(args.directory, recursive=args.recursive))
+	if not paths:
+		logger.error("No audio files found in %s", args.directory)
+		return 1
+
+	recognizer = create_file_recognizer(logger, settings)
+	transcriber = BatchTranscriber(
+		logger,
+		recognizer,
+		workers=args.workers,
+		retries=args.retries,
+		backoff=args.backoff,
+		router=CommandRouter() if args.route else None,
+	)
+
+	out = args.output.open("w", encoding="utf-8") if args.output else sys.stdout
+	try:
+		stats = transcriber.run(paths, out)
+	finally:
+		if args.output:
+			out.close()
+
+	print(stats.summary(), file=sys.stderr)
+	if transcriber.router is not None:
+		print(f"Routing: {transcriber.router.stats().summary()}", file=sys.stderr)
+	if recognizer.config.use_groq:
+		print(f"STT uploads: {recognizer.encoder.stats().summary()}", file=sys.stderr)
+	return 0 if stats.failed == 0 else 1
+
+
+if __name__ == "__main__":
+	sys.exit(main())
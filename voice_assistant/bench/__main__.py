@@ -0,0 +1,6 @@
+import sys
+
+from voice_assistant.bench.harness import main
+
+
+sys.exit(main())
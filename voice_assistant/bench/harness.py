@@ -0,0 +1,174 @@
+"""End-to-end latency benchmark for the voice pipeline.
+
+Drives :class:`VoiceAssistant` voice turns with a recorded utterance in
+place of the microphone, against a local OpenAI-compatible stand-in server
+and a null TTS sink::
+
+    python -m voice_assistant.bench --turns 20 --stt-latency 250 --llm-latency 300
+
+Each turn replays the recording once; the stand-in returns the configured
+transcripts in rotation (by default one routed command and one LLM
+question). Reports response latency (end of replayed speech to turn
+completion), per-span histograms and throughput.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from voice_assistant.bench.replay import ReplayConfig, ReplaySource
+from voice_assistant.bench.stub_server import StubServer, StubServerConfig
+from voice_assistant.config import load_settings, resolve_path
+from voice_assistant.core.assistant import VoiceAssistant
+from voice_assistant.utils.tracing import Histogram, get_tracer
+
+
+DEFAULT_TRANSCRIPTS = ("ok google what time is it", "ok google why is the sky blue")
+
+
+@dataclass
+class TurnSample:
+	outcome: str
+	wall_ms: float
+	response_ms: float
+
+
+@dataclass
+class BenchReport:
+	turns: int
+	handled: int
+	wall_seconds: float
+	audio_seconds: float
+	response: Dict[str, float]
+	spans: Dict[str, Dict[str, float]]
+	upload_bytes_mean: float
+
+	@property
+	def turns_per_second(self) -> float:
+		return self.turns / self.wall_seconds if self.wall_seconds else 0.0
+
+	def to_dict(self) -> Dict[str, Any]:
+		return {**asdict(self), "turns_per_second": round(self.turns_per_second, 3)}
+
+
+def bench_settings(base: Dict[str, Any], stub_url: str, *, cache: bool, streaming: bool = False) -> Dict[str, Any]:
+	"""Copy ``base`` with Groq pointed at the stand-in and speech output discarded."""
+
+	settings = copy.deepcopy(base)
+	groq = settings.setdefault("groq", {})
+	groq["api_key"] = "bench"
+	groq["base_url"] = stub_url
+	stt = settings.setdefault("stt", {})
+	stt["provider"] = "groq"
+	stt.setdefault("streaming", {})["enabled"] = streaming
+	settings.setdefault("tts", {}).update({"provider": "null", "barge_in": False})
+	settings.setdefault("microphone", {})["persistent"] = True
+	settings.setdefault("wake_word_detector", {})["enabled"] = False
+	settings.setdefault("llm", {}).setdefault("cache", {})["enabled"] = cache
+	settings.setdefault("logging", {})["level"] = "WARNING"
+	return settings
+
+
+def run_turns(assistant: VoiceAssistant, source: ReplaySource, turns: int, *, quiet: bool = True) -> List[TurnSample]:
+	samples: List[TurnSample] = []
+	for _ in range(turns):
+		started = time.perf_counter()
+		source.trigger()
+		output = io.StringIO()
+		with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+			outcome = assistant.run_voice_turn()
+		finished = time.perf_counter()
+		ended = source.utterance_ended or finished
+		samples.append(TurnSample(outcome, (finished - started) * 1000.0, (finished - ended) * 1000.0))
+	return samples
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	parser = argparse.ArgumentParser(description="Benchmark VoiceAssistant turns against local stand-ins.")
+	parser.add_argument("--audio", type=Path, default=Path("input.wav"), help="Utterance to replay each turn.")
+	parser.add_argument("--turns", type=int, default=10)
+	parser.add_argument("--warmup", type=int, default=1, help="Turns run before measuring.")
+	parser.add_argument("--transcript", action="append", help="Transcript returned by the stand-in (repeatable).")
+	parser.add_argument("--stt-latency", type=float, default=250.0, help="Stand-in STT latency (ms).")
+	parser.add_argument("--llm-latency", type=float, default=300.0, help="Stand-in time to first token (ms).")
+	parser.add_argument("--jitter", type=float, default=0.2, help="Latency jitter as a fraction of the mean.")
+	parser.add_argument("--token-interval", type=float, default=15.0, help="Stand-in delay between tokens (ms).")
+	parser.add_argument("--speed", type=float, default=1.0, help="Replay speed relative to real time.")
+	parser.add_argument("--cache", action="store_true", help="Keep the LLM response cache enabled.")
+	parser.add_argument("--streaming", action="store_true", help="Enable streaming (incremental) transcription.")
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("--verbose", action="store_true", help="Show the assistant's console output.")
+	parser.add_argument("-o", "--output", type=Path, help="Also write the report as JSON.")
+	args = parser.parse_args(argv)
+
+	stub_config = StubServerConfig(
+		transcripts=tuple(args.transcript or DEFAULT_TRANSCRIPTS),
+		stt_latency_ms=args.stt_latency,
+		stt_jitter_ms=args.stt_latency * args.jitter,
+		llm_latency_ms=args.llm_latency,
+		llm_jitter_ms=args.llm_latency * args.jitter,
+		token_interval_ms=args.token_interval,
+		seed=args.seed,
+	)
+	tracer = get_tracer()
+	tracer.enabled = True
+
+	with StubServer(stub_config) as stub:
+		settings = bench_settings(load_settings(), stub.url, cache=args.cache, streaming=args.streaming)
+		source = ReplaySource.from_wav(resolve_path(args.audio), ReplayConfig(speed=args.speed, seed=args.seed))
+		with contextlib.redirect_stdout(io.StringIO()) if not args.verbose else contextlib.nullcontext():
+			assistant = VoiceAssistant(settings, audio_source_factory=lambda: source)
+		try:
+			run_turns(assistant, source, args.warmup, quiet=not args.verbose)
+			tracer.reset()
+			stub.counts.upload_bytes.clear()
+
+			started = time.perf_counter()
+			samples = run_turns(assistant, source, args.turns, quiet=not args.verbose)
+			wall = time.perf_counter() - started
+		finally:
+			assistant.recognizer.close()
+			assistant.speaker.close()
+			assistant.provider.close()
+
+	response = Histogram()
+	for sample in samples:
+		if sample.outcome == "handled":
+			response.record(sample.response_ms)
+	uploads = stub.counts.upload_bytes
+	report = BenchReport(
+		turns=len(samples),
+		handled=response.count,
+		wall_seconds=round(wall, 3),
+		audio_seconds=round(len(samples) * source.utterance_seconds, 3),
+		response=response.to_dict(),
+		spans={name: hist.to_dict() for name, hist in sorted(tracer.histograms().items())},
+		upload_bytes_mean=round(sum(uploads) / len(uploads), 1) if uploads else 0.0,
+	)
+
+	print(
+		f"{report.turns} turns ({report.handled} handled) in {report.wall_seconds:.2f}s: "
+		f"{report.turns_per_second:.2f} turns/s, mean upload {report.upload_bytes_mean / 1024:.1f} KiB"
+	)
+	print(
+		"response latency (end of speech -> turn done): "
+		f"p50={response.percentile(0.5):.0f}ms p95={response.percentile(0.95):.0f}ms "
+		f"p99={response.percentile(0.99):.0f}ms max={response.max_ms:.0f}ms"
+	)
+	print(tracer.summary_table())
+	if args.output:
+		args.output.write_text(json.dumps(report.to_dict(), indent=2), encoding="utf-8")
+	return 0 if report.handled == report.turns else 1
+
+
+if __name__ == "__main__":
+	sys.exit(main())
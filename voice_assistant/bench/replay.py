@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import speech_recognition as sr
+
+from voice_assistant.core import dsp
+from voice_assistant.core.wake_word import load_wav
+
+
+@dataclass
+class ReplayConfig:
+	sample_rate: int = 16000
+	chunk: int = 1024
+	# Background noise level; pure digital silence would calibrate the
+	# energy threshold to zero.
+	noise_db: float = -60.0
+	lead_in_seconds: float = 0.3
+	speed: float = 1.0
+	seed: Optional[int] = 0
+
+
+class ReplaySource(sr.AudioSource):
+	"""Stand-in for ``sr.Microphone`` that replays a recorded utterance.
+
+	Streams low-level noise in (scaled) real time and plays the recording
+	once per ``trigger()``, so each benchmark turn hears exactly one
+	utterance. ``utterance_ended`` is the ``perf_counter`` time at which
+	the last sample of the most recent utterance was delivered.
+	"""
+
+	def __init__(self, utterance: np.ndarray, config: Optional[ReplayConfig] = None) -> None:
+		self.config = config or ReplayConfig()
+		self.CHUNK = self.config.chunk
+		self.SAMPLE_RATE = self.config.sample_rate
+		self.SAMPLE_WIDTH = 2
+		self.stream = self
+
+		self._utterance = np.asarray(utterance, dtype=np.float32)
+		self._rng = np.random.default_rng(self.config.seed)
+		self._noise_scale = 10.0 ** (self.config.noise_db / 20.0)
+		self._pending = bytearray()
+		self._lock = threading.Lock()
+		self._rng_lock = threading.Lock()
+		self._next_deadline = 0.0
+		self.utterance_ended: Optional[float] = None
+		self._utterance_end_offset: Optional[int] = None
+
+	@classmethod
+	def from_wav(cls, path: Path, config: Optional[ReplayConfig] = None) -> "ReplaySource":
+		config = config or ReplayConfig()
+		return cls(load_wav(path, config.sample_rate), config)
+
+	@property
+	def utterance_seconds(self) -> float:
+		return len(self._utterance) / self.SAMPLE_RATE
+
+	def trigger(self) -> None:
+		"""Queue one lead-in plus the utterance after the audio already buffered."""
+
+		lead = self._noise(int(self.config.lead_in_seconds * self.SAMPLE_RATE))
+		# Like a real microphone, the background noise continues under the
+		# utterance (digital silence in the recording would read as a drop in
+		# the noise floor).
+		utterance = dsp.float_to_pcm16(self._utterance + self._noise_samples(len(self._utterance))).tobytes()
+		with self._lock:
+			self._pending.extend(lead)
+			self._pending.extend(utterance)
+			self._utterance_end_offset = len(self._pending)
+			self.utterance_ended = None
+
+	def __enter__(self) -> "ReplaySource":
+		self._next_deadline = time.perf_counter()
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback) -> None:
+		return None
+
+	def read(self, size: int) -> bytes:
+		size_bytes = size * self.SAMPLE_WIDTH
+		with self._lock:
+			data = bytes(self._pending[:size_bytes])
+			del self._pending[:size_bytes]
+			if self._utterance_end_offset is not None:
+				self._utterance_end_offset -= len(data)
+				ended = self._utterance_end_offset <= 0
+				if ended:
+					self._utterance_end_offset = None
+			else:
+				ended = False
+		if len(data) < size_bytes:
+			data += self._noise((size_bytes - len(data)) // self.SAMPLE_WIDTH)
+
+		# Pace delivery like a real device (optionally faster).
+		self._next_deadline += size / (self.SAMPLE_RATE * self.config.speed)
+		delay = self._next_deadline - time.perf_counter()
+		if delay > 0:
+			time.sleep(delay)
+		if ended:
+			self.utterance_ended = time.perf_counter()
+		return data
+
+	def close(self) -> None:
+		return None
+
+	def _noise(self, samples: int) -> bytes:
+		return dsp.float_to_pcm16(self._noise_samples(samples)).tobytes()
+
+	def _noise_samples(self, samples: int) -> np.ndarray:
+		with self._rng_lock:
+			return self._rng.normal(0.0, self._noise_scale, samples).astype(np.float32)
@@ -0,0 +1,68 @@
+"""Routing checks for the keyword matcher and the fuzzy intent classifier.
+
+Routes a fixed set of phrasings and compares the intent each one gets with
+the expected one (``None``: answered by the LLM)::
+
+    python -m voice_assistant.bench.routing
+
+Exits with status 1 if any phrase is routed differently, so threshold or
+example changes can be checked before they reach a microphone.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import List, Optional, Tuple
+
+from voice_assistant.config import load_settings
+from voice_assistant.core.assistant import create_router
+
+
+# (utterance, expected intent). Questions that share words with a command
+# ("time", "game", "weather") must still reach the LLM.
+ROUTING_CASES: Tuple[Tuple[str, Optional[str]], ...] = (
+	("what time is it", "time"),
+	("current time please", "time"),
+	("what's the date today", "date"),
+	("which day is today", "date"),
+	("hello there", "greet"),
+	("give me system information", "system_info"),
+	("open file explorer", "open_explorer"),
+	("show me my files", "open_explorer"),
+	("open my documents", "open_explorer"),
+	("search the web for pizza", "search_web"),
+	("play despacito on youtube", "search_youtube"),
+	("play some jazz on spotify", "search_spotify"),
+	("what's the weather like", None),
+	("will it be sunny this weekend", None),
+	("who won the game last night", None),
+	("what's the score of the lakers game", None),
+	("what time does the store close", None),
+	("what time is the train to london", None),
+	("what year did the titanic sink", None),
+	("tell me a joke", None),
+)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	parser = argparse.ArgumentParser(description="Check how known phrasings are routed.")
+	parser.add_argument("-v", "--verbose", action="store_true", help="Print every case, not only mismatches.")
+	args = parser.parse_args(argv)
+
+	router = create_router(load_settings())
+	failures = 0
+	for text, expected in ROUTING_CASES:
+		route = router.route(text)
+		ok = route.intent == expected
+		failures += not ok
+		if args.verbose or not ok:
+			how = route.matched_by or "llm"
+			extra = f" suggestions={list(route.suggestions)}" if route.suggestions else ""
+			print(f"{'ok  ' if ok else 'FAIL'} {text!r:40} -> {route.intent or '-'} ({how}), expected {expected or '-'}{extra}")
+	print(f"{len(ROUTING_CASES) - failures}/{len(ROUTING_CASES)} routed as expected")
+	return 1 if failures else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
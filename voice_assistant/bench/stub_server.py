@@ -0,0 +1,189 @@
+"""Local OpenAI-compatible stand-in for the Groq endpoints the assistant uses.
+
+Serves ``GET /models``, ``POST /audio/transcriptions`` and
+``POST /responses`` (blocking and SSE streaming) under ``/openai/v1`` with
+configurable latency and jitter, so benchmarks exercise the real client,
+connection pool and parsing code without touching the network.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+BASE_PATH = "/openai/v1"
+
+
+@dataclass
+class StubServerConfig:
+	transcripts: Sequence[str] = ("ok google what time is it",)
+	answer: str = (
+		"The sky looks blue because air molecules scatter short blue wavelengths of sunlight "
+		"far more than red ones. That scattered light reaches your eyes from every direction."
+	)
+	stt_latency_ms: float = 250.0
+	stt_jitter_ms: float = 50.0
+	# Time to first token for /responses, then one word every ``token_interval_ms``.
+	llm_latency_ms: float = 300.0
+	llm_jitter_ms: float = 75.0
+	token_interval_ms: float = 15.0
+	seed: Optional[int] = None
+
+
+@dataclass
+class StubRequestCounts:
+	models: int = 0
+	transcriptions: int = 0
+	responses: int = 0
+	upload_bytes: List[int] = field(default_factory=list)
+
+
+class StubServer:
+	"""Threaded HTTP server; ``url`` is usable as ``groq.base_url``."""
+
+	def __init__(self, config: Optional[StubServerConfig] = None, *, host: str = "127.0.0.1", port: int = 0) -> None:
+		self.config = config or StubServerConfig()
+		self.counts = StubRequestCounts()
+		self._random = random.Random(self.config.seed)
+		self._transcripts = itertools.cycle(self.config.transcripts)
+		self._lock = threading.Lock()
+		self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+		self._httpd.daemon_threads = True
+		self._thread: Optional[threading.Thread] = None
+
+	@property
+	def url(self) -> str:
+		host, port = self._httpd.server_address[:2]
+		return f"http://{host}:{port}{BASE_PATH}"
+
+	def start(self) -> "StubServer":
+		self._thread = threading.Thread(target=self._httpd.serve_forever, name="bench-stub", daemon=True)
+		self._thread.start()
+		return self
+
+	def stop(self) -> None:
+		self._httpd.shutdown()
+		self._httpd.server_close()
+		if self._thread is not None:
+			self._thread.join(timeout=2.0)
+		self._thread = None
+
+	def __enter__(self) -> "StubServer":
+		return self.start()
+
+	def __exit__(self, *exc_info) -> None:
+		self.stop()
+
+	def _delay(self, latency_ms: float, jitter_ms: float) -> None:
+		with self._lock:
+			delay = max(0.0, self._random.gauss(latency_ms, jitter_ms)) / 1000.0
+		time.sleep(delay)
+
+	def _next_transcript(self) -> str:
+		with self._lock:
+			return next(self._transcripts)
+
+	def _handler_class(self):
+		server = self
+
+		class Handler(BaseHTTPRequestHandler):
+			protocol_version = "HTTP/1.1"
+
+			def log_message(self, format: str, *args: Any) -> None:
+				return
+
+			def do_GET(self) -> None:
+				if self.path.rstrip("/") == f"{BASE_PATH}/models":
+					server.counts.models += 1
+					self._send_json({"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "bench"}]})
+				else:
+					self._send_json({"error": {"message": f"Unknown path {self.path}"}}, status=404)
+
+			def do_POST(self) -> None:
+				body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+				path = self.path.rstrip("/")
+				if path == f"{BASE_PATH}/audio/transcriptions":
+					server.counts.transcriptions += 1
+					server.counts.upload_bytes.append(len(body))
+					server._delay(server.config.stt_latency_ms, server.config.stt_jitter_ms)
+					self._send_json({"text": server._next_transcript()})
+				elif path == f"{BASE_PATH}/responses":
+					server.counts.responses += 1
+					request = json.loads(body or b"{}")
+					server._delay(server.config.llm_latency_ms, server.config.llm_jitter_ms)
+					if request.get("stream"):
+						self._send_events(_response_events(server.config, request.get("model", "stub")))
+					else:
+						self._send_json(_response_object(server.config.answer, request.get("model", "stub")))
+				else:
+					self._send_json({"error": {"message": f"Unknown path {self.path}"}}, status=404)
+
+			def _send_json(self, payload: Dict[str, Any], status: int = 200) -> None:
+				data = json.dumps(payload).encode("utf-8")
+				self.send_response(status)
+				self.send_header("Content-Type", "application/json")
+				self.send_header("Content-Length", str(len(data)))
+				self.end_headers()
+				self.wfile.write(data)
+
+			def _send_events(self, events: Iterator[Dict[str, Any]]) -> None:
+				self.send_response(200)
+				self.send_header("Content-Type", "text/event-stream")
+				self.send_header("Transfer-Encoding", "chunked")
+				self.end_headers()
+				for event in events:
+					chunk = f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode("utf-8")
+					self.wfile.write(f"{len(chunk):x}\r\n".encode("ascii") + chunk + b"\r\n")
+					self.wfile.flush()
+					if event["type"] == "response.output_text.delta":
+						time.sleep(server.config.token_interval_ms / 1000.0)
+				self.wfile.write(b"0\r\n\r\n")
+
+		return Handler
+
+
+def _response_object(text: str, model: str) -> Dict[str, Any]:
+	return {
+		"id": "resp_bench",
+		"object": "response",
+		"created_at": int(time.time()),
+		"model": model,
+		"status": "completed",
+		"output": [
+			{
+				"id": "msg_bench",
+				"type": "message",
+				"role": "assistant",
+				"status": "completed",
+				"content": [{"type": "output_text", "text": text, "annotations": []}],
+			}
+		],
+		"parallel_tool_calls": False,
+		"tool_choice": "auto",
+		"tools": [],
+	}
+
+
+def _response_events(config: StubServerConfig, model: str) -> Iterator[Dict[str, Any]]:
+	sequence = itertools.count()
+	words = config.answer.split(" ")
+	for index, word in enumerate(words):
+		yield {
+			"type": "response.output_text.delta",
+			"item_id": "msg_bench",
+			"output_index": 0,
+			"content_index": 0,
+			"delta": word if index == 0 else f" {word}",
+			"sequence_number": next(sequence),
+		}
+	yield {
+		"type": "response.completed",
+		"response": _response_object(config.answer, model),
+		"sequence_number": next(sequence),
+	}
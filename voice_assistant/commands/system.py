@@ -5,6 +5,8 @@ import platform
 import subprocess
 from pathlib import Path
 
+EXPLORER_RESPONSE = "Opening file explorer at {path}"
+
 
 def open_file_explorer(path: str | None = None) -> str:
 	target = Path(path).expanduser().resolve() if path else Path.cwd()
@@ -17,7 +19,7 @@ def open_file_explorer(path: str | None = None) -> str:
 			subprocess.Popen(["open", str(target)])
 		else:
 			subprocess.Popen(["xdg-open", str(target)])
-		return f"Opening file explorer at {target}"
+		return EXPLORER_RESPONSE.format(path=target)
 	except Exception:
 		return "Sorry, I couldn't open the file explorer."
 
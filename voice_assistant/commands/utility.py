@@ -2,6 +2,13 @@ from __future__ import annotations
 
 from datetime import datetime
 
+GREETINGS = (
+	"Good morning! How can I help you today?",
+	"Good afternoon! What can I do for you?",
+	"Good evening! How may I assist you?",
+)
+UNKNOWN_COMMAND = "I'm not sure how to do that yet. Try 'help' for options."
+
 
 def get_time() -> str:
 	now = datetime.now()
@@ -16,12 +23,12 @@ def get_date() -> str:
 def greet() -> str:
 	hour = datetime.now().hour
 	if hour < 12:
-		return "Good morning! How can I help you today?"
+		return GREETINGS[0]
 	if hour < 18:
-		return "Good afternoon! What can I do for you?"
-	return "Good evening! How may I assist you?"
+		return GREETINGS[1]
+	return GREETINGS[2]
 
 
 def unknown_command() -> str:
-	return "I'm not sure how to do that yet. Try 'help' for options."
+	return UNKNOWN_COMMAND
 
@@ -3,24 +3,29 @@ from __future__ import annotations
 import urllib.parse
 import webbrowser
 
+WEB_SEARCH_RESPONSE = "Searching the web for '{query}'."
+YOUTUBE_RESPONSE = "Opening YouTube for '{query}'."
+SPOTIFY_RESPONSE = "Searching Spotify for '{query}'."
+RESPONSE_TEMPLATES = (WEB_SEARCH_RESPONSE, YOUTUBE_RESPONSE, SPOTIFY_RESPONSE)
+
 
 def open_web_search(query: str) -> str:
 	encoded = urllib.parse.quote_plus(query)
 	url = f"https://www.google.com/search?q={encoded}"
 	webbrowser.open(url)
-	return f"Searching the web for '{query}'."
+	return WEB_SEARCH_RESPONSE.format(query=query)
 
 
 def open_youtube_search(query: str) -> str:
 	encoded = urllib.parse.quote_plus(query)
 	url = f"https://www.youtube.com/results?search_query={encoded}"
 	webbrowser.open(url)
-	return f"Opening YouTube for '{query}'."
+	return YOUTUBE_RESPONSE.format(query=query)
 
 
 def open_spotify_search(song_query: str) -> str:
 	encoded = urllib.parse.quote_plus(song_query)
 	url = f"https://open.spotify.com/search/{encoded}"
 	webbrowser.open(url)
-	return f"Searching Spotify for '{song_query}'."
+	return SPOTIFY_RESPONSE.format(query=song_query)
 
@@ -20,6 +20,13 @@ def _load_dotenv() -> None:
 	load_dotenv(dotenv_path=env_path if env_path.exists() else None)
 
 
+def resolve_path(value: str | Path) -> Path:
+	"""Resolve a settings path; relative paths are taken from the project root."""
+
+	path = Path(value).expanduser()
+	return path if path.is_absolute() else PROJECT_ROOT / path
+
+
 @lru_cache(maxsize=1)
 def load_settings(config_path: Path | None = None) -> Dict[str, Any]:
 	"""Load YAML settings for the assistant.
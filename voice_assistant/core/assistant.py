@@ -1,17 +1,58 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict
-
-from openai import OpenAI
-
-from voice_assistant.config import load_settings
-from voice_assistant.core.command_router import CommandRouter
-from voice_assistant.core.recognizer import RecognizerConfig, SpeechRecognizer
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Literal, Optional, Tuple
+
+from voice_assistant.config import load_settings, resolve_path
+from voice_assistant.core.command_executor import CommandExecutor, CommandResult, ExecutorConfig
+from voice_assistant.core.command_registry import CommandRegistry
+from voice_assistant.core.command_router import CommandRouter, RouterStats
+from voice_assistant.core.intent_classifier import ClassifierConfig
+from voice_assistant.core.llm import LLMClient, LLMConfig, SentenceChunker
+from voice_assistant.core.llm_cache import CacheConfig, ResponseCache
+from voice_assistant.core.memory import ConversationMemory, MemoryConfig
+from voice_assistant.core.phrase_cache import PhraseCache, PhraseCacheConfig
+from voice_assistant.core.providers import GroqProvider
+from voice_assistant.core.recorder import FlightRecorder, RecorderConfig, TurnRecord, describe_route
 from voice_assistant.core.speaker import Speaker, SpeakerConfig
+from voice_assistant.core.warmup import WarmupConfig, WarmupOrchestrator
 from voice_assistant.ui.cli import CLI
 from voice_assistant.utils.helpers import is_exit_command
-from voice_assistant.utils.logger import get_logger
+from voice_assistant.utils.logger import LoggingConfig, configure_logging, correlation, get_logger
+from voice_assistant.utils.profiling import StartupProfiler
+from voice_assistant.utils.tracing import Turn, get_tracer
+
+if TYPE_CHECKING:
+	from voice_assistant.core.recognizer import SpeechRecognizer
+
+
+TurnOutcome = Literal["handled", "ignored", "quiet", "exit"]
+
+STATS_COMMAND = "/stats"
+
+# Retry delay after consecutive microphone failures (doubles up to the max).
+MIC_RETRY_SECONDS = 0.5
+MIC_RETRY_MAX_SECONDS = 10.0
+
+PLACEHOLDER_ANSWER = "This is a placeholder response. Configure GROQ_API_KEY to enable rich answers."
+LLM_UNAVAILABLE = "I had trouble reaching the AI service. Please try again later."
+LLM_EMPTY_ANSWER = "I couldn't generate a response right now."
+HANDLER_FAILED = "Something went wrong while executing your command."
+COMMAND_PENDING = "On it."
+COMMAND_TIMEOUT = "That command is taking too long, so I stopped waiting for it."
+COMMAND_BUSY = "I'm still busy with earlier commands. Please try again in a moment."
+# Fixed replies worth pre-rendering when the phrase cache is enabled.
+FIXED_RESPONSES = (
+	PLACEHOLDER_ANSWER,
+	LLM_UNAVAILABLE,
+	LLM_EMPTY_ANSWER,
+	HANDLER_FAILED,
+	COMMAND_PENDING,
+	COMMAND_TIMEOUT,
+	COMMAND_BUSY,
+)
+COMMAND_REPLIES = {"pending": COMMAND_PENDING, "timeout": COMMAND_TIMEOUT, "busy": COMMAND_BUSY, "failed": HANDLER_FAILED}
 
 
 @dataclass
@@ -23,13 +64,22 @@ class AssistantConfig:
 	logging_level: str
 	stt_model: str
 	llm_model: str
+	llm_stream: bool = True
 
 
 class VoiceAssistant:
 	"""Main orchestrator for the CLI voice assistant."""
 
-	def __init__(self, settings: Dict[str, Any]) -> None:
+	def __init__(
+		self,
+		settings: Dict[str, Any],
+		profiler: Optional[StartupProfiler] = None,
+		audio_source_factory: Optional[Callable[[], Any]] = None,
+	) -> None:
 		self.settings = settings
+		self.profiler = profiler or StartupProfiler()
+		self._audio_source_factory = audio_source_factory
+		self.tracer = get_tracer()
 
 		self.config = AssistantConfig(
 			wake_word=settings["wake_word"],
@@ -39,25 +89,87 @@ class VoiceAssistant:
 			logging_level=settings.get("logging", {}).get("level", "INFO"),
 			stt_model=settings.get("stt", {}).get("model", "whisper-large-v3"),
 			llm_model=settings.get("llm", {}).get("model", "llama-3.1-8b-instant"),
+			llm_stream=settings.get("llm", {}).get("stream", True),
 		)
 
-		self.logger = get_logger(__name__, level=self.config.logging_level)
+		configure_logging(LoggingConfig.from_settings(settings.get("logging", {})))
+		self.logger = get_logger(__name__)
 		self.cli = CLI()
-		self.router = CommandRouter()
+		commands_settings = settings.get("commands", {})
+		with self.profiler.phase("command router"):
+			self.commands = CommandRegistry.from_settings(commands_settings, self.logger)
+			self.router = create_router(settings, registry=self.commands)
+		self.executor = CommandExecutor(self.logger, ExecutorConfig.from_settings(commands_settings))
 
-		stt_settings = settings.get("stt", {})
-		self.recognizer = SpeechRecognizer(
-			logger=self.logger,
-			config=RecognizerConfig(
-				wake_word=self.config.wake_word,
-				language=self.config.language,
-				use_groq=stt_settings.get("provider", "groq").lower() == "groq",
-				groq_model=self.config.stt_model,
-			),
-		)
+		# One pooled HTTP client for STT, LLM and TTS.
+		with self.profiler.phase("provider"):
+			self.provider = GroqProvider.from_settings(self.logger, settings)
+
+		# Created by the warm-up, or on first use: voice mode pulls in
+		# SpeechRecognition, NumPy and the microphone.
+		self._recognizer: Optional[SpeechRecognizer] = None
 
 		tts_settings = settings.get("tts", {})
-		self.speaker = Speaker(
+		with self.profiler.phase("speaker (engine loads on its worker)"):
+			self.speaker = self._create_speaker(tts_settings)
+
+		self.warmup = WarmupOrchestrator(self.logger)
+		with self.profiler.phase("start background warm-up"):
+			self._start_warmup(WarmupConfig.from_settings(settings.get("warmup", {})))
+
+		if not self.provider.available:
+			self.logger.warning("GROQ_API_KEY not configured; LLM Q&A will be basic.")
+		with self.profiler.phase("LLM client + response cache"):
+			self.llm = self._create_llm()
+		self.memory = self._create_memory()
+		self.recorder = self._create_recorder()
+		self._record: Optional[TurnRecord] = None
+
+	def _start_warmup(self, config: WarmupConfig) -> None:
+		"""Initialize slow components in parallel while the mode prompt is shown.
+
+		Nothing waits for these tasks here; each component is awaited where
+		it is first used.
+		"""
+
+		if not config.enabled:
+			self.provider.warm_up()
+			return
+		if self.speaker.config.enabled and self.speaker.config.provider.lower() != "null":
+			self.warmup.start("tts", self._warm_tts)
+		if self.provider.available and self.provider.config.warmup:
+			self.warmup.start("groq", self.provider.preflight)
+		if self.settings.get("router", {}).get("classifier", {}).get("enabled", True):
+			self.warmup.start("classifier", lambda: self.router.classifier)
+		if self.config.voice_mode_enabled and config.microphone:
+			self.warmup.start("microphone", self._warm_microphone)
+
+	def _warm_tts(self) -> None:
+		self.speaker.wait_ready()
+		# Groq TTS only falls back to the local engine; local TTS needs it.
+		if self.speaker.config.provider.lower() == "local" and not self.speaker.engine_available:
+			raise RuntimeError("no local TTS engine")
+
+	def _warm_microphone(self) -> None:
+		self._recognizer = self._create_recognizer()
+		self._recognizer.prepare()
+
+	def _release_microphone(self) -> None:
+		"""Text mode: close the microphone stream the warm-up may have opened."""
+
+		def close(_done) -> None:
+			if self._recognizer is not None:
+				self._recognizer.close()
+
+		self.warmup.when_done("microphone", close)
+
+	def _show_readiness(self, *, skip: Tuple[str, ...] = ()) -> None:
+		self.cli.show_readiness(
+			(task.name, task.state, task.elapsed_ms, task.error) for task in self.warmup.tasks() if task.name not in skip
+		)
+
+	def _create_speaker(self, tts_settings: Dict[str, Any]) -> Speaker:
+		return Speaker(
 			logger=self.logger,
 			config=SpeakerConfig(
 				enabled=tts_settings.get("enabled", True),
@@ -65,64 +177,338 @@ class VoiceAssistant:
 				rate=int(tts_settings.get("rate", 180)),
 				volume=float(tts_settings.get("volume", 1.0)),
 				voice=tts_settings.get("voice"),
+				queue_size=int(tts_settings.get("queue_size", 32)),
 			),
+			provider=self.provider,
+			phrase_cache=self._create_phrase_cache(tts_settings),
 		)
 
-		groq_settings = settings.get("groq", {})
-		api_key = groq_settings.get("api_key")
-		self.llm_client = None
-		if api_key:
-			self.llm_client = OpenAI(api_key=api_key, base_url="https://api.groq.com/openai/v1")
-		else:
-			self.logger.warning("GROQ_API_KEY not configured; LLM Q&A will be basic.")
+	def _create_phrase_cache(self, tts_settings: Dict[str, Any]) -> Optional[PhraseCache]:
+		cache_settings = tts_settings.get("cache", {})
+		if not cache_settings.get("enabled", True) or tts_settings.get("provider", "local") == "null":
+			return None
+		try:
+			cache = PhraseCache(
+				logger=self.logger,
+				config=PhraseCacheConfig(
+					directory=resolve_path(cache_settings.get("path", ".cache/tts")),
+					max_bytes=int(float(cache_settings.get("max_mb", 64)) * 1024 * 1024),
+					precompute=cache_settings.get("precompute", True),
+				),
+			)
+		except OSError as exc:
+			self.logger.warning("TTS phrase cache unavailable: %s", exc)
+			return None
+		# Only for their reply texts; handlers themselves are loaded by the registry.
+		from voice_assistant.commands import system, utility, web
+
+		cache.register(
+			phrases=(*FIXED_RESPONSES, *utility.GREETINGS, utility.UNKNOWN_COMMAND, *cache_settings.get("phrases", [])),
+			templates=(*web.RESPONSE_TEMPLATES, system.EXPLORER_RESPONSE),
+		)
+		return cache
+
+	def _create_llm(self) -> LLMClient:
+		cache_settings = self.settings.get("llm", {}).get("cache", {})
+		llm_cache = None
+		if cache_settings.get("enabled", True):
+			cache_path = cache_settings.get("path")
+			llm_cache = ResponseCache(
+				logger=self.logger,
+				config=CacheConfig(
+					max_entries=int(cache_settings.get("max_entries", 256)),
+					ttl_seconds=float(cache_settings.get("ttl_seconds", 86400)),
+					path=resolve_path(cache_path) if cache_path else None,
+				),
+			)
+		return LLMClient(
+			logger=self.logger,
+			config=LLMConfig(model=self.config.llm_model, stream=self.config.llm_stream),
+			provider=self.provider,
+			cache=llm_cache,
+		)
+
+	def _create_memory(self) -> Optional[ConversationMemory]:
+		memory_settings = self.settings.get("llm", {}).get("memory", {})
+		if not memory_settings.get("enabled", True):
+			return None
+		config = MemoryConfig.from_settings(memory_settings)
+		summarizer = None
+		if self.llm.available:
+			words = max(20, config.summary_tokens * 3 // 4)
+			summarizer = lambda previous, exchanges: self.llm.summarize(previous, exchanges, max_words=words)
+		return ConversationMemory(self.logger, config, summarizer)
+
+	def _create_recorder(self) -> Optional[FlightRecorder]:
+		recorder_settings = self.settings.get("recorder", {})
+		if not recorder_settings.get("enabled", False):
+			return None
+		try:
+			recorder = FlightRecorder(
+				logger=self.logger,
+				config=RecorderConfig.from_settings(recorder_settings),
+				meta={
+					"wake_word": self.config.wake_word,
+					"stt_provider": self.settings.get("stt", {}).get("provider", "groq"),
+					"stt_model": self.config.stt_model,
+					"llm_model": self.config.llm_model,
+				},
+			)
+		except OSError as exc:
+			self.logger.warning("Flight recorder unavailable: %s", exc)
+			return None
+		# Recorded stage timings are the turn's tracer spans.
+		self.tracer.enabled = True
+		return recorder
+
+	def _begin_record(self, mode: str, turn_id: str) -> None:
+		if self.recorder is not None:
+			self._record = self.recorder.begin(mode, turn_id)
+
+	def _note(self, **fields: Any) -> None:
+		"""Add ``fields`` to the turn being recorded (no-op unless recording)."""
+
+		if self._record is not None:
+			for name, value in fields.items():
+				setattr(self._record, name, value)
+
+	def _commit_record(self, turn: Turn, outcome: TurnOutcome) -> None:
+		record, self._record = self._record, None
+		if record is None or outcome == "quiet":
+			return
+		record.outcome = outcome
+		record.turn_ms = round((time.perf_counter() - turn.started) * 1000.0, 3)
+		record.spans = {name: round(ms, 3) for name, ms in turn.breakdown().items()}
+		if record.mode == "voice" and self._recognizer is not None:
+			audio = self._recognizer.last_audio
+			if audio is not None:
+				record.audio = (audio.frame_data, audio.sample_rate, audio.sample_width)
+			record.heard = self._recognizer.last_transcript
+			if self._recognizer.last_endpoint is not None:
+				record.endpoint = asdict(self._recognizer.last_endpoint)
+		self.recorder.commit(record)
+
+	def _remember(self, user: str, assistant: str) -> None:
+		if self.memory is not None:
+			self.memory.add_turn(user, assistant)
+
+	def _llm_context(self) -> Dict[str, Any]:
+		if self.memory is None:
+			return {}
+		messages, key = self.memory.context()
+		return {"context": messages, "context_key": key}
+
+	@property
+	def recognizer(self) -> SpeechRecognizer:
+		if self._recognizer is None:
+			# The warm-up may be creating it (and opening the microphone) right now.
+			self.warmup.wait("microphone")
+			if self._recognizer is None:
+				self._recognizer = self._create_recognizer()
+		return self._recognizer
+
+	def _create_recognizer(self) -> SpeechRecognizer:
+		# Deferred: pulls in speech_recognition and numpy, which text mode never needs.
+		from voice_assistant.core.audio_encoder import EncoderConfig
+		from voice_assistant.core.audio_stream import CaptureConfig
+		from voice_assistant.core.endpointer import EndpointerConfig
+		from voice_assistant.core.recognizer import RecognizerConfig, SpeechRecognizer
+		from voice_assistant.core.resilience import BreakerConfig
+		from voice_assistant.core.streaming import StreamingConfig
+		from voice_assistant.core.vad import VADConfig
+		from voice_assistant.core.wake_word import WakeWordConfig
+
+		settings = self.settings
+		stt_settings = settings.get("stt", {})
+		vad_settings = settings.get("vad", {})
+		endpoint_settings = settings.get("endpointing", {})
+		streaming_settings = stt_settings.get("streaming", {})
+		mic_settings = settings.get("microphone", {})
+		capture_config = None
+		if mic_settings.get("persistent", True):
+			capture_config = CaptureConfig(
+				buffer_seconds=float(mic_settings.get("buffer_seconds", 10.0)),
+				preroll_seconds=float(mic_settings.get("preroll_seconds", 0.5)),
+				calibration_seconds=float(mic_settings.get("calibration_seconds", 0.5)),
+				recalibrate_interval=float(mic_settings.get("recalibrate_interval", 30.0)),
+				drift_ratio=float(mic_settings.get("drift_ratio", 1.5)),
+				barge_in_ratio=float(mic_settings.get("barge_in_ratio", 3.0)),
+				barge_in_seconds=float(mic_settings.get("barge_in_seconds", 0.3)),
+			)
+		wake_settings = settings.get("wake_word_detector", {})
+		wake_config = None
+		if wake_settings.get("enabled", False):
+			threshold = wake_settings.get("threshold")
+			wake_config = WakeWordConfig(
+				templates=tuple(wake_settings.get("templates") or ()),
+				threshold=float(threshold) if threshold is not None else None,
+				speech_db=float(wake_settings.get("speech_db", -45.0)),
+			)
+		recognizer = SpeechRecognizer(
+			logger=self.logger,
+			config=RecognizerConfig(
+				wake_word=self.config.wake_word,
+				language=self.config.language,
+				use_groq=stt_settings.get("provider", "groq").lower() == "groq",
+				groq_model=self.config.stt_model,
+				capture=capture_config,
+				wake_detector=wake_config,
+				wake_word_tolerance=float(settings.get("wake_word_tolerance", 0.8)),
+				upload=EncoderConfig.from_settings(stt_settings),
+				vad=VADConfig.from_settings(vad_settings) if vad_settings.get("enabled", True) else None,
+				hedge_after=stt_settings.get("hedge_after_seconds", 1.5),
+				breaker=BreakerConfig.from_settings(stt_settings.get("breaker", {})),
+				streaming=StreamingConfig.from_settings(streaming_settings) if streaming_settings.get("enabled") else None,
+				endpointer=(
+					EndpointerConfig.from_settings(endpoint_settings) if endpoint_settings.get("enabled", True) else None
+				),
+			),
+			provider=self.provider,
+			source_factory=self._audio_source_factory,
+		)
+		if recognizer.endpointer is not None:
+			recognizer.endpointer.is_complete = self._is_complete_command
+		if settings.get("tts", {}).get("barge_in", False):
+			recognizer.enable_barge_in(self.speaker.interrupt, is_active=lambda: self.speaker.is_speaking)
+		return recognizer
 
 	def run(self) -> None:
 		self.cli.render_banner()
 		self.cli.show_message("assistant", "Type 'exit' or 'quit' at any time to stop.")
 
-		mode = self.cli.prompt_mode(
-			voice_enabled=self.config.voice_mode_enabled,
-			text_enabled=self.config.text_mode_enabled,
-		)
+		with self.profiler.waiting():
+			mode = self.cli.prompt_mode(
+				voice_enabled=self.config.voice_mode_enabled,
+				text_enabled=self.config.text_mode_enabled,
+			)
 
-		if mode == "voice":
-			self._run_voice_loop()
-		else:
-			self._run_text_loop()
+		try:
+			if mode == "voice":
+				try:
+					self._run_voice_loop()
+				finally:
+					if self._recognizer is not None:
+						self.logger.info("STT uploads: %s", self._recognizer.encoder.stats().summary())
+						self._recognizer.close()
+			else:
+				self._release_microphone()
+				self._run_text_loop()
+		finally:
+			self.executor.close()
+			if self.recorder is not None:
+				self.recorder.close()
+			self.speaker.close()
+			if self.speaker.phrase_cache is not None:
+				self.logger.info("TTS phrase cache: %s", self.speaker.phrase_cache.stats().summary())
+			if self.memory is not None:
+				self.memory.close()
+			if self.llm.cache is not None:
+				self.logger.info("LLM cache: %s", self.llm.cache.stats().summary())
+				self.llm.cache.close()
+			self.logger.info("Routing: %s", self.router.stats().summary())
+			self.logger.info("Commands: %s", self.executor.stats().summary())
+			if self.provider.latency():
+				self.logger.info("Groq latency: %s", self.provider.latency_summary())
+			self.provider.close()
 
 	def _run_voice_loop(self) -> None:
+		with self.profiler.phase("recognizer + microphone"):
+			self.recognizer
+		self.profiler.report()
+		self._show_readiness()
 		self.cli.show_status(f"Voice mode: say '{self.config.wake_word}' to wake me up.")
 
+		announce = True
 		while True:
-			self.cli.show_status("Listening for wake word...")
-			wake_text = self.recognizer.listen_once()
+			if announce:
+				self.cli.show_status("Listening for wake word...")
+			outcome = self.run_voice_turn()
+			if outcome == "exit":
+				break
+			announce = outcome != "quiet"
+			failures = self.recognizer.microphone_failures
+			if failures:
+				time.sleep(min(MIC_RETRY_MAX_SECONDS, MIC_RETRY_SECONDS * 2 ** (failures - 1)))
+
+	def run_voice_turn(self) -> TurnOutcome:
+		"""Wait for the wake word, then capture and handle one command (traced)."""
+
+		with correlation() as turn_id, self.tracer.turn() as turn:
+			self._begin_record("voice", turn_id)
+			outcome = self._voice_turn()
+			if outcome != "handled":
+				turn.discard()
+		self._commit_record(turn, outcome)
+		return outcome
+
+	def _voice_turn(self) -> TurnOutcome:
+		echo = True
+		if self.recognizer.has_local_wake_word:
+			detection = self.recognizer.listen_for_wake_word()
+			if detection is None or not detection.detected:
+				return "quiet"
+			command_text = self.recognizer.command_after_wake(detection)
+		else:
+			wake_text = self._listen()
 			if not wake_text:
 				self.cli.show_error("I didn't catch that. Let's try again.")
-				continue
+				return "ignored"
 
 			self.cli.show_message("user", wake_text)
 			if is_exit_command(wake_text):
 				self.cli.show_message("assistant", "Goodbye!")
-				break
+				return "exit"
 
-			if not self.recognizer.is_wake_word(wake_text):
+			command_text = self.recognizer.split_wake_word(wake_text)
+			if command_text is None:
 				self.cli.show_status("That wasn't the wake word. Say it again or say 'exit' to quit.")
-				continue
+				return "ignored"
+			echo = not command_text
 
+		if not command_text:
 			self.cli.show_status("Wake word detected. Listening for your command...")
-			command_text = self.recognizer.listen_once()
+			echo = True
+			command_text = self._listen()
 			if not command_text:
 				self.cli.show_error("I couldn't hear your command.")
-				continue
+				return "ignored"
 
+		if echo:
 			self.cli.show_message("user", command_text)
-			if is_exit_command(command_text):
-				self.cli.show_message("assistant", "Goodbye!")
-				break
+		if is_exit_command(command_text):
+			self.cli.show_message("assistant", "Goodbye!")
+			return "exit"
+
+		self._handle_command(command_text)
+		return "handled"
 
-			self._handle_command(command_text)
+	def _listen(self) -> Optional[str]:
+		try:
+			return self.recognizer.listen_once(on_partial=self._on_partial)
+		finally:
+			self.cli.clear_partial()
+
+	def _on_partial(self, text: str) -> None:
+		"""Show a streaming transcript and let the router resolve it early."""
+
+		remainder = self.recognizer.split_wake_word(text)
+		command = text if remainder is None else remainder
+		if not command:
+			self.cli.show_partial(text)
+			return
+		route = self.router.preresolve(command)
+		self.cli.show_partial(f"{text}  → {route.intent}" if route.intent else text)
+
+	def _is_complete_command(self, partial: str) -> bool:
+		"""Whether a streaming transcript already names a whole command (endpointing)."""
+
+		remainder = self.recognizer.split_wake_word(partial)
+		command = partial if remainder is None else remainder
+		return bool(command) and self.router.completes(command)
 
 	def _run_text_loop(self) -> None:
+		self.profiler.report()
+		self._show_readiness(skip=("microphone",))
 		self.cli.show_status("Text mode: type your commands. Type 'exit' to quit.")
 		while True:
 			text = self.cli.prompt_text_command()
@@ -131,10 +517,31 @@ class VoiceAssistant:
 			if is_exit_command(text):
 				self.cli.show_message("assistant", "Goodbye!")
 				break
-			self._handle_command(text)
+			if text.lower() == STATS_COMMAND:
+				self._show_stats()
+				continue
+			with correlation() as turn_id, self.tracer.turn() as turn:
+				self._begin_record("text", turn_id)
+				self._handle_command(text)
+			self._commit_record(turn, "handled")
+
+	def _show_stats(self) -> None:
+		self.cli.show_status(f"Routing: {self.router.stats().summary()}")
+		if not self.tracer.enabled:
+			self.cli.show_status("Latency tracing is off; start with --trace to collect stats.")
+			return
+		self.cli.show_status("Latency per span:")
+		self.cli.show_block(self.tracer.summary_table())
+		if self.tracer.last_turn is not None:
+			breakdown = ", ".join(f"{name} {ms:.0f}ms" for name, ms in self.tracer.last_turn.breakdown().items())
+			self.cli.show_status(f"Last turn: {breakdown or 'no spans'}")
 
 	def _handle_command(self, text: str) -> None:
-		route = self.router.route(text)
+		# A new command supersedes whatever is still being said about the last one.
+		self.speaker.interrupt()
+		with self.tracer.span("route"):
+			route = self.router.route(text)
+		self._note(command=text, route=describe_route(route))
 
 		if route.is_exit:
 			self.cli.show_message("assistant", "Goodbye!")
@@ -147,42 +554,118 @@ class VoiceAssistant:
 					"assistant",
 					f"I didn't recognize that command. Did you mean: {suggestions_str}? I'll also try to answer it as a question.",
 				)
-			response = self._answer_with_llm(text)
+			if self.llm.available and self.llm.config.stream:
+				with self.tracer.span("llm"):
+					response = self._stream_llm_answer(text)
+				self._note(response=response)
+				return
+			with self.tracer.span("llm"):
+				response = self._answer_with_llm(text)
 		else:
-			try:
-				response = route.handler(*route.args, **route.kwargs)
-			except Exception as exc:
-				self.logger.exception("Command handler failed: %s", exc)
-				response = "Something went wrong while executing your command."
+			spec = self.commands.spec(route.intent)
+			with self.tracer.span("handler"):
+				result = self.executor.run(
+					route.intent,
+					route.handler,
+					route.args,
+					route.kwargs,
+					timeout=spec.timeout if spec is not None else None,
+					on_done=lambda late: self._finish_command(text, late),
+				)
+			response = self._command_reply(text, result)
 
+		self._note(response=response)
+		self.cli.show_message("assistant", response)
+		self.speaker.speak(response)
+
+	def _command_reply(self, text: str, result: CommandResult) -> str:
+		if result.status == "ok":
+			self._remember(text, result.response)
+			return result.response
+		return COMMAND_REPLIES[result.status]
+
+	def _finish_command(self, text: str, result: CommandResult) -> None:
+		"""Report a command that was acknowledged before it finished (worker thread)."""
+
+		response = self._command_reply(text, result)
 		self.cli.show_message("assistant", response)
 		self.speaker.speak(response)
 
 	def _answer_with_llm(self, prompt: str) -> str:
-		if not self.llm_client:
-			return "This is a placeholder response. Configure GROQ_API_KEY to enable rich answers."
+		if not self.llm.available:
+			return PLACEHOLDER_ANSWER
 
 		try:
-			response = self.llm_client.responses.create(
-				model=self.config.llm_model,
-				input=[
-					{
-						"role": "system",
-						"content": "You are a concise, helpful voice assistant.",
-					},
-					{"role": "user", "content": prompt},
-				],
-			)
-			text = getattr(response, "output_text", None)
-			if not text and hasattr(response, "output"):
-				text = str(response.output)
-			return text.strip() if text else "I couldn't generate a response right now."
+			answer = self.llm.answer(prompt, **self._llm_context())
 		except Exception as exc:
 			self.logger.error("Groq LLM call failed: %s", exc)
-			return "I had trouble reaching the AI service. Please try again later."
-
-
-def create_assistant() -> VoiceAssistant:
-	settings = load_settings()
-	return VoiceAssistant(settings=settings)
+			return LLM_UNAVAILABLE
+		if not answer:
+			return LLM_EMPTY_ANSWER
+		self._remember(prompt, answer)
+		return answer
+
+	def _stream_llm_answer(self, prompt: str) -> str:
+		"""Print and speak an LLM answer as it is generated.
+
+		Tokens are echoed to the CLI as they arrive and cut into sentences;
+		each complete sentence is queued on the speaker, which plays it while
+		the rest of the answer is still streaming. Conversation memory is
+		sent as context so that follow-up questions work.
+		"""
+
+		parts = []
+		chunker = SentenceChunker()
+		started = time.perf_counter()
+		self.cli.begin_stream("assistant")
+		try:
+			for delta in self.llm.stream(prompt, **self._llm_context()):
+				if not parts:
+					self.tracer.record("llm.first_token", (time.perf_counter() - started) * 1000.0)
+				parts.append(delta)
+				self.cli.stream_text(delta)
+				for sentence in chunker.feed(delta):
+					self.speaker.speak(sentence)
+			tail = chunker.flush()
+			if tail:
+				self.speaker.speak(tail)
+			if parts:
+				self._remember(prompt, "".join(parts).strip())
+			else:
+				fallback = LLM_EMPTY_ANSWER
+				parts.append(fallback)
+				self.cli.stream_text(fallback)
+				self.speaker.speak(fallback)
+		except Exception as exc:
+			self.logger.error("Groq LLM stream failed: %s", exc)
+			if not parts:
+				fallback = LLM_UNAVAILABLE
+				parts.append(fallback)
+				self.cli.stream_text(fallback)
+				self.speaker.speak(fallback)
+		finally:
+			self.cli.end_stream()
+		return "".join(parts).strip()
+
+
+def create_router(
+	settings: Dict[str, Any],
+	stats: Optional[RouterStats] = None,
+	registry: Optional[CommandRegistry] = None,
+) -> CommandRouter:
+	classifier_settings = settings.get("router", {}).get("classifier", {})
+	return CommandRouter(
+		classifier_config=ClassifierConfig.from_settings(classifier_settings),
+		use_classifier=classifier_settings.get("enabled", True),
+		stats=stats,
+		registry=registry if registry is not None else CommandRegistry.from_settings(settings.get("commands", {})),
+	)
+
+
+def create_assistant(profiler: Optional[StartupProfiler] = None) -> VoiceAssistant:
+	profiler = profiler or StartupProfiler()
+	with profiler.phase("load settings"):
+		settings = load_settings()
+	with profiler.phase("construct assistant"):
+		return VoiceAssistant(settings=settings, profiler=profiler)
 
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import io
+import threading
+import time
+import wave
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from voice_assistant.core.dsp import float_to_pcm16, pcm_to_float, resample
+
+if TYPE_CHECKING:
+	import speech_recognition as sr
+
+
+UPLOAD_FORMATS = ("flac", "opus", "wav")
+
+
+@dataclass
+class EncoderConfig:
+	format: str = "flac"
+	sample_rate: int = 16000
+
+	@classmethod
+	def from_settings(cls, stt_settings: Dict[str, Any]) -> "EncoderConfig":
+		return cls(
+			format=str(stt_settings.get("upload_format", "flac")).lower(),
+			sample_rate=int(stt_settings.get("upload_sample_rate", 16000)),
+		)
+
+
+@dataclass
+class EncodedAudio:
+	payload: bytes
+	filename: str
+	format: str
+	raw_bytes: int
+	duration_seconds: float
+	encode_ms: float
+
+	def as_upload(self) -> Tuple[str, bytes]:
+		"""``(filename, bytes)`` tuple accepted as ``file=`` by the OpenAI client."""
+
+		return self.filename, self.payload
+
+
+@dataclass
+class EncoderStats:
+	uploads: int = 0
+	raw_bytes: int = 0
+	bytes_sent: int = 0
+	encode_ms: float = 0.0
+
+	@property
+	def ratio(self) -> float:
+		return self.bytes_sent / self.raw_bytes if self.raw_bytes else 0.0
+
+	def summary(self) -> str:
+		mean_ms = self.encode_ms / self.uploads if self.uploads else 0.0
+		return (
+			f"uploads={self.uploads} sent={self.bytes_sent / 1024:.1f}KiB "
+			f"raw={self.raw_bytes / 1024:.1f}KiB ratio={self.ratio:.0%} encode_mean={mean_ms:.1f}ms"
+		)
+
+
+class UploadEncoder:
+	"""Resample captured mono audio to 16 kHz and compress it for STT upload.
+
+	The PCM frame buffer is read through a ``memoryview``/``np.frombuffer``
+	view, so the only copies are the float conversion and the encoded
+	output. FLAC uses ``soundfile`` when installed and otherwise the
+	encoder bundled with SpeechRecognition; Opus requires ``soundfile`` and
+	falls back to FLAC. WAV is the last resort.
+	"""
+
+	def __init__(self, logger, config: Optional[EncoderConfig] = None) -> None:
+		self.logger = logger
+		self.config = config or EncoderConfig()
+		if self.config.format not in UPLOAD_FORMATS:
+			self.logger.warning("Unknown upload format '%s'; using FLAC.", self.config.format)
+			self.config.format = "flac"
+		self._stats = EncoderStats()
+		self._lock = threading.Lock()
+
+	def stats(self) -> EncoderStats:
+		with self._lock:
+			return EncoderStats(**vars(self._stats))
+
+	def encode(self, audio: "sr.AudioData") -> EncodedAudio:
+		started = time.perf_counter()
+		frames = memoryview(audio.frame_data)
+		samples = pcm_to_float(frames, audio.sample_width)
+		samples = resample(samples, audio.sample_rate, self.config.sample_rate)
+		pcm = float_to_pcm16(samples)
+
+		fmt = self.config.format
+		payload: Optional[bytes] = None
+		if fmt == "opus":
+			payload = self._encode_soundfile(pcm, "OGG", "OPUS")
+			if payload is None:
+				fmt = "flac"
+		if fmt == "flac":
+			payload = self._encode_soundfile(pcm, "FLAC", "PCM_16") or self._encode_flac_binary(pcm)
+			if payload is None:
+				fmt = "wav"
+		if payload is None:
+			payload = self._encode_wav(pcm)
+
+		encoded = EncodedAudio(
+			payload=payload,
+			filename=f"audio.{'ogg' if fmt == 'opus' else fmt}",
+			format=fmt,
+			raw_bytes=frames.nbytes,
+			duration_seconds=len(pcm) / self.config.sample_rate,
+			encode_ms=(time.perf_counter() - started) * 1000.0,
+		)
+		with self._lock:
+			self._stats.uploads += 1
+			self._stats.raw_bytes += encoded.raw_bytes
+			self._stats.bytes_sent += len(payload)
+			self._stats.encode_ms += encoded.encode_ms
+		self.logger.debug(
+			"Encoded %.2fs of audio as %s: %d -> %d bytes in %.1fms",
+			encoded.duration_seconds,
+			fmt,
+			encoded.raw_bytes,
+			len(payload),
+			encoded.encode_ms,
+		)
+		return encoded
+
+	def _encode_soundfile(self, pcm: np.ndarray, container: str, subtype: str) -> Optional[bytes]:
+		try:
+			import soundfile
+		except ImportError:
+			return None
+		try:
+			buffer = io.BytesIO()
+			soundfile.write(buffer, pcm, self.config.sample_rate, format=container, subtype=subtype)
+			return buffer.getvalue()
+		except Exception as exc:
+			self.logger.warning("soundfile could not encode %s/%s: %s", container, subtype, exc)
+			return None
+
+	def _encode_flac_binary(self, pcm: np.ndarray) -> Optional[bytes]:
+		import speech_recognition as sr
+
+		try:
+			return sr.AudioData(pcm.tobytes(), self.config.sample_rate, 2).get_flac_data()
+		except Exception as exc:
+			self.logger.warning("FLAC encoding failed, uploading WAV: %s", exc)
+			return None
+
+	def _encode_wav(self, pcm: np.ndarray) -> bytes:
+		buffer = io.BytesIO()
+		with wave.open(buffer, "wb") as writer:
+			writer.setnchannels(1)
+			writer.setsampwidth(2)
+			writer.setframerate(self.config.sample_rate)
+			writer.writeframes(memoryview(pcm).cast("B"))
+		return buffer.getvalue()
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import collections
+import statistics
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Optional, Tuple
+
+import speech_recognition as sr
+
+from voice_assistant.core import dsp
+
+
+@dataclass
+class CaptureConfig:
+	buffer_seconds: float = 10.0
+	preroll_seconds: float = 0.5
+	calibration_seconds: float = 0.5
+	recalibrate_interval: float = 30.0
+	drift_ratio: float = 1.5
+	barge_in_ratio: float = 3.0
+	barge_in_seconds: float = 0.3
+
+
+class BufferedSource(sr.AudioSource):
+	"""``AudioSource`` that reads from a :class:`CaptureStream` ring buffer.
+
+	It exposes the same attributes as ``sr.Microphone`` so it can be passed
+	straight to ``Recognizer.listen``. Entering/exiting is free because the
+	underlying device stays open.
+	"""
+
+	def __init__(self, capture: "CaptureStream", start_seq: int) -> None:
+		self._capture = capture
+		self._cursor = start_seq
+		self.CHUNK = capture.chunk
+		self.SAMPLE_RATE = capture.sample_rate
+		self.SAMPLE_WIDTH = capture.sample_width
+		self.stream = self
+
+	def __enter__(self) -> "BufferedSource":
+		self._capture._attach_reader()
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback) -> None:
+		self._capture._detach_reader()
+
+	def read(self, size: int) -> bytes:
+		chunk, self._cursor = self._capture._read_chunk(self._cursor)
+		return chunk
+
+
+class TappedSource(sr.AudioSource):
+	"""Pass-through ``AudioSource`` that hands every chunk read to ``tap``."""
+
+	def __init__(self, inner: sr.AudioSource, tap: Callable[[bytes], None]) -> None:
+		self._inner = inner
+		self._tap = tap
+		self.CHUNK = inner.CHUNK
+		self.SAMPLE_RATE = inner.SAMPLE_RATE
+		self.SAMPLE_WIDTH = inner.SAMPLE_WIDTH
+		self.stream = self
+
+	def __enter__(self) -> "TappedSource":
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback) -> None:
+		return None
+
+	def read(self, size: int) -> bytes:
+		data = self._inner.stream.read(size)
+		self._tap(data)
+		return data
+
+
+class CaptureStream:
+	"""Long-lived microphone capture feeding a ring buffer.
+
+	A background thread keeps the device open and appends fixed-size chunks
+	to a bounded ring buffer. While no reader is attached, chunk energies are
+	used to keep ``recognizer.energy_threshold`` calibrated: on a schedule
+	and whenever the ambient level drifts by more than ``drift_ratio``.
+
+	An optional barge-in callback fires when sustained loud speech is heard
+	while ``is_active`` reports that the assistant is talking.
+	"""
+
+	def __init__(
+		self,
+		logger,
+		recognizer: sr.Recognizer,
+		config: CaptureConfig,
+		source_factory: Optional[Callable[[], Any]] = None,
+	) -> None:
+		self.logger = logger
+		self.config = config
+		self._recognizer = recognizer
+		self._source_factory = source_factory or sr.Microphone
+
+		self.chunk = 0
+		self.sample_rate = 0
+		self.sample_width = 0
+
+		self._cond = threading.Condition()
+		self._ring: Deque[bytes] = collections.deque()
+		self._next_seq = 0
+		self._readers = 0
+		self._ambient: Deque[float] = collections.deque()
+		self._last_calibration = 0.0
+
+		self._thread: Optional[threading.Thread] = None
+		self._stop = threading.Event()
+		self._opened = threading.Event()
+		self._calibrated = threading.Event()
+		self._error: Optional[BaseException] = None
+		self._closed = False
+
+		self._barge_in: Optional[Callable[[], None]] = None
+		self._barge_in_active: Callable[[], bool] = lambda: False
+		self._barge_in_chunks = 0
+
+	@property
+	def is_running(self) -> bool:
+		return self._thread is not None and self._thread.is_alive()
+
+	def start(self) -> None:
+		if self.is_running:
+			return
+		self._stop.clear()
+		self._opened.clear()
+		self._calibrated.clear()
+		self._error = None
+		self._closed = False
+		self._thread = threading.Thread(target=self._run, name="mic-capture", daemon=True)
+		self._thread.start()
+
+	def stop(self) -> None:
+		self._stop.set()
+		with self._cond:
+			self._cond.notify_all()
+		if self._thread is not None:
+			self._thread.join(timeout=2.0)
+		self._thread = None
+
+	def set_barge_in(self, callback: Callable[[], None], *, is_active: Callable[[], bool]) -> None:
+		self._barge_in = callback
+		self._barge_in_active = is_active
+
+	def wait_ready(self, *, wait: float = 2.0) -> None:
+		"""Start capturing; wait for the device to open and the first calibration."""
+
+		self.start()
+		if not self._opened.wait(timeout=wait) or self._error is not None:
+			raise RuntimeError(f"Microphone capture unavailable: {self._error or 'device open timed out'}")
+		self._calibrated.wait(timeout=self.config.calibration_seconds + wait)
+
+	def open_reader(self, *, wait: float = 2.0) -> BufferedSource:
+		"""Return a source positioned ``preroll_seconds`` before live audio.
+
+		Starts the capture thread on first use and waits for the device to
+		open and the first calibration to finish.
+		"""
+
+		self.wait_ready(wait=wait)
+		with self._cond:
+			preroll = int(self.config.preroll_seconds * self.sample_rate / self.chunk)
+			oldest = self._next_seq - len(self._ring)
+			start_seq = max(oldest, self._next_seq - preroll)
+		return BufferedSource(self, start_seq)
+
+	def _attach_reader(self) -> None:
+		with self._cond:
+			self._readers += 1
+
+	def _detach_reader(self) -> None:
+		with self._cond:
+			self._readers -= 1
+			self._ambient.clear()
+
+	def _read_chunk(self, cursor: int) -> Tuple[bytes, int]:
+		with self._cond:
+			while cursor >= self._next_seq:
+				if self._closed:
+					return b"", cursor
+				self._cond.wait(timeout=0.5)
+
+			oldest = self._next_seq - len(self._ring)
+			if cursor < oldest:
+				self.logger.debug("Capture reader fell behind by %d chunks", oldest - cursor)
+				cursor = oldest
+			return self._ring[cursor - oldest], cursor + 1
+
+	def _run(self) -> None:
+		try:
+			with self._source_factory() as source:
+				self.chunk = source.CHUNK
+				self.sample_rate = source.SAMPLE_RATE
+				self.sample_width = source.SAMPLE_WIDTH
+				capacity = max(1, int(self.config.buffer_seconds * self.sample_rate / self.chunk))
+				with self._cond:
+					self._ring = collections.deque(maxlen=capacity)
+				self._opened.set()
+				self.logger.info("Microphone stream opened (%d Hz, %d-sample chunks).", self.sample_rate, self.chunk)
+
+				while not self._stop.is_set():
+					data = source.stream.read(source.CHUNK)
+					if not data:
+						break
+					with self._cond:
+						self._ring.append(data)
+						self._next_seq += 1
+						idle = self._readers == 0
+						self._cond.notify_all()
+					if idle or self._barge_in is not None:
+						energy = dsp.pcm_rms(data, self.sample_width)
+						if self._barge_in is not None:
+							self._check_barge_in(energy)
+						if idle:
+							self._observe_ambient(energy)
+		except Exception as exc:
+			self._error = exc
+			self.logger.error("Microphone capture stopped: %s", exc)
+		finally:
+			self._opened.set()
+			self._calibrated.set()
+			with self._cond:
+				self._closed = True
+				self._cond.notify_all()
+
+	def _observe_ambient(self, energy: float) -> None:
+		window = max(1, int(self.config.calibration_seconds * self.sample_rate / self.chunk))
+		self._ambient.append(energy)
+		while len(self._ambient) > window:
+			self._ambient.popleft()
+		if len(self._ambient) < window:
+			return
+
+		target = statistics.median(self._ambient) * self._recognizer.dynamic_energy_ratio
+		current = self._recognizer.energy_threshold
+		now = time.monotonic()
+		drifted = target > current * self.config.drift_ratio or target * self.config.drift_ratio < current
+		due = now - self._last_calibration >= self.config.recalibrate_interval
+
+		if not self._calibrated.is_set() or drifted or due:
+			self._recognizer.energy_threshold = target
+			self._last_calibration = now
+			if self._calibrated.is_set():
+				self.logger.debug("Recalibrated energy threshold %.1f -> %.1f", current, target)
+			self._calibrated.set()
+
+	def _check_barge_in(self, energy: float) -> None:
+		if not self._barge_in_active():
+			self._barge_in_chunks = 0
+			return
+		if energy > self._recognizer.energy_threshold * self.config.barge_in_ratio:
+			self._barge_in_chunks += 1
+		else:
+			self._barge_in_chunks = 0
+
+		needed = max(1, int(self.config.barge_in_seconds * self.sample_rate / self.chunk))
+		if self._barge_in_chunks >= needed:
+			self._barge_in_chunks = 0
+			self.logger.info("Barge-in detected; interrupting speech.")
+			self._barge_in()
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Literal, Optional, Tuple
+
+
+CommandStatus = Literal["ok", "pending", "timeout", "failed", "busy"]
+
+
+class ExecutorBusy(RuntimeError):
+	"""Raised by ``submit`` when every worker is occupied."""
+
+
+@dataclass
+class ExecutorConfig:
+	workers: int = 4
+	timeout_seconds: float = 10.0
+	# A command still running after this long is acknowledged and finishes
+	# in the background (0: always wait up to the timeout).
+	ack_after_seconds: float = 0.3
+
+	@classmethod
+	def from_settings(cls, commands_settings: Dict[str, Any]) -> "ExecutorConfig":
+		return cls(
+			workers=int(commands_settings.get("workers", 4)),
+			timeout_seconds=float(commands_settings.get("timeout_seconds", 10.0)),
+			ack_after_seconds=float(commands_settings.get("ack_after_seconds", 0.3)),
+		)
+
+
+@dataclass
+class CommandResult:
+	name: Optional[str]
+	status: CommandStatus
+	response: Optional[str] = None
+	error: Optional[str] = None
+	elapsed_ms: float = 0.0
+
+
+@dataclass
+class ExecutorStats:
+	completed: int = 0
+	acknowledged: int = 0
+	timed_out: int = 0
+	failed: int = 0
+	rejected: int = 0
+
+	def summary(self) -> str:
+		return (
+			f"completed={self.completed} acknowledged={self.acknowledged} timed_out={self.timed_out} "
+			f"failed={self.failed} rejected={self.rejected}"
+		)
+
+
+class CommandExecutor:
+	"""Run command handlers on a bounded worker pool.
+
+	``run`` waits ``ack_after_seconds`` for the handler. A handler that is
+	still running then (a browser or file manager being slow to launch)
+	returns a ``"pending"`` result right away; its real result is passed to
+	``on_done`` when it finishes or times out. A hung handler cannot be
+	killed, so it keeps its worker; once every worker is taken new
+	commands are rejected as ``"busy"`` instead of queueing behind it.
+	"""
+
+	def __init__(self, logger, config: Optional[ExecutorConfig] = None) -> None:
+		self.logger = logger
+		self.config = config or ExecutorConfig()
+		self._workers = max(1, self.config.workers)
+		self._pool = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="command")
+		self._lock = threading.Lock()
+		self._in_flight = 0
+		self._stats = ExecutorStats()
+		self._closed = False
+
+	def stats(self) -> ExecutorStats:
+		with self._lock:
+			return ExecutorStats(**vars(self._stats))
+
+	@property
+	def in_flight(self) -> int:
+		return self._in_flight
+
+	def submit(self, handler: Callable[..., str], args: Tuple[Any, ...] = (), kwargs: Optional[Dict[str, Any]] = None) -> Future:
+		"""Start ``handler`` on a worker (in the caller's context)."""
+
+		with self._lock:
+			if self._closed or self._in_flight >= self._workers:
+				self._stats.rejected += 1
+				raise ExecutorBusy(f"all {self._workers} command workers are busy")
+			self._in_flight += 1
+		try:
+			future = self._pool.submit(contextvars.copy_context().run, handler, *args, **(kwargs or {}))
+		except RuntimeError:
+			self._release(None)
+			raise ExecutorBusy("command executor is shut down") from None
+		future.add_done_callback(self._release)
+		return future
+
+	def run(
+		self,
+		name: Optional[str],
+		handler: Callable[..., str],
+		args: Tuple[Any, ...] = (),
+		kwargs: Optional[Dict[str, Any]] = None,
+		*,
+		timeout: Optional[float] = None,
+		on_done: Optional[Callable[[CommandResult], None]] = None,
+	) -> CommandResult:
+		started = time.perf_counter()
+		try:
+			future = self.submit(handler, args, kwargs)
+		except ExecutorBusy as exc:
+			self.logger.warning("Command %s rejected: %s", name, exc)
+			return CommandResult(name, "busy", error=str(exc))
+
+		timeout = timeout if timeout is not None else self.config.timeout_seconds
+		ack_after = self.config.ack_after_seconds
+		if on_done is None or ack_after <= 0 or ack_after >= timeout:
+			return self._collect(name, future, started, timeout)
+
+		try:
+			future.result(timeout=ack_after)
+		except FutureTimeout:
+			with self._lock:
+				self._stats.acknowledged += 1
+			self.logger.info("Command %s still running after %.0fms; acknowledged.", name, ack_after * 1000.0)
+			threading.Thread(
+				target=lambda: on_done(self._collect(name, future, started, timeout)),
+				name=f"command-wait-{name}",
+				daemon=True,
+			).start()
+			return CommandResult(name, "pending", elapsed_ms=(time.perf_counter() - started) * 1000.0)
+		except Exception:
+			pass
+		return self._collect(name, future, started, timeout)
+
+	def close(self) -> None:
+		with self._lock:
+			self._closed = True
+		self._pool.shutdown(wait=False, cancel_futures=True)
+
+	def record_timeout(self, name: Optional[str], timeout: float) -> None:
+		"""Count a command the caller stopped waiting for (it keeps its worker)."""
+
+		with self._lock:
+			self._stats.timed_out += 1
+		self.logger.error("Command %s did not finish within %.1fs.", name, timeout)
+
+	def _collect(self, name: Optional[str], future: Future, started: float, timeout: float) -> CommandResult:
+		remaining = max(0.0, timeout - (time.perf_counter() - started))
+		try:
+			response = future.result(timeout=remaining)
+		except FutureTimeout:
+			self.record_timeout(name, timeout)
+			return CommandResult(name, "timeout", error=f"timed out after {timeout:.1f}s", elapsed_ms=timeout * 1000.0)
+		except Exception as exc:
+			self.logger.error("Command handler %s failed: %r", name, exc, exc_info=exc)
+			return CommandResult(name, "failed", error=repr(exc), elapsed_ms=(time.perf_counter() - started) * 1000.0)
+		return CommandResult(name, "ok", response=response, elapsed_ms=(time.perf_counter() - started) * 1000.0)
+
+	def _release(self, future: Optional[Future]) -> None:
+		with self._lock:
+			self._in_flight -= 1
+			if future is None or future.cancelled():
+				return
+			if future.exception() is not None:
+				self._stats.failed += 1
+			else:
+				self._stats.completed += 1
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import importlib
+import threading
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+from voice_assistant.core.intents import BUILTIN_INTENTS, Intent
+
+
+Handler = Callable[..., str]
+
+# Installed packages can provide command handlers under this entry point
+# group: the entry point name is the command (intent) name and its value
+# a "module:function" reference.
+ENTRY_POINT_GROUP = "voice_assistant.commands"
+
+
+@dataclass(frozen=True)
+class CommandSpec:
+	"""Where a command's handler lives and how it may be run.
+
+	``target`` is a ``"module:function"`` reference, imported on the first
+	call. ``toggle`` names the ``commands:`` setting that enables it (the
+	command name itself always works as a toggle too). ``local`` marks
+	commands that act on the machine the assistant runs on (browser, file
+	manager). ``timeout`` overrides the executor's default.
+	"""
+
+	name: str
+	target: str
+	toggle: Optional[str] = None
+	local: bool = False
+	timeout: Optional[float] = None
+
+
+BUILTIN_COMMANDS: Tuple[CommandSpec, ...] = (
+	CommandSpec("time", "voice_assistant.commands.utility:get_time"),
+	CommandSpec("date", "voice_assistant.commands.utility:get_date"),
+	CommandSpec("greet", "voice_assistant.commands.utility:greet"),
+	CommandSpec("system_info", "voice_assistant.commands.system:system_info", toggle="system"),
+	CommandSpec("open_explorer", "voice_assistant.commands.system:open_file_explorer", toggle="system", local=True),
+	CommandSpec("search_web", "voice_assistant.commands.web:open_web_search", toggle="web_search", local=True),
+	CommandSpec("search_youtube", "voice_assistant.commands.web:open_youtube_search", toggle="youtube", local=True),
+	CommandSpec("search_spotify", "voice_assistant.commands.web:open_spotify_search", toggle="spotify", local=True),
+)
+
+
+class CommandLoadError(ImportError):
+	"""Raised when a command's ``module:function`` target cannot be imported."""
+
+
+class LazyHandler:
+	"""Callable that imports its target on the first call."""
+
+	__slots__ = ("spec", "_function", "_lock")
+
+	def __init__(self, spec: CommandSpec) -> None:
+		self.spec = spec
+		self._function: Optional[Handler] = None
+		self._lock = threading.Lock()
+
+	def __call__(self, *args: Any, **kwargs: Any) -> str:
+		function = self._function
+		if function is None:
+			function = self.load()
+		return function(*args, **kwargs)
+
+	def load(self) -> Handler:
+		with self._lock:
+			if self._function is None:
+				self._function = _resolve(self.spec.target)
+			return self._function
+
+	@property
+	def loaded(self) -> bool:
+		return self._function is not None
+
+	def __repr__(self) -> str:
+		return f"LazyHandler({self.spec.target!r})"
+
+
+class CommandRegistry:
+	"""Enabled commands, their intents and lazily imported handlers.
+
+	Built-in commands are described by :data:`BUILTIN_COMMANDS`; plugins
+	come from the ``commands.plugins`` setting and from installed packages'
+	``voice_assistant.commands`` entry points. Nothing is imported until a
+	command is first run, so unused (or broken) plugins cost nothing.
+	"""
+
+	def __init__(
+		self,
+		specs: Iterable[CommandSpec] = BUILTIN_COMMANDS,
+		intents: Sequence[Intent] = BUILTIN_INTENTS,
+		toggles: Optional[Mapping[str, Any]] = None,
+	) -> None:
+		toggles = toggles or {}
+		self._handlers: Dict[str, LazyHandler] = {}
+		self._disabled: Tuple[str, ...] = ()
+		for spec in specs:
+			if toggles.get(spec.name, True) and toggles.get(spec.toggle or spec.name, True):
+				self._handlers[spec.name] = LazyHandler(spec)
+			else:
+				self._disabled += (spec.name,)
+		self.intents = tuple(intent for intent in intents if intent.name in self._handlers)
+
+	@classmethod
+	def from_settings(cls, commands_settings: Mapping[str, Any], logger=None) -> "CommandRegistry":
+		specs = {spec.name: spec for spec in BUILTIN_COMMANDS}
+		intents = {intent.name: intent for intent in BUILTIN_INTENTS}
+
+		for name, target in _entry_point_targets(logger):
+			specs[name] = replace(specs[name], target=target) if name in specs else CommandSpec(name, target)
+
+		for name, plugin in (commands_settings.get("plugins") or {}).items():
+			if isinstance(plugin, str):
+				plugin = {"handler": plugin}
+			target = plugin.get("handler")
+			if not target or ":" not in target:
+				if logger is not None:
+					logger.warning("Ignoring command plugin %r: handler must be 'module:function'.", name)
+				continue
+			timeout = plugin.get("timeout_seconds")
+			base = specs.get(name, CommandSpec(name, target))
+			specs[name] = replace(
+				base,
+				target=target,
+				local=bool(plugin.get("local", base.local)),
+				timeout=float(timeout) if timeout is not None else base.timeout,
+			)
+			if plugin.get("keywords"):
+				intents[name] = Intent(
+					name=name,
+					keywords=tuple(plugin["keywords"]),
+					priority=int(plugin.get("priority", 15)),
+					slot=plugin.get("slot"),
+					strip=tuple(plugin.get("strip", plugin["keywords"] if plugin.get("slot") else ())),
+					examples=tuple(plugin.get("examples", ())),
+				)
+
+		return cls(specs.values(), tuple(intents.values()), toggles=commands_settings)
+
+	@property
+	def names(self) -> Tuple[str, ...]:
+		return tuple(self._handlers)
+
+	@property
+	def disabled(self) -> Tuple[str, ...]:
+		return self._disabled
+
+	def handler(self, name: str) -> Optional[LazyHandler]:
+		return self._handlers.get(name)
+
+	def spec(self, name: str) -> Optional[CommandSpec]:
+		handler = self._handlers.get(name)
+		return handler.spec if handler is not None else None
+
+	def is_local(self, name: Optional[str]) -> bool:
+		spec = self.spec(name) if name else None
+		return spec is not None and spec.local
+
+	def loaded(self) -> Tuple[str, ...]:
+		return tuple(name for name, handler in self._handlers.items() if handler.loaded)
+
+
+def _resolve(target: str) -> Handler:
+	module_name, _, attribute = target.partition(":")
+	try:
+		function: Any = importlib.import_module(module_name)
+		for part in attribute.split("."):
+			function = getattr(function, part)
+	except (ImportError, AttributeError) as exc:
+		raise CommandLoadError(f"cannot load command handler {target!r}: {exc}") from exc
+	if not callable(function):
+		raise CommandLoadError(f"command handler {target!r} is not callable")
+	return function
+
+
+def _entry_point_targets(logger=None) -> Tuple[Tuple[str, str], ...]:
+	"""``(name, "module:function")`` for every installed command entry point.
+
+	Only package metadata is read here; the plugin modules themselves are
+	imported on first use.
+	"""
+
+	try:
+		from importlib.metadata import entry_points
+
+		found = entry_points(group=ENTRY_POINT_GROUP)
+	except Exception as exc:
+		if logger is not None:
+			logger.warning("Could not read command plugin entry points: %s", exc)
+		return ()
+	return tuple((entry.name, entry.value) for entry in found)
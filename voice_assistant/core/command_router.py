@@ -1,13 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Callable, Dict, Optional, Tuple
+import threading
+from dataclasses import astuple, dataclass, replace
+from typing import Any, Dict, Optional, Sequence, Tuple
 
-from voice_assistant.commands import system, utility, web
-from voice_assistant.utils.helpers import normalize_text, suggest_closest
-
-
-Handler = Callable[..., str]
+from voice_assistant.core.command_registry import CommandRegistry, Handler
+from voice_assistant.core.intent_classifier import ClassifierConfig, IntentClassifier
+from voice_assistant.core.intents import Intent, IntentMatcher, excluded_intents, strip_phrases
+from voice_assistant.utils.helpers import normalize_text, strip_punctuation, suggest_closest
 
 
 @dataclass
@@ -17,69 +17,191 @@ class RouteResult:
 	kwargs: Dict[str, Any]
 	suggestions: Tuple[str, ...] = ()
 	is_exit: bool = False
+	intent: Optional[str] = None
+	# "keyword" or "classifier"; ``confidence`` is the classifier score.
+	matched_by: Optional[str] = None
+	confidence: Optional[float] = None
+
+
+@dataclass
+class RouterStats:
+	keyword: int = 0
+	classified: int = 0
+	fallback: int = 0
+
+	@property
+	def fallback_rate(self) -> float:
+		total = self.keyword + self.classified + self.fallback
+		return self.fallback / total if total else 0.0
+
+	def summary(self) -> str:
+		return (
+			f"keyword={self.keyword} classifier={self.classified} llm_fallback={self.fallback} "
+			f"fallback_rate={self.fallback_rate:.0%}"
+		)
 
 
 class CommandRouter:
-	"""Map natural language text to concrete command handlers."""
-
-	def __init__(self) -> None:
-		self._registry: Dict[str, Handler] = {
-			"time": lambda: utility.get_time(),
-			"date": lambda: utility.get_date(),
-			"greet": lambda: utility.greet(),
-			"system_info": lambda: system.system_info(),
-			"open_explorer": lambda: system.open_file_explorer(),
-			"search_web": lambda q: open_web_search_wrapper(q),
-			"search_youtube": lambda q: web.open_youtube_search(q),
-			"search_spotify": lambda q: web.open_spotify_search(q),
-		}
+	"""Map natural language text to concrete command handlers.
+
+	Intents are declared in :data:`BUILTIN_INTENTS` and compiled once into an
+	:class:`IntentMatcher`. Handlers come from a :class:`CommandRegistry`
+	(built-in commands plus plugins, imported on first use); intents
+	without an enabled command are not routed.
+
+	When no keyword matches, an :class:`IntentClassifier` over the intents'
+	example utterances gets a chance; only confident matches are routed,
+	everything else falls back to the LLM. The classifier (and NumPy) is
+	built on the first keyword miss and shared by routers with the same
+	intents and settings. ``stats`` counts how turns were resolved; pass a
+	shared :class:`RouterStats` to aggregate over several routers.
+
+	``preresolve`` routes a partial (still streaming) transcript; if the
+	final transcript normalizes to the same text, ``route`` returns that
+	result without matching again.
+	"""
+
+	def __init__(
+		self,
+		intents: Optional[Sequence[Intent]] = None,
+		classifier_config: Optional[ClassifierConfig] = None,
+		*,
+		use_classifier: bool = True,
+		stats: Optional[RouterStats] = None,
+		registry: Optional[CommandRegistry] = None,
+	) -> None:
+		self.registry = registry if registry is not None else CommandRegistry()
+		if intents is None:
+			intents = self.registry.intents
+		self._intents = tuple(intent for intent in intents if self.registry.handler(intent.name) is not None)
+		self._matcher = IntentMatcher(self._intents)
+		self._classifier_config = classifier_config or ClassifierConfig()
+		self._use_classifier = use_classifier
+		# (route key, text as given, result) of the last preresolved partial.
+		self._preresolved: Optional[Tuple[str, str, RouteResult]] = None
+		self._stats_lock = threading.Lock()
+		self._stats = stats if stats is not None else RouterStats()
 
 	@property
 	def known_commands(self) -> Tuple[str, ...]:
-		return tuple(self._registry.keys())
+		return tuple(intent.name for intent in self._intents)
+
+	def stats(self) -> RouterStats:
+		with self._stats_lock:
+			return replace(self._stats)
+
+	@property
+	def classifier(self) -> Optional[IntentClassifier]:
+		if not self._use_classifier:
+			return None
+		return _shared_classifier(self._intents, self._classifier_config)
+
+	def preresolve(self, partial: str) -> RouteResult:
+		result = self._route(partial)
+		self._preresolved = (_route_key(partial), " ".join(partial.split()), result)
+		return result
+
+	def completes(self, partial: str) -> bool:
+		"""Whether ``partial`` already routes to a command that takes no free text.
+
+		Commands with a slot ("search for ...") may still be growing, so they
+		never count as complete. Reuses (and updates) the preresolved route.
+		"""
+
+		result = self._reuse(self._preresolved, partial)
+		if result is None:
+			result = self.preresolve(partial)
+		return result.is_exit or (result.intent is not None and not result.args)
 
 	def route(self, text: str) -> RouteResult:
+		result = self._reuse(self._preresolved, text)
+		self._preresolved = None
+		if result is None:
+			result = self._route(text)
+		if not result.is_exit:
+			with self._stats_lock:
+				if result.matched_by == "keyword":
+					self._stats.keyword += 1
+				elif result.matched_by == "classifier":
+					self._stats.classified += 1
+				else:
+					self._stats.fallback += 1
+		return result
+
+	@staticmethod
+	def _reuse(preresolved: Optional[Tuple[str, str, RouteResult]], text: str) -> Optional[RouteResult]:
+		if preresolved is None or preresolved[0] != _route_key(text):
+			return None
+		_, given, result = preresolved
+		# A slot keeps the case and punctuation of the text it was cut from,
+		# so it is only reused for the very same text.
+		if result.args and given != " ".join(text.split()):
+			return None
+		return result
+
+	def _route(self, text: str) -> RouteResult:
 		original = text
 		text = normalize_text(text)
 
 		if text in {"exit", "quit", "stop", "q"}:
 			return RouteResult(handler=None, args=(), kwargs={}, is_exit=True)
 
-		if "time" in text:
-			return RouteResult(handler=self._registry["time"], args=(), kwargs={})
-		if "date" in text or "day" in text:
-			return RouteResult(handler=self._registry["date"], args=(), kwargs={})
-		if any(word in text for word in ["hello", "hi", "hey", "greet"]):
-			return RouteResult(handler=self._registry["greet"], args=(), kwargs={})
-
-		if "spotify" in text or "song" in text or "music" in text:
-			query = (
-				original.lower()
-				.replace("play", "")
-				.replace("on spotify", "")
-				.replace("spotify", "")
-			).strip()
-			return RouteResult(handler=self._registry["search_spotify"], args=(query or original,), kwargs={})
-
-		if "youtube" in text:
-			query = (
-				original.lower()
-				.replace("play", "")
-				.replace("on youtube", "")
-				.replace("youtube", "")
-			).strip()
-			return RouteResult(handler=self._registry["search_youtube"], args=(query or original,), kwargs={})
-
-		if any(word in text for word in ["search", "google", "look up"]):
-			query = original.lower().replace("search", "").replace("google", "").strip()
-			return RouteResult(handler=self._registry["search_web"], args=(query or original,), kwargs={})
-
-		suggestions = suggest_closest(text, self.known_commands)
-		return RouteResult(handler=None, args=(), kwargs={}, suggestions=tuple(suggestions))
-
-
-def open_web_search_wrapper(query: str) -> str:
-	from voice_assistant.commands import web as web_cmds
-
-	return web_cmds.open_web_search(query)
+		stripped = strip_punctuation(text)
+		match = self._matcher.match(stripped, original)
+		if match is not None:
+			intent = match.intent
+			args: Tuple[Any, ...] = ()
+			if intent.slot:
+				args = (match.slots.get(intent.slot) or original,)
+			return RouteResult(
+				handler=self._handler(intent), args=args, kwargs={}, intent=intent.name, matched_by="keyword"
+			)
+
+		classifier = self.classifier
+		if classifier is None:
+			suggestions = suggest_closest(text, self.known_commands)
+			return RouteResult(handler=None, args=(), kwargs={}, suggestions=tuple(suggestions))
+
+		classification = classifier.classify(stripped)
+		if classification is None:
+			return RouteResult(handler=None, args=(), kwargs={})
+		if classification.intent is None:
+			# Scored as a question: it goes to the LLM, nothing to suggest.
+			return RouteResult(handler=None, args=(), kwargs={})
+		excluded = excluded_intents(stripped, self._matcher.intents)
+		if classification.confident and classification.intent.name not in excluded:
+			intent = classification.intent
+			args = ()
+			if intent.slot:
+				args = (strip_phrases(original, intent.strip) or original,)
+			return RouteResult(
+				handler=self._handler(intent),
+				args=args,
+				kwargs={},
+				intent=intent.name,
+				matched_by="classifier",
+				confidence=classification.score,
+			)
+		suggestions = tuple(name for name in classification.candidates if name not in excluded)
+		return RouteResult(handler=None, args=(), kwargs={}, suggestions=suggestions)
+
+	def _handler(self, intent: Intent) -> Handler:
+		return self.registry.handler(intent.name)
+
+
+_classifiers: Dict[Tuple[Any, ...], IntentClassifier] = {}
+_classifiers_lock = threading.Lock()
+
+
+def _shared_classifier(intents: Tuple[Intent, ...], config: ClassifierConfig) -> IntentClassifier:
+	key = (intents, astuple(config))
+	with _classifiers_lock:
+		classifier = _classifiers.get(key)
+		if classifier is None:
+			classifier = _classifiers[key] = IntentClassifier(intents, config)
+		return classifier
+
+
+def _route_key(text: str) -> str:
+	return strip_punctuation(normalize_text(text))
 
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Union
+
+import numpy as np
+
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+def pcm_to_float(frame_data: BytesLike, sample_width: int = 2) -> np.ndarray:
+	"""View little-endian PCM as float32 samples in ``[-1, 1)``.
+
+	Only the final scaling allocates; the integer view shares memory with
+	``frame_data``.
+	"""
+
+	if sample_width == 1:
+		return (np.frombuffer(frame_data, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+	if sample_width == 2:
+		return np.frombuffer(frame_data, dtype="<i2").astype(np.float32) / 32768.0
+	if sample_width == 4:
+		return np.frombuffer(frame_data, dtype="<i4").astype(np.float32) / 2147483648.0
+	raise ValueError(f"Unsupported sample width: {sample_width}")
+
+
+def float_to_pcm16(samples: np.ndarray) -> np.ndarray:
+	return (np.clip(samples, -1.0, 1.0 - 1.0 / 32768.0) * 32768.0).astype("<i2")
+
+
+def pcm_rms(frame_data: BytesLike, sample_width: int = 2) -> float:
+	"""RMS of a PCM chunk in sample units, the scale of ``Recognizer.energy_threshold``."""
+
+	samples = pcm_to_float(frame_data, sample_width)
+	if not samples.size:
+		return 0.0
+	full_scale = float(1 << (8 * sample_width - 1))
+	return float(np.sqrt(np.mean(np.square(samples, dtype=np.float64)))) * full_scale
+
+
+@lru_cache(maxsize=8)
+def _lowpass_kernel(ratio: float, taps: int = 31) -> np.ndarray:
+	n = np.arange(taps) - (taps - 1) / 2.0
+	kernel = ratio * np.sinc(ratio * n) * np.hamming(taps)
+	return (kernel / kernel.sum()).astype(np.float32)
+
+
+def resample(samples: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+	"""Resample with linear interpolation, low-pass filtering when decimating."""
+
+	if src_rate == dst_rate or samples.size == 0:
+		return samples
+	if dst_rate < src_rate:
+		samples = np.convolve(samples, _lowpass_kernel(round(0.9 * dst_rate / src_rate, 4)), mode="same")
+	duration = samples.size / src_rate
+	target = np.arange(int(duration * dst_rate), dtype=np.float64) / dst_rate
+	source = np.arange(samples.size, dtype=np.float64) / src_rate
+	return np.interp(target, source, samples).astype(np.float32)
+
+
+def frame_signal(samples: np.ndarray, frame_len: int, hop: int) -> np.ndarray:
+	"""Return overlapping frames as a strided view (no copy)."""
+
+	if samples.size < frame_len:
+		samples = np.pad(samples, (0, frame_len - samples.size))
+	return np.lib.stride_tricks.sliding_window_view(samples, frame_len)[::hop]
+
+
+def frame_energy_db(frames: np.ndarray) -> np.ndarray:
+	power = np.mean(np.square(frames, dtype=np.float32), axis=1)
+	return 10.0 * np.log10(power + 1e-10)
+
+
+def zero_crossing_rate(frames: np.ndarray) -> np.ndarray:
+	"""Fraction of adjacent sample pairs per frame that change sign."""
+
+	signs = np.signbit(frames)
+	return np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / max(1, frames.shape[1] - 1)
+
+
+@lru_cache(maxsize=8)
+def _mel_filterbank(n_fft: int, sample_rate: int, n_mels: int) -> np.ndarray:
+	def hz_to_mel(hz):
+		return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+	def mel_to_hz(mel):
+		return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+	mel_points = np.linspace(hz_to_mel(0.0), hz_to_mel(sample_rate / 2.0), n_mels + 2)
+	bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / sample_rate).astype(int)
+
+	bank = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+	for m in range(1, n_mels + 1):
+		left, center, right = bins[m - 1], bins[m], bins[m + 1]
+		if center > left:
+			bank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+		if right > center:
+			bank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+	return bank
+
+
+@lru_cache(maxsize=8)
+def _dct_matrix(n_mfcc: int, n_mels: int) -> np.ndarray:
+	n = np.arange(n_mels)
+	k = np.arange(n_mfcc)[:, None]
+	return (np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)) * np.sqrt(2.0 / n_mels)).astype(np.float32)
+
+
+def mfcc(
+	samples: np.ndarray,
+	sample_rate: int,
+	*,
+	n_mfcc: int = 13,
+	n_mels: int = 26,
+	frame_ms: float = 25.0,
+	hop_ms: float = 10.0,
+) -> np.ndarray:
+	"""Compute MFCCs as a ``(frames, n_mfcc)`` array."""
+
+	frame_len = int(sample_rate * frame_ms / 1000.0)
+	hop = int(sample_rate * hop_ms / 1000.0)
+	n_fft = 1 << (frame_len - 1).bit_length()
+
+	emphasized = np.append(samples[:1], samples[1:] - 0.97 * samples[:-1])
+	frames = frame_signal(emphasized, frame_len, hop) * np.hamming(frame_len).astype(np.float32)
+	power = np.square(np.abs(np.fft.rfft(frames, n=n_fft))) / n_fft
+	mel = np.log(power @ _mel_filterbank(n_fft, sample_rate, n_mels).T + 1e-10)
+	return mel @ _dct_matrix(n_mfcc, n_mels).T
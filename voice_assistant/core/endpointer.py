@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import collections
+import math
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import speech_recognition as sr
+
+from voice_assistant.core import dsp
+
+
+@dataclass
+class EndpointerConfig:
+	# Trailing silence waited out until enough of the speaker's pauses have
+	# been observed (SpeechRecognition's fixed ``pause_threshold``).
+	default_pause_seconds: float = 0.8
+	# Bounds of the learned wait. Pauses longer than the current wait end
+	# the utterance and are never observed, so the floor keeps the learned
+	# wait from creeping below natural between-word pauses.
+	min_pause_seconds: float = 0.5
+	max_pause_seconds: float = 1.6
+	# The learned wait covers this quantile of the pauses seen inside
+	# utterances, plus a margin.
+	pause_quantile: float = 0.9
+	margin_seconds: float = 0.15
+	min_samples: int = 8
+	history: int = 200
+	# Gaps shorter than this are dips between syllables or plosives rather
+	# than pauses between words; learning them would shrink the wait.
+	min_gap_seconds: float = 0.15
+	# Utterances with up to short_speech_seconds of speech are commands; the
+	# wait grows linearly to dictation_factor times the learned wait at
+	# long_speech_seconds (dictation).
+	short_speech_seconds: float = 1.5
+	long_speech_seconds: float = 4.0
+	dictation_factor: float = 1.5
+	# Short utterances whose partial transcript already names a complete
+	# command end after this fraction of the learned wait.
+	complete_factor: float = 0.5
+	# Hard cap on one utterance (``listen_once`` default).
+	max_phrase_seconds: float = 30.0
+
+	@classmethod
+	def from_settings(cls, endpoint_settings: Dict[str, Any]) -> "EndpointerConfig":
+		return cls(
+			default_pause_seconds=float(endpoint_settings.get("default_pause_seconds", 0.8)),
+			min_pause_seconds=float(endpoint_settings.get("min_pause_seconds", 0.5)),
+			max_pause_seconds=float(endpoint_settings.get("max_pause_seconds", 1.6)),
+			pause_quantile=float(endpoint_settings.get("pause_quantile", 0.9)),
+			min_gap_seconds=float(endpoint_settings.get("min_gap_seconds", 0.15)),
+			short_speech_seconds=float(endpoint_settings.get("short_speech_seconds", 1.5)),
+			long_speech_seconds=float(endpoint_settings.get("long_speech_seconds", 4.0)),
+			dictation_factor=float(endpoint_settings.get("dictation_factor", 1.5)),
+			complete_factor=float(endpoint_settings.get("complete_factor", 0.5)),
+			max_phrase_seconds=float(endpoint_settings.get("max_phrase_seconds", 30.0)),
+		)
+
+
+@dataclass
+class EndpointDecision:
+	"""How (and after how much trailing silence) an utterance was ended.
+
+	``reason`` is ``"default"`` (not enough pauses learned yet),
+	``"learned"``, ``"complete"`` (the partial transcript was a whole
+	command), ``"dictation"``, or ``"limit"``/``"end"`` when the phrase
+	limit or the end of the stream cut the utterance instead.
+	"""
+
+	reason: str
+	wait_seconds: float
+	speech_seconds: float
+	learned_seconds: float
+
+	@property
+	def wait_ms(self) -> float:
+		return self.wait_seconds * 1000.0
+
+
+class AdaptiveEndpointer:
+	"""Decide when an utterance has ended from the speaker's own pauses.
+
+	Every silence that ends with the speaker talking again is a pause
+	inside an utterance; the trailing silence needed to end one adapts to
+	cover most of them. Short utterances whose streaming transcript is
+	already a complete command (``is_complete``) end sooner, longer
+	dictation waits longer.
+
+	``listen`` replaces ``sr.Recognizer.listen``. The energy threshold is
+	adapted only while waiting for speech to start: adapting it during the
+	utterance (as SpeechRecognition does) drags it up to speech level and
+	cuts long commands short. As there, bursts with less than
+	``recognizer.phrase_threshold`` seconds of speech (clicks, knocks) are
+	dropped and listening goes on.
+	"""
+
+	def __init__(self, config: Optional[EndpointerConfig] = None) -> None:
+		self.config = config or EndpointerConfig()
+		self.is_complete: Optional[Callable[[str], bool]] = None
+		self._pauses: Deque[float] = collections.deque(maxlen=self.config.history)
+		self._checked: Tuple[Optional[str], bool] = (None, False)
+
+	@property
+	def learned_pause(self) -> float:
+		"""Trailing silence that outlasts ``pause_quantile`` of the observed pauses."""
+
+		config = self.config
+		if len(self._pauses) < config.min_samples:
+			return config.default_pause_seconds
+		ordered = sorted(self._pauses)
+		index = min(len(ordered) - 1, int(math.ceil(config.pause_quantile * len(ordered))) - 1)
+		pause = ordered[max(0, index)] + config.margin_seconds
+		return min(config.max_pause_seconds, max(config.min_pause_seconds, pause))
+
+	def required_pause(self, speech_seconds: float, transcript: Optional[str] = None) -> Tuple[float, str]:
+		config = self.config
+		learned = self.learned_pause
+		reason = "learned" if len(self._pauses) >= config.min_samples else "default"
+		if speech_seconds <= config.short_speech_seconds:
+			if transcript and self._complete(transcript):
+				return learned * config.complete_factor, "complete"
+			return learned, reason
+		span = max(1e-6, config.long_speech_seconds - config.short_speech_seconds)
+		fraction = min(1.0, (speech_seconds - config.short_speech_seconds) / span)
+		wait = learned * (1.0 + fraction * (config.dictation_factor - 1.0))
+		return min(config.max_pause_seconds * config.dictation_factor, wait), "dictation"
+
+	def observe_pause(self, seconds: float) -> None:
+		if seconds >= self.config.min_gap_seconds:
+			self._pauses.append(seconds)
+
+	def listen(
+		self,
+		recognizer: sr.Recognizer,
+		source: sr.AudioSource,
+		*,
+		timeout: Optional[float] = None,
+		phrase_time_limit: Optional[float] = None,
+		transcript: Optional[Callable[[], Optional[str]]] = None,
+	) -> Tuple[sr.AudioData, EndpointDecision]:
+		"""Record one utterance from ``source``; raises ``sr.WaitTimeoutError`` if none starts."""
+
+		seconds_per_chunk = source.CHUNK / source.SAMPLE_RATE
+		keep_chunks = int(math.ceil(recognizer.non_speaking_duration / seconds_per_chunk))
+		phrase_chunks = int(math.ceil(recognizer.phrase_threshold / seconds_per_chunk))
+		self._checked = (None, False)
+
+		elapsed = 0.0
+		while True:
+			frames: Deque[bytes] = collections.deque()
+			while True:
+				elapsed += seconds_per_chunk
+				if timeout and elapsed > timeout:
+					raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+				buffer = source.stream.read(source.CHUNK)
+				if not buffer:
+					return self._audio(frames, source), EndpointDecision("end", 0.0, 0.0, self.learned_pause)
+				frames.append(buffer)
+				if len(frames) > keep_chunks:
+					frames.popleft()
+				energy = dsp.pcm_rms(buffer, source.SAMPLE_WIDTH)
+				if energy > recognizer.energy_threshold:
+					break
+				if recognizer.dynamic_energy_threshold:
+					damping = recognizer.dynamic_energy_adjustment_damping**seconds_per_chunk
+					target = energy * recognizer.dynamic_energy_ratio
+					recognizer.energy_threshold = recognizer.energy_threshold * damping + target * (1 - damping)
+
+			threshold = recognizer.energy_threshold
+			speech_chunks = 1
+			silence = 0.0
+			phrase_elapsed = 0.0
+			# Pauses are learned only once the burst turns out to be a phrase.
+			pauses: List[float] = []
+			while True:
+				phrase_elapsed += seconds_per_chunk
+				speech = speech_chunks * seconds_per_chunk
+				if phrase_time_limit and phrase_elapsed > phrase_time_limit:
+					decision = EndpointDecision("limit", silence, speech, self.learned_pause)
+					break
+				buffer = source.stream.read(source.CHUNK)
+				if not buffer:
+					decision = EndpointDecision("end", silence, speech, self.learned_pause)
+					break
+				frames.append(buffer)
+				if dsp.pcm_rms(buffer, source.SAMPLE_WIDTH) > threshold:
+					if silence:
+						pauses.append(silence)
+					silence = 0.0
+					speech_chunks += 1
+					continue
+				silence += seconds_per_chunk
+				if speech_chunks < phrase_chunks:
+					# Too little speech to be a phrase yet: a burst that stays
+					# this short is dropped once the usual wait has passed.
+					if silence >= self.learned_pause:
+						decision = None
+						break
+					continue
+				wait, reason = self.required_pause(speech, transcript() if transcript is not None else None)
+				if silence >= wait:
+					decision = EndpointDecision(reason, wait, speech, self.learned_pause)
+					break
+
+			elapsed += phrase_elapsed
+			if decision is not None:
+				break
+
+		for pause in pauses:
+			self.observe_pause(pause)
+		# Keep at most ``non_speaking_duration`` of the trailing silence.
+		trailing = int(round(silence / seconds_per_chunk))
+		for _ in range(max(0, trailing - keep_chunks)):
+			frames.pop()
+		return self._audio(frames, source), decision
+
+	def _complete(self, transcript: str) -> bool:
+		# Partial transcripts change a few times per utterance; check each once.
+		if self.is_complete is None:
+			return False
+		if self._checked[0] != transcript:
+			self._checked = (transcript, bool(self.is_complete(transcript)))
+		return self._checked[1]
+
+	@staticmethod
+	def _audio(frames: Deque[bytes], source: sr.AudioSource) -> sr.AudioData:
+		return sr.AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import collections
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from voice_assistant.core.intents import Intent
+from voice_assistant.utils.helpers import strip_punctuation
+
+if TYPE_CHECKING:
+	import numpy as np
+
+
+# Utterances that should *not* be routed to a command: general questions
+# for the LLM. They compete with the intents as one extra class.
+QUESTION_EXAMPLES: Tuple[str, ...] = (
+	"why is the sky blue",
+	"who wrote romeo and juliet",
+	"what is the capital of france",
+	"how far away is the moon",
+	"explain how vaccines work",
+	"tell me a joke",
+	"what is the meaning of life",
+	"how do i bake bread",
+	"when did the second world war end",
+	"who is the president of the united states",
+	"how many legs does a spider have",
+	"what does photosynthesis mean",
+	"can you help me with my homework",
+	"what should i cook for dinner",
+	"summarize the plot of hamlet",
+	"translate good night into spanish",
+	"what is gravity",
+	"what is a black hole",
+	"how are you doing",
+	"is it going to rain tomorrow",
+	# Weather, sports and opening hours share words with the time, date and
+	# search commands; without these they score as commands.
+	"what is the weather going to be like today",
+	"how cold is it outside right now",
+	"will it snow this weekend",
+	"what's the forecast for tomorrow",
+	"who won the football match yesterday",
+	"what was the final score of the game",
+	"who is playing in the world cup final",
+	"when does the basketball season start",
+	"what time does the pharmacy open",
+	"when does the bank close today",
+	"how tall is the eiffel tower",
+	"what year did the first man land on the moon",
+	"who invented the telephone",
+	"how many people live in japan",
+)
+
+
+@dataclass
+class ClassifierConfig:
+	min_n: int = 2
+	max_n: int = 4
+	# Cosine similarity needed to route, and lead over the runner-up class.
+	threshold: float = 0.6
+	margin: float = 0.1
+	# Intents scoring above this (but not confidently) are offered as suggestions.
+	suggest_threshold: float = 0.3
+
+	@classmethod
+	def from_settings(cls, classifier_settings: Dict[str, Any]) -> "ClassifierConfig":
+		return cls(
+			threshold=float(classifier_settings.get("threshold", 0.6)),
+			margin=float(classifier_settings.get("margin", 0.1)),
+			suggest_threshold=float(classifier_settings.get("suggest_threshold", 0.3)),
+		)
+
+
+@dataclass
+class Classification:
+	# ``None`` when the best class is the question (LLM) class.
+	intent: Optional[Intent]
+	score: float
+	confident: bool
+	# Other intents above ``suggest_threshold``, best first.
+	candidates: Tuple[str, ...] = ()
+
+
+class IntentClassifier:
+	"""Character n-gram TF-IDF nearest-example classifier.
+
+	Every example utterance (plus the intents' keywords) becomes one
+	L2-normalized TF-IDF row of a dense ``float32`` matrix, grouped by
+	class. A query costs one vectorization and one matrix-vector product;
+	the class score is the best cosine similarity among its examples.
+	Character n-grams make it tolerant of inflections and STT misspellings
+	("wether", "youtub").
+	"""
+
+	def __init__(self, intents: Sequence[Intent], config: Optional[ClassifierConfig] = None) -> None:
+		import numpy as np
+
+		self.config = config or ClassifierConfig()
+		self.intents = tuple(intent for intent in intents if intent.examples or intent.keywords)
+
+		# Class i < len(intents) is an intent; the last class is "question".
+		documents: List[str] = []
+		owners: List[int] = []
+		for index, intent in enumerate(self.intents):
+			for text in intent.examples + intent.keywords:
+				documents.append(text)
+				owners.append(index)
+		for text in QUESTION_EXAMPLES:
+			documents.append(text)
+			owners.append(len(self.intents))
+
+		counts = [self._ngrams(text) for text in documents]
+		document_frequency: collections.Counter = collections.Counter()
+		for grams in counts:
+			document_frequency.update(grams.keys())
+		self._vocabulary: Dict[str, int] = {gram: i for i, gram in enumerate(sorted(document_frequency))}
+		total = len(documents)
+		self._idf = np.array(
+			[math.log((1 + total) / (1 + document_frequency[gram])) + 1.0 for gram in sorted(document_frequency)],
+			dtype=np.float32,
+		)
+
+		matrix = np.zeros((total, len(self._vocabulary)), dtype=np.float32)
+		for row, grams in enumerate(counts):
+			columns, weights = self._weights(grams)
+			matrix[row, columns] = weights
+		self._matrix = matrix
+		# Rows are grouped by class; first row of each class, for reduceat.
+		self._starts = np.searchsorted(np.asarray(owners), np.arange(len(self.intents) + 1))
+
+	def classify(self, text: str) -> Optional[Classification]:
+		"""Best class for ``text``; ``None`` if it shares no n-gram with any example."""
+
+		import numpy as np
+
+		columns, weights = self._weights(self._ngrams(text))
+		if len(columns) == 0:
+			return None
+		query = np.zeros(self._matrix.shape[1], dtype=np.float32)
+		query[columns] = weights
+		similarities = self._matrix @ query
+
+		scores = np.maximum.reduceat(similarities, self._starts)
+		order = np.argsort(scores)[::-1]
+		best, runner_up = int(order[0]), float(scores[order[1]])
+		score = float(scores[best])
+		confident = score >= self.config.threshold and score - runner_up >= self.config.margin
+
+		is_question = best == len(self.intents)
+		candidates = tuple(
+			self.intents[int(i)].name
+			for i in order
+			if int(i) < len(self.intents) and scores[i] >= self.config.suggest_threshold
+		)
+		return Classification(
+			intent=None if is_question else self.intents[best],
+			score=score,
+			confident=confident and not is_question,
+			candidates=candidates,
+		)
+
+	def _ngrams(self, text: str) -> collections.Counter:
+		padded = f" {strip_punctuation(text)} "
+		grams: collections.Counter = collections.Counter()
+		for n in range(self.config.min_n, self.config.max_n + 1):
+			for start in range(len(padded) - n + 1):
+				grams[padded[start : start + n]] += 1
+		return grams
+
+	def _weights(self, grams: collections.Counter) -> Tuple["np.ndarray", "np.ndarray"]:
+		import numpy as np
+
+		pairs = [(self._vocabulary[gram], count) for gram, count in grams.items() if gram in self._vocabulary]
+		columns = np.fromiter((column for column, _ in pairs), dtype=np.int64, count=len(pairs))
+		# Sublinear term frequency, then L2 normalization.
+		weights = np.fromiter((1.0 + math.log(count) for _, count in pairs), dtype=np.float32, count=len(pairs))
+		weights *= self._idf[columns]
+		norm = float(np.linalg.norm(weights))
+		return columns, weights / norm if norm else weights
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+# Trimmed from both ends of a slot value ("Search for C++ tutorials?").
+_SLOT_PUNCTUATION = " ,.;:!?"
+
+
+@dataclass(frozen=True)
+class Intent:
+	"""Declarative description of a command.
+
+	``keywords`` trigger the intent. For intents with a free-text ``slot``,
+	every phrase in ``strip`` is removed from the utterance and what is left
+	becomes the slot value. ``examples`` are typical phrasings without the
+	keywords, used by the fuzzy classifier when no keyword matches. An
+	``exclude`` phrase anywhere in the utterance vetoes the intent ("what
+	time does the store close" is a question, not the time command).
+	"""
+
+	name: str
+	keywords: Tuple[str, ...]
+	priority: int = 0
+	slot: Optional[str] = None
+	strip: Tuple[str, ...] = ()
+	examples: Tuple[str, ...] = ()
+	exclude: Tuple[str, ...] = ()
+
+
+@dataclass
+class IntentMatch:
+	intent: Intent
+	slots: Dict[str, str]
+	position: int
+
+
+BUILTIN_INTENTS: Tuple[Intent, ...] = (
+	Intent(
+		name="search_youtube",
+		keywords=("youtube",),
+		priority=40,
+		slot="query",
+		strip=("play", "open youtube for", "search youtube for", "open youtube", "on youtube", "youtube"),
+		examples=(
+			"show me videos of cats",
+			"find a video about cooking pasta",
+			"i want to watch funny clips",
+			"watch a tutorial on python",
+			"play the trailer for the new batman movie",
+			"show me the highlights of last night's game",
+		),
+	),
+	Intent(
+		name="search_spotify",
+		keywords=("spotify", "song", "songs", "music"),
+		priority=30,
+		slot="query",
+		strip=("play", "search spotify for", "spotify for", "on spotify", "in spotify", "spotify"),
+		examples=(
+			"put on some jazz",
+			"play despacito",
+			"play some relaxing tunes",
+			"i want to listen to taylor swift",
+			"listen to the new album by adele",
+			"queue up my workout playlist",
+		),
+	),
+	Intent(
+		name="search_web",
+		keywords=("search", "google", "look up"),
+		priority=20,
+		slot="query",
+		strip=("search the web for", "search for", "search", "look up", "on google", "google"),
+		examples=(
+			"find information about electric cars",
+			"browse for cheap flights to london",
+			"find me a recipe for lasagna",
+			"where can i buy a laptop online",
+			"check the web for news about nasa",
+			"find reviews of the new iphone",
+		),
+	),
+	Intent(
+		name="time",
+		keywords=("time", "what time", "current time"),
+		priority=10,
+		exclude=(
+			"what time does",
+			"what time do",
+			"what time did",
+			"what time will",
+			"what time was",
+			"what time is the",
+			"what time are",
+			"time zone",
+		),
+		examples=(
+			"what's the time",
+			"tell me the time",
+			"got the time",
+			"what hour is it",
+			"clock",
+		),
+	),
+	Intent(
+		name="date",
+		keywords=("date", "what day", "which day", "day is it", "day is today", "today's date"),
+		priority=10,
+		examples=(
+			"what's today",
+			"tell me today's date",
+			"which weekday is it",
+			"what month is it",
+			"which month are we in",
+			"calendar",
+		),
+	),
+	Intent(
+		name="system_info",
+		keywords=("system info", "system information", "operating system", "what system", "which os"),
+		priority=10,
+		examples=(
+			"what computer am i using",
+			"tell me about this machine",
+			"what os am i running",
+			"what os is this",
+			"which version of windows is this",
+			"show my computer specs",
+			"what platform is this",
+		),
+	),
+	Intent(
+		name="open_explorer",
+		keywords=("file explorer", "file manager", "open explorer", "open files", "open folder"),
+		priority=10,
+		examples=(
+			"show my files",
+			"open my documents",
+			"browse my folders",
+			"browse the files on my computer",
+			"launch the file browser",
+			"open the downloads folder",
+			"show me my desktop",
+		),
+	),
+	Intent(
+		name="greet",
+		keywords=("hello", "hi", "hey", "greet", "good morning", "good afternoon", "good evening"),
+		priority=5,
+		examples=(
+			"howdy",
+			"good day",
+			"hiya",
+			"greetings",
+			"what's up",
+			"nice to meet you",
+		),
+	),
+)
+
+
+class IntentMatcher:
+	"""All intent phrases compiled into one word-bounded regex.
+
+	Phrases are ordered longest first so that, at any position, the most
+	specific phrase wins. A single ``finditer`` pass yields both the
+	triggered intents and the spans to strip for slot extraction, so
+	routing cost does not grow with the number of registered intents.
+	"""
+
+	def __init__(self, intents: Sequence[Intent]) -> None:
+		self.intents = tuple(intents)
+
+		# phrase -> [(intent index, triggers?, strips?, vetoes?)]. A phrase triggers every
+		# intent whose keyword it contains, so a longer phrase swallowing a
+		# keyword in the single regex pass still counts as a hit.
+		# Exclusions take part in the same pass: being longer than the keyword
+		# they contain, they win at their position and veto the intent.
+		phrases = {p for intent in self.intents for p in intent.keywords + intent.strip + intent.exclude}
+		roles: Dict[str, List[Tuple[int, bool, bool, bool]]] = {}
+		for phrase in phrases:
+			for index, intent in enumerate(self.intents):
+				vetoes = phrase in intent.exclude
+				triggers = not vetoes and any(_contains_phrase(phrase, keyword) for keyword in intent.keywords)
+				strips = phrase in intent.strip
+				if triggers or strips or vetoes:
+					roles.setdefault(phrase, []).append((index, triggers, strips, vetoes))
+
+		self._phrases = sorted(roles, key=lambda p: (-len(p), p))
+		self._roles = [roles[p] for p in self._phrases]
+		alternatives = "|".join(f"(?P<p{i}>{re.escape(p)})" for i, p in enumerate(self._phrases))
+		self._pattern = re.compile(rf"\b(?:{alternatives})\b") if self._phrases else None
+
+	def match(self, text: str, original: Optional[str] = None) -> Optional[IntentMatch]:
+		"""Return the best intent for already-normalized ``text``.
+
+		The slot is cut from ``original`` (the utterance as typed) when given,
+		so it keeps its case and punctuation ("C++ tutorials", "node.js").
+		"""
+
+		if self._pattern is None:
+			return None
+
+		first_seen: Dict[int, int] = {}
+		strip_spans: Dict[int, List[Tuple[int, int]]] = {}
+		vetoed = set()
+		for m in self._pattern.finditer(text):
+			for index, triggers, strips, vetoes in self._roles[int(m.lastgroup[1:])]:
+				if triggers:
+					first_seen.setdefault(index, m.start())
+				if strips:
+					strip_spans.setdefault(index, []).append(m.span())
+				if vetoes:
+					vetoed.add(index)
+		for index in vetoed:
+			first_seen.pop(index, None)
+
+		if not first_seen:
+			return None
+
+		best = min(first_seen, key=lambda i: (-self.intents[i].priority, first_seen[i]))
+		intent = self.intents[best]
+		slots: Dict[str, str] = {}
+		if intent.slot:
+			if original is not None:
+				slots[intent.slot] = strip_phrases(original, intent.strip)
+			else:
+				slots[intent.slot] = _remove_spans(text, strip_spans.get(best, []))
+		return IntentMatch(intent=intent, slots=slots, position=first_seen[best])
+
+
+def excluded_intents(text: str, intents: Sequence[Intent]) -> FrozenSet[str]:
+	"""Names of the ``intents`` vetoed by an ``exclude`` phrase in normalized ``text``."""
+
+	padded = f" {text} "
+	return frozenset(intent.name for intent in intents if any(f" {phrase} " in padded for phrase in intent.exclude))
+
+
+def strip_phrases(text: str, phrases: Sequence[str]) -> str:
+	"""Remove every whole-word occurrence of ``phrases`` (longest first) from ``text``.
+
+	Matching ignores case and the punctuation between a phrase's words, so
+	raw utterances can be stripped; the rest of ``text`` is kept as is,
+	less surrounding punctuation.
+	"""
+
+	if phrases:
+		ordered = sorted(phrases, key=len, reverse=True)
+		alternatives = "|".join(r"\W+".join(re.escape(word) for word in p.split()) for p in ordered)
+		spans = [m.span() for m in re.finditer(rf"\b(?:{alternatives})\b", text, re.IGNORECASE)]
+		text = _remove_spans(text, spans)
+	return " ".join(text.split()).strip(_SLOT_PUNCTUATION)
+
+
+def _contains_phrase(phrase: str, keyword: str) -> bool:
+	return f" {keyword} " in f" {phrase} "
+
+
+def _remove_spans(text: str, spans: List[Tuple[int, int]]) -> str:
+	pieces = []
+	cursor = 0
+	for start, end in spans:
+		pieces.append(text[cursor:start])
+		cursor = end
+	pieces.append(text[cursor:])
+	return " ".join("".join(pieces).split())
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from voice_assistant.core.llm_cache import ResponseCache
+from voice_assistant.core.providers import GroqProvider
+
+
+DEFAULT_SYSTEM_PROMPT = "You are a concise, helpful voice assistant."
+SUMMARY_PROMPT = (
+	"Update the running summary of a conversation between a user and a voice assistant. "
+	"Keep names, places, dates and open questions; drop pleasantries. "
+	"Reply with the summary only, in at most {words} words."
+)
+
+Messages = Sequence[Dict[str, str]]
+
+_SENTENCE_END_RE = re.compile(r"""[.!?]+["')\]]*(?=\s)|\n+""")
+_ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e", "approx"}
+
+
+@dataclass
+class LLMConfig:
+	model: str
+	system_prompt: str = DEFAULT_SYSTEM_PROMPT
+	stream: bool = True
+
+
+class LLMClient:
+	"""Thin wrapper around the Groq Responses API used for free-form Q&A.
+
+	If a :class:`ResponseCache` is given, answers are served from and stored
+	in it for both the blocking and the streaming call. The provider client
+	is only touched on the first upstream request.
+	"""
+
+	def __init__(self, logger, config: LLMConfig, provider: GroqProvider, cache: Optional[ResponseCache] = None) -> None:
+		self.logger = logger
+		self.config = config
+		self.cache = cache
+		self.provider = provider
+
+	@property
+	def available(self) -> bool:
+		return self.provider.available
+
+	def _messages(self, prompt: str, context: Messages = ()) -> List[Dict[str, str]]:
+		return [
+			{"role": "system", "content": self.config.system_prompt},
+			*context,
+			{"role": "user", "content": prompt},
+		]
+
+	def _cache_key(self, prompt: str, context_key: str = "") -> str:
+		return ResponseCache.make_key(
+			prompt,
+			model=self.config.model,
+			system_prompt=self.config.system_prompt,
+			context=context_key,
+		)
+
+	def answer(self, prompt: str, *, context: Messages = (), context_key: str = "") -> Optional[str]:
+		"""Return the complete answer, or ``None`` if the model produced no text.
+
+		``context`` messages (conversation memory) go between the system
+		prompt and ``prompt``; ``context_key`` must identify them for caching.
+		"""
+
+		if self.cache is None:
+			return self._create(prompt, context)
+		return self.cache.get_or_compute(self._cache_key(prompt, context_key), lambda: self._create(prompt, context))
+
+	async def answer_async(self, prompt: str, *, context: Messages = (), context_key: str = "") -> Optional[str]:
+		"""Asyncio variant of :meth:`answer` over the provider's async client.
+
+		Shares the response cache; concurrent misses for the same question
+		await a single upstream request.
+		"""
+
+		if self.cache is None:
+			return await self._create_async(prompt, context)
+		return await self.cache.get_or_compute_async(
+			self._cache_key(prompt, context_key), lambda: self._create_async(prompt, context)
+		)
+
+	async def _create_async(self, prompt: str, context: Messages = ()) -> Optional[str]:
+		response = await self.provider.async_client.responses.create(
+			model=self.config.model,
+			input=self._messages(prompt, context),
+		)
+		return response_text(response) or None
+
+	def _create(self, prompt: str, context: Messages = ()) -> Optional[str]:
+		response = self.provider.client.responses.create(model=self.config.model, input=self._messages(prompt, context))
+		return response_text(response)
+
+	def summarize(self, previous: str, exchanges: Sequence[Tuple[str, str]], *, max_words: int = 100) -> Optional[str]:
+		"""Fold ``exchanges`` into ``previous`` (used by conversation memory; not cached)."""
+
+		transcript = "\n".join(f"User: {user}\nAssistant: {assistant}" for user, assistant in exchanges)
+		response = self.provider.client.responses.create(
+			model=self.config.model,
+			input=[
+				{"role": "system", "content": SUMMARY_PROMPT.format(words=max_words)},
+				{"role": "user", "content": f"Current summary: {previous or '(none)'}\n\nNew exchanges:\n{transcript}"},
+			],
+		)
+		return response_text(response)
+
+	def stream(self, prompt: str, *, context: Messages = (), context_key: str = "") -> Iterator[str]:
+		"""Yield answer text deltas as the model produces them.
+
+		A cache hit is yielded as a single delta. A streamed answer is only
+		cached once the stream completes.
+		"""
+
+		key = None
+		if self.cache is not None:
+			key = self._cache_key(prompt, context_key)
+			cached = self.cache.get(key)
+			if cached is not None:
+				yield cached
+				return
+
+		events = self.provider.client.responses.create(
+			model=self.config.model,
+			input=self._messages(prompt, context),
+			stream=True,
+		)
+		parts: List[str] = []
+		for event in events:
+			if getattr(event, "type", None) == "response.output_text.delta":
+				delta = getattr(event, "delta", "")
+				if delta:
+					parts.append(delta)
+					yield delta
+
+		text = "".join(parts).strip()
+		if key is not None and text:
+			self.cache.put(key, text)
+
+
+class SentenceChunker:
+	"""Cut a stream of text deltas into speakable sentences.
+
+	A sentence is emitted as soon as terminal punctuation (or a line break)
+	is followed by whitespace, so the first sentence can be spoken while the
+	rest of the answer is still being generated.
+	"""
+
+	def __init__(self, min_chars: int = 12) -> None:
+		self.min_chars = min_chars
+		self._buffer = ""
+
+	def feed(self, delta: str) -> List[str]:
+		self._buffer += delta
+		sentences: List[str] = []
+		start = 0
+		for match in _SENTENCE_END_RE.finditer(self._buffer):
+			candidate = self._buffer[start:match.end()].strip()
+			if len(candidate) < self.min_chars or _ends_with_abbreviation(candidate):
+				continue
+			sentences.append(candidate)
+			start = match.end()
+		self._buffer = self._buffer[start:]
+		return sentences
+
+	def flush(self) -> Optional[str]:
+		rest, self._buffer = self._buffer.strip(), ""
+		return rest or None
+
+
+def _ends_with_abbreviation(text: str) -> bool:
+	if not text.endswith("."):
+		return False
+	last_word = text.rsplit(None, 1)[-1].rstrip(".").lower()
+	return last_word in _ABBREVIATIONS or len(last_word) == 1
+
+
+def response_text(response: Any) -> Optional[str]:
+	text = getattr(response, "output_text", None)
+	if not text and hasattr(response, "output"):
+		text = str(response.output)
+	return text.strip() if text else None
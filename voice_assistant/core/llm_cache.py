@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional
+
+from voice_assistant.utils.helpers import strip_punctuation
+
+# Hits update ``last_used`` in the store in batches of this many keys (and
+# on every put and on close) rather than with one write per hit.
+_TOUCH_BATCH = 16
+
+
+@dataclass
+class CacheConfig:
+	max_entries: int = 256
+	ttl_seconds: float = 24 * 60 * 60
+	path: Optional[Path] = None
+
+
+@dataclass
+class CacheStats:
+	hits: int = 0
+	misses: int = 0
+	coalesced: int = 0
+	evictions: int = 0
+	expirations: int = 0
+
+	@property
+	def hit_rate(self) -> float:
+		total = self.hits + self.misses
+		return self.hits / total if total else 0.0
+
+	def summary(self) -> str:
+		return (
+			f"hits={self.hits} misses={self.misses} coalesced={self.coalesced} "
+			f"evictions={self.evictions} expired={self.expirations} hit_rate={self.hit_rate:.0%}"
+		)
+
+
+class _Flight:
+	def __init__(self) -> None:
+		self.done = threading.Event()
+		self.value: Optional[str] = None
+		self.error: Optional[BaseException] = None
+
+
+class ResponseCache:
+	"""Bounded LRU cache of LLM answers with per-entry TTL.
+
+	Entries are mirrored to an SQLite file (when ``config.path`` is set) and
+	the most recently used ones are loaded back at startup, so a restarted
+	assistant answers common questions without a network call. Concurrent
+	``get_or_compute`` calls for the same key share one upstream request,
+	and so do concurrent ``get_or_compute_async`` calls on an event loop.
+	"""
+
+	def __init__(self, logger, config: CacheConfig) -> None:
+		self.logger = logger
+		self.config = config
+		self._lock = threading.Lock()
+		self._entries: "OrderedDict[str, tuple[str, float]]" = OrderedDict()
+		self._inflight: Dict[str, _Flight] = {}
+		self._async_inflight: Dict[str, "asyncio.Future[Optional[str]]"] = {}
+		# Keys hit since the store was last updated, with their hit time.
+		self._touched: Dict[str, float] = {}
+		self._stats = CacheStats()
+		self._db: Optional[sqlite3.Connection] = None
+
+		if config.path is not None:
+			try:
+				self._open_store(config.path)
+			except Exception as exc:
+				self.logger.warning("LLM cache store unavailable (%s); caching in memory only.", exc)
+				self._db = None
+
+	@staticmethod
+	def make_key(prompt: str, *, model: str, system_prompt: str, context: str = "") -> str:
+		material = "\x1f".join((model, system_prompt, context, strip_punctuation(prompt)))
+		return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+	def stats(self) -> CacheStats:
+		with self._lock:
+			return replace(self._stats)
+
+	def get(self, key: str) -> Optional[str]:
+		with self._lock:
+			return self._lookup(key)
+
+	def put(self, key: str, value: str) -> None:
+		expires_at = time.time() + self.config.ttl_seconds
+		with self._lock:
+			self._insert(key, value, expires_at)
+			if self._db is not None:
+				try:
+					self._db.execute(
+						"INSERT OR REPLACE INTO responses (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+						(key, value, expires_at, time.time()),
+					)
+					self._touched.pop(key, None)
+					self._write_touched()
+					self._db.commit()
+				except sqlite3.Error as exc:
+					self.logger.warning("Failed to persist LLM cache entry: %s", exc)
+
+	def get_or_compute(self, key: str, compute: Callable[[], Optional[str]]) -> Optional[str]:
+		"""Return the cached value or compute it, coalescing concurrent misses."""
+
+		with self._lock:
+			value = self._lookup(key)
+			if value is not None:
+				return value
+			flight = self._inflight.get(key)
+			leader = flight is None
+			if leader:
+				flight = self._inflight[key] = _Flight()
+			else:
+				self._stats.coalesced += 1
+
+		if not leader:
+			flight.done.wait()
+			if flight.error is not None:
+				raise flight.error
+			return flight.value
+
+		try:
+			flight.value = compute()
+			if flight.value is not None:
+				self.put(key, flight.value)
+			return flight.value
+		except BaseException as exc:
+			flight.error = exc
+			raise
+		finally:
+			with self._lock:
+				self._inflight.pop(key, None)
+			flight.done.set()
+
+	async def get_or_compute_async(self, key: str, compute: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+		"""Asyncio variant of :meth:`get_or_compute`.
+
+		The first miss runs ``compute()`` as its own task; concurrent misses
+		for the key await that task (shielded, so one caller being cancelled
+		does not cancel the request for the others).
+		"""
+
+		with self._lock:
+			value = self._lookup(key)
+			if value is not None:
+				return value
+			task = self._async_inflight.get(key)
+			if task is None:
+				task = self._async_inflight[key] = asyncio.ensure_future(self._compute_async(key, compute))
+			else:
+				self._stats.coalesced += 1
+		return await asyncio.shield(task)
+
+	async def _compute_async(self, key: str, compute: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+		try:
+			value = await compute()
+			if value is not None:
+				self.put(key, value)
+			return value
+		finally:
+			with self._lock:
+				self._async_inflight.pop(key, None)
+
+	def close(self) -> None:
+		with self._lock:
+			if self._db is not None:
+				try:
+					self._write_touched()
+					self._db.commit()
+				except sqlite3.Error as exc:
+					self.logger.warning("Failed to persist LLM cache usage: %s", exc)
+				self._db.close()
+				self._db = None
+
+	def _lookup(self, key: str) -> Optional[str]:
+		entry = self._entries.get(key)
+		if entry is None:
+			self._stats.misses += 1
+			return None
+		value, expires_at = entry
+		if expires_at <= time.time():
+			del self._entries[key]
+			self._stats.expirations += 1
+			self._stats.misses += 1
+			return None
+		self._entries.move_to_end(key)
+		self._stats.hits += 1
+		if self._db is not None:
+			self._touched[key] = time.time()
+			if len(self._touched) >= _TOUCH_BATCH:
+				try:
+					self._write_touched()
+					self._db.commit()
+				except sqlite3.Error as exc:
+					self.logger.warning("Failed to persist LLM cache usage: %s", exc)
+		return value
+
+	def _write_touched(self) -> None:
+		"""Record the hit times of recently used keys (caller commits)."""
+
+		if self._touched:
+			self._db.executemany(
+				"UPDATE responses SET last_used = ? WHERE key = ?",
+				[(used, key) for key, used in self._touched.items()],
+			)
+			self._touched.clear()
+
+	def _insert(self, key: str, value: str, expires_at: float) -> None:
+		self._entries[key] = (value, expires_at)
+		self._entries.move_to_end(key)
+		while len(self._entries) > self.config.max_entries:
+			evicted, _ = self._entries.popitem(last=False)
+			self._touched.pop(evicted, None)
+			self._stats.evictions += 1
+			if self._db is not None:
+				self._db.execute("DELETE FROM responses WHERE key = ?", (evicted,))
+
+	def _open_store(self, path: Path) -> None:
+		path.parent.mkdir(parents=True, exist_ok=True)
+		self._db = sqlite3.connect(str(path), check_same_thread=False)
+		self._db.execute(
+			"CREATE TABLE IF NOT EXISTS responses "
+			"(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+		)
+		now = time.time()
+		self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+		rows = self._db.execute(
+			"SELECT key, value, expires_at FROM responses ORDER BY last_used DESC LIMIT ?",
+			(self.config.max_entries,),
+		).fetchall()
+		self._db.commit()
+		for key, value, expires_at in reversed(rows):
+			self._entries[key] = (value, expires_at)
+		if rows:
+			self.logger.info("Loaded %d cached LLM answers from %s", len(rows), path)
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import collections
+import hashlib
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+# (user, assistant)
+Exchange = Tuple[str, str]
+Summarizer = Callable[[str, Sequence[Exchange]], Optional[str]]
+
+# Per-message overhead of the chat format (role markers, separators).
+_MESSAGE_OVERHEAD = 4
+
+def estimate_tokens(text: str) -> int:
+	"""Cheap token estimate (~4 characters per token for English BPE vocabularies)."""
+
+	return (len(text) + 3) // 4 + _MESSAGE_OVERHEAD
+
+
+@dataclass
+class MemoryConfig:
+	# Hard cap on summary + verbatim turns sent with each request.
+	max_tokens: int = 600
+	summary_tokens: int = 150
+	min_recent_turns: int = 2
+
+	@classmethod
+	def from_settings(cls, memory_settings: Dict[str, Any]) -> "MemoryConfig":
+		return cls(
+			max_tokens=int(memory_settings.get("max_tokens", 600)),
+			summary_tokens=int(memory_settings.get("summary_tokens", 150)),
+			min_recent_turns=int(memory_settings.get("min_recent_turns", 2)),
+		)
+
+
+class ConversationMemory:
+	"""Recent exchanges kept verbatim inside a fixed token budget.
+
+	When the verbatim turns outgrow their share of the budget, the oldest
+	ones are folded into a rolling summary on a background thread, so the
+	request that triggers the fold never waits for it. Until the new
+	summary lands, folded turns are simply left out; ``messages`` never
+	exceeds ``max_tokens``.
+
+	Pass a shared ``executor`` when there are many memories (one per server
+	session); otherwise each memory starts its own summary thread on the
+	first fold.
+	"""
+
+	def __init__(
+		self,
+		logger,
+		config: MemoryConfig,
+		summarizer: Optional[Summarizer] = None,
+		executor: Optional[Executor] = None,
+	) -> None:
+		self.logger = logger
+		self.config = config
+		self._summarizer = summarizer
+		self._shared_executor = executor
+		self._lock = threading.Lock()
+		self._turns: Deque[Exchange] = collections.deque()
+		self._turn_tokens = 0
+		self._summary = ""
+		self._folding: List[Exchange] = []
+		self._fold_lock = threading.Lock()
+		self._executor: Optional[Executor] = executor
+
+	@property
+	def summary(self) -> str:
+		with self._lock:
+			return self._summary
+
+	def add_turn(self, user: str, assistant: str) -> None:
+		if not user or not assistant:
+			return
+		with self._lock:
+			self._turns.append((user, assistant))
+			self._turn_tokens += _exchange_tokens((user, assistant))
+			folded = self._take_overflow()
+		if folded:
+			self._schedule_fold(folded)
+
+	def messages(self) -> List[Dict[str, str]]:
+		"""Context messages (summary first, then verbatim turns) within the budget."""
+
+		with self._lock:
+			summary = self._summary
+			turns = list(self._turns)
+
+		budget = self.config.max_tokens
+		head: List[Dict[str, str]] = []
+		if summary:
+			head.append({"role": "system", "content": f"Summary of the earlier conversation: {summary}"})
+			budget -= estimate_tokens(head[0]["content"])
+
+		tail: List[Dict[str, str]] = []
+		for user, assistant in reversed(turns):
+			cost = _exchange_tokens((user, assistant))
+			if cost > budget:
+				break
+			budget -= cost
+			tail[:0] = [{"role": "user", "content": user}, {"role": "assistant", "content": assistant}]
+		return head + tail
+
+	def digest(self) -> str:
+		"""Short fingerprint of the current context, for response cache keys."""
+
+		return context_digest(self.messages())
+
+	def context(self) -> Tuple[List[Dict[str, str]], str]:
+		"""Context messages and their :func:`context_digest`, taken together.
+
+		Answers are cached under the digest of exactly the messages sent with
+		the prompt, so only a turn without context shares entries across
+		conversations and sessions.
+		"""
+
+		messages = self.messages()
+		return messages, context_digest(messages)
+
+	def token_count(self) -> int:
+		return sum(estimate_tokens(m["content"]) for m in self.messages())
+
+	def clear(self) -> None:
+		with self._lock:
+			self._turns.clear()
+			self._turn_tokens = 0
+			self._summary = ""
+			self._folding = []
+
+	def close(self) -> None:
+		if self._executor is not None and self._executor is not self._shared_executor:
+			self._executor.shutdown(wait=False, cancel_futures=True)
+			self._executor = None
+
+	def _take_overflow(self) -> List[Exchange]:
+		# Fold down to 3/4 of the verbatim share so that folds are batched
+		# rather than triggered by every turn.
+		limit = self.config.max_tokens - self.config.summary_tokens
+		if self._turn_tokens <= limit:
+			return []
+		target = limit * 3 // 4
+		folded: List[Exchange] = []
+		while self._turn_tokens > target and len(self._turns) > self.config.min_recent_turns:
+			exchange = self._turns.popleft()
+			self._turn_tokens -= _exchange_tokens(exchange)
+			folded.append(exchange)
+		return folded
+
+	def _schedule_fold(self, folded: List[Exchange]) -> None:
+		with self._lock:
+			self._folding.extend(folded)
+		if self._executor is None:
+			self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-summary")
+		self._executor.submit(self._fold)
+
+	def _fold(self) -> None:
+		# Serializes folds on a shared multi-worker executor, so each one
+		# builds on the summary written by the previous one.
+		with self._fold_lock:
+			self._fold_pending()
+
+	def _fold_pending(self) -> None:
+		with self._lock:
+			previous, folding = self._summary, self._folding
+			self._folding = []
+		if not folding:
+			return
+
+		summary = None
+		if self._summarizer is not None:
+			try:
+				summary = self._summarizer(previous, folding)
+			except Exception as exc:
+				self.logger.warning("Conversation summary failed; using a truncated transcript: %s", exc)
+		if not summary:
+			summary = _extractive_summary(previous, folding)
+		summary = _truncate_tokens(summary.strip(), self.config.summary_tokens)
+
+		with self._lock:
+			self._summary = summary
+		self.logger.debug("Folded %d turns into the conversation summary (%d tokens).", len(folding), estimate_tokens(summary))
+
+
+def context_digest(messages: Sequence[Dict[str, str]]) -> str:
+	"""Short fingerprint of context ``messages``; empty when there are none."""
+
+	if not messages:
+		return ""
+	material = "\x1f".join(f"{m['role']}:{m['content']}" for m in messages)
+	return hashlib.sha256(material.encode("utf-8")).hexdigest()[:16]
+
+
+def _exchange_tokens(exchange: Exchange) -> int:
+	return estimate_tokens(exchange[0]) + estimate_tokens(exchange[1])
+
+
+def _extractive_summary(previous: str, exchanges: Sequence[Exchange]) -> str:
+	lines = [previous] if previous else []
+	lines.extend(f"User asked: {user} Assistant: {assistant}" for user, assistant in exchanges)
+	return " ".join(lines)
+
+
+def _truncate_tokens(text: str, max_tokens: int) -> str:
+	"""Keep the most recent part of ``text`` that fits in ``max_tokens``."""
+
+	max_chars = max(0, (max_tokens - _MESSAGE_OVERHEAD) * 4)
+	if len(text) <= max_chars:
+		return text
+	cut = text[-max_chars:]
+	space = cut.find(" ")
+	return cut[space + 1 :] if 0 <= space < 40 else cut
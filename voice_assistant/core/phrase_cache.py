@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+import wave
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Tuple
+
+# (text, cached clip or None when it has to be synthesized live)
+Segment = Tuple[str, Optional[Path]]
+
+_FIELD = re.compile(r"\{[^{}]*\}")
+
+
+@dataclass
+class PhraseCacheConfig:
+	directory: Path = Path(".cache/tts")
+	max_bytes: int = 64 * 1024 * 1024
+	precompute: bool = True
+
+
+@dataclass
+class PhraseCacheStats:
+	hits: int = 0
+	misses: int = 0
+	fragments: int = 0
+	rendered: int = 0
+
+	def summary(self) -> str:
+		return f"hits={self.hits} misses={self.misses} fragment_hits={self.fragments} rendered={self.rendered}"
+
+
+class PhraseCache:
+	"""Content-addressed on-disk cache of rendered speech for fixed phrases.
+
+	Clips are stored as ``<sha256>.wav`` where the hash covers the text and
+	the voice settings, so changing the voice, rate or volume never plays a
+	stale clip. Only registered phrases and the fixed parts of registered
+	templates (``"Opening YouTube for '{query}'."``) are cached; everything
+	else is left to live synthesis.
+
+	Rendering is done by the speaker's worker thread (the TTS engine is
+	bound to it); this class only decides what to render and where.
+	"""
+
+	def __init__(self, logger, config: PhraseCacheConfig) -> None:
+		self.logger = logger
+		self.config = config
+		self._lock = threading.Lock()
+		self._voice_key = ""
+		self._phrases: Dict[str, None] = {}
+		self._templates: List[Tuple[Pattern[str], Tuple[str, ...]]] = []
+		self._stats = PhraseCacheStats()
+		self.config.directory.mkdir(parents=True, exist_ok=True)
+		self._prune()
+
+	def set_voice(self, *, voice: Any, rate: Any, volume: Any) -> None:
+		self._voice_key = "\x1f".join(str(part) for part in (voice, rate, volume))
+
+	def register(self, phrases: Iterable[str] = (), templates: Iterable[str] = ()) -> None:
+		with self._lock:
+			for phrase in phrases:
+				phrase = _normalize(phrase)
+				if phrase:
+					self._phrases[phrase] = None
+			for template in templates:
+				compiled = _compile_template(template)
+				if compiled is not None:
+					self._templates.append(compiled)
+					for fragment in compiled[1]:
+						if fragment:
+							self._phrases[fragment] = None
+
+	def stats(self) -> PhraseCacheStats:
+		with self._lock:
+			return replace(self._stats)
+
+	def path_for(self, text: str) -> Path:
+		material = f"{self._voice_key}\x1e{_normalize(text)}"
+		digest = hashlib.sha256(material.encode("utf-8")).hexdigest()
+		return self.config.directory / f"{digest}.wav"
+
+	def lookup(self, text: str) -> Optional[Path]:
+		path = self.path_for(text)
+		return path if path.exists() else None
+
+	def segments(self, text: str) -> List[Segment]:
+		"""Split ``text`` into cached clips and parts to synthesize live.
+
+		Returns a single live segment when nothing is cached, so callers can
+		fall back to speaking the text as one utterance.
+		"""
+
+		normalized = _normalize(text)
+		with self._lock:
+			known = normalized in self._phrases
+			templates = list(self._templates)
+
+		if known:
+			clip = self.lookup(normalized)
+			self._count(hit=clip is not None)
+			return [(text, clip)]
+
+		for pattern, fragments in templates:
+			match = pattern.fullmatch(normalized)
+			if match is None:
+				continue
+			segments: List[Segment] = []
+			cached = 0
+			for index, fragment in enumerate(fragments):
+				if fragment:
+					clip = self.lookup(fragment)
+					cached += clip is not None
+					segments.append((fragment, clip))
+				if index < len(match.groups()) and match.group(index + 1).strip():
+					segments.append((match.group(index + 1).strip(), None))
+			self._count(hit=cached > 0, fragment=True)
+			return segments if cached else [(text, None)]
+
+		return [(text, None)]
+
+	def missing(self) -> List[str]:
+		"""Registered phrases and fragments that have no clip yet."""
+
+		with self._lock:
+			phrases = list(self._phrases)
+		return [phrase for phrase in phrases if self.lookup(phrase) is None]
+
+	def is_cacheable(self, text: str) -> bool:
+		with self._lock:
+			return _normalize(text) in self._phrases
+
+	def store(self, text: str, rendered: Path) -> Optional[Path]:
+		"""Validate a freshly rendered file and move it into place."""
+
+		try:
+			with wave.open(str(rendered), "rb") as clip:
+				if clip.getnframes() == 0:
+					raise wave.Error("empty clip")
+		except (wave.Error, EOFError, OSError) as exc:
+			# Some engines (e.g. NSSpeechSynthesizer) write AIFF regardless of
+			# the extension; such phrases are simply spoken live.
+			self.logger.debug("Discarding rendered clip for %r: %s", text[:40], exc)
+			rendered.unlink(missing_ok=True)
+			return None
+		target = self.path_for(text)
+		os.replace(rendered, target)
+		with self._lock:
+			self._stats.rendered += 1
+		return target
+
+	def _count(self, *, hit: bool, fragment: bool = False) -> None:
+		with self._lock:
+			if not hit:
+				self._stats.misses += 1
+			elif fragment:
+				self._stats.fragments += 1
+			else:
+				self._stats.hits += 1
+
+	def _prune(self) -> None:
+		"""Delete the least recently used clips beyond ``max_bytes``."""
+
+		for partial in self.config.directory.glob("*.tmp.wav"):
+			partial.unlink(missing_ok=True)
+		clips = []
+		for path in self.config.directory.glob("*.wav"):
+			try:
+				stat = path.stat()
+			except OSError:
+				continue
+			clips.append((stat.st_atime, stat.st_size, path))
+		total = sum(size for _, size, _ in clips)
+		for _, size, path in sorted(clips):
+			if total <= self.config.max_bytes:
+				break
+			path.unlink(missing_ok=True)
+			total -= size
+
+
+def _normalize(text: str) -> str:
+	return " ".join(text.split())
+
+
+def _compile_template(template: str) -> Optional[Tuple[Pattern[str], Tuple[str, ...]]]:
+	"""Regex for a ``str.format`` template plus its fixed (speakable) parts.
+
+	Fixed parts without any letters (quotes, trailing punctuation) are
+	dropped from the spoken fragments but still matched.
+	"""
+
+	template = _normalize(template)
+	parts = _FIELD.split(template)
+	if len(parts) < 2:
+		return None
+	pattern = "(.+?)".join(re.escape(part) for part in parts)
+	fragments = tuple(_speakable(part) for part in parts)
+	return re.compile(pattern), fragments
+
+
+def _speakable(part: str) -> str:
+	stripped = part.strip(" '\"")
+	return stripped if any(ch.isalpha() for ch in stripped) else ""
+
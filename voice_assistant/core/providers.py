@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import collections
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+	import httpx
+	from openai import AsyncOpenAI, OpenAI
+
+
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+
+
+@dataclass
+class ProviderConfig:
+	api_key: Optional[str]
+	base_url: str = GROQ_BASE_URL
+	max_connections: int = 10
+	max_keepalive_connections: int = 5
+	keepalive_expiry: float = 60.0
+	connect_timeout: float = 5.0
+	read_timeout: float = 30.0
+	warmup: bool = True
+
+
+class EndpointStats:
+	"""Rolling latency (time to response headers) for one endpoint."""
+
+	def __init__(self, window: int = 256) -> None:
+		self.count = 0
+		self.errors = 0
+		self._recent: Deque[float] = collections.deque(maxlen=window)
+
+	def record(self, millis: float, *, error: bool = False) -> None:
+		self.count += 1
+		if error:
+			self.errors += 1
+		self._recent.append(millis)
+
+	def percentile(self, q: float) -> float:
+		if not self._recent:
+			return 0.0
+		ordered = sorted(self._recent)
+		return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+	def summary(self) -> str:
+		return f"n={self.count} err={self.errors} p50={self.percentile(0.5):.0f}ms p95={self.percentile(0.95):.0f}ms"
+
+
+class _TimedTransport:
+	"""Transport wrapper that records per-endpoint latency.
+
+	Implements the ``httpx.BaseTransport`` interface by duck typing so that
+	this module does not import httpx until a client is actually built.
+	"""
+
+	def __init__(self, inner: "httpx.BaseTransport", provider: "GroqProvider") -> None:
+		self._inner = inner
+		self._provider = provider
+
+	def handle_request(self, request: "httpx.Request") -> "httpx.Response":
+		started = time.perf_counter()
+		try:
+			response = self._inner.handle_request(request)
+		except Exception:
+			self._provider._record(request, started, error=True)
+			raise
+		self._provider._record(request, started, error=response.status_code >= 500)
+		return response
+
+	def close(self) -> None:
+		self._inner.close()
+
+
+class _TimedAsyncTransport:
+	"""Async counterpart of :class:`_TimedTransport` (``httpx.AsyncBaseTransport``)."""
+
+	def __init__(self, inner: "httpx.AsyncBaseTransport", provider: "GroqProvider") -> None:
+		self._inner = inner
+		self._provider = provider
+
+	async def handle_async_request(self, request: "httpx.Request") -> "httpx.Response":
+		started = time.perf_counter()
+		try:
+			response = await self._inner.handle_async_request(request)
+		except Exception:
+			self._provider._record(request, started, error=True)
+			raise
+		self._provider._record(request, started, error=response.status_code >= 500)
+		return response
+
+	async def aclose(self) -> None:
+		await self._inner.aclose()
+
+
+class GroqProvider:
+	"""Single pooled, keep-alive client for every Groq (OpenAI-compatible) call.
+
+	The recognizer, the LLM and any future TTS backend share one
+	``httpx.Client`` so connections (DNS, TLS) are reused across features.
+	``warm_up`` opens the first connection in the background at startup.
+	``async_client`` is the asyncio equivalent (for the server), with its
+	own pool of the same size; it is bound to the event loop that first
+	uses it.
+	"""
+
+	def __init__(self, logger, config: ProviderConfig) -> None:
+		self.logger = logger
+		self.config = config
+		self._lock = threading.Lock()
+		self._client: Optional["OpenAI"] = None
+		self._http: Optional["httpx.Client"] = None
+		self._async_client: Optional["AsyncOpenAI"] = None
+		self._async_http: Optional["httpx.AsyncClient"] = None
+		self._stats: Dict[str, EndpointStats] = {}
+		self._base_path = urlsplit(config.base_url).path.rstrip("/")
+
+	@classmethod
+	def from_settings(cls, logger, settings: Dict[str, Any]) -> "GroqProvider":
+		groq = settings.get("groq", {})
+		return cls(
+			logger,
+			ProviderConfig(
+				api_key=groq.get("api_key"),
+				base_url=groq.get("base_url") or GROQ_BASE_URL,
+				max_connections=int(groq.get("max_connections", 10)),
+				max_keepalive_connections=int(groq.get("max_keepalive_connections", 5)),
+				keepalive_expiry=float(groq.get("keepalive_expiry", 60.0)),
+				connect_timeout=float(groq.get("connect_timeout", 5.0)),
+				read_timeout=float(groq.get("read_timeout", 30.0)),
+				warmup=groq.get("warmup", True),
+			),
+		)
+
+	@property
+	def available(self) -> bool:
+		return bool(self.config.api_key)
+
+	@property
+	def client(self) -> "OpenAI":
+		"""The shared client, built (and ``openai``/``httpx`` imported) on first use."""
+
+		with self._lock:
+			if self._client is None:
+				import httpx
+				from openai import OpenAI
+
+				transport = _TimedTransport(httpx.HTTPTransport(limits=self._limits()), self)
+				self._http = httpx.Client(
+					transport=transport,
+					timeout=httpx.Timeout(self.config.read_timeout, connect=self.config.connect_timeout),
+				)
+				self._client = OpenAI(
+					api_key=self.config.api_key,
+					base_url=self.config.base_url,
+					http_client=self._http,
+				)
+			return self._client
+
+	@property
+	def async_client(self) -> "AsyncOpenAI":
+		with self._lock:
+			if self._async_client is None:
+				import httpx
+				from openai import AsyncOpenAI
+
+				transport = _TimedAsyncTransport(httpx.AsyncHTTPTransport(limits=self._limits()), self)
+				self._async_http = httpx.AsyncClient(
+					transport=transport,
+					timeout=httpx.Timeout(self.config.read_timeout, connect=self.config.connect_timeout),
+				)
+				self._async_client = AsyncOpenAI(
+					api_key=self.config.api_key,
+					base_url=self.config.base_url,
+					http_client=self._async_http,
+				)
+			return self._async_client
+
+	def _limits(self) -> "httpx.Limits":
+		import httpx
+
+		return httpx.Limits(
+			max_connections=self.config.max_connections,
+			max_keepalive_connections=self.config.max_keepalive_connections,
+			keepalive_expiry=self.config.keepalive_expiry,
+		)
+
+	def preflight(self) -> None:
+		"""Check the API key and open a pooled connection (DNS + TLS + first request)."""
+
+		if not self.available:
+			raise RuntimeError("GROQ_API_KEY not set")
+		self.client.models.list()
+		self.logger.debug("Groq connection pre-warmed.")
+
+	def warm_up(self) -> Optional[threading.Thread]:
+		"""Open a pooled connection in the background (DNS + TLS + first request)."""
+
+		if not self.available or not self.config.warmup:
+			return None
+
+		def run() -> None:
+			try:
+				self.preflight()
+			except Exception as exc:
+				self.logger.warning("Groq warm-up request failed: %s", exc)
+
+		thread = threading.Thread(target=run, name="groq-warmup", daemon=True)
+		thread.start()
+		return thread
+
+	def latency(self) -> Dict[str, EndpointStats]:
+		with self._lock:
+			return dict(self._stats)
+
+	def latency_summary(self) -> str:
+		return "; ".join(f"{endpoint}: {stats.summary()}" for endpoint, stats in sorted(self.latency().items()))
+
+	def close(self) -> None:
+		with self._lock:
+			if self._http is not None:
+				self._http.close()
+			self._http = None
+			self._client = None
+
+	async def aclose(self) -> None:
+		with self._lock:
+			http, self._async_http = self._async_http, None
+			self._async_client = None
+		if http is not None:
+			await http.aclose()
+
+	def _record(self, request: "httpx.Request", started: float, *, error: bool) -> None:
+		path = request.url.path
+		if self._base_path and path.startswith(self._base_path):
+			path = path[len(self._base_path):]
+		endpoint = f"{request.method} {path}"
+		millis = (time.perf_counter() - started) * 1000.0
+		with self._lock:
+			stats = self._stats.get(endpoint)
+			if stats is None:
+				stats = self._stats[endpoint] = EndpointStats()
+			stats.record(millis, error=error)
@@ -1,14 +1,41 @@
 from __future__ import annotations
 
-import io
-import os
-from dataclasses import dataclass
-from typing import Any, Optional
+import difflib
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import speech_recognition as sr
-from openai import OpenAI
 
-from voice_assistant.utils.helpers import normalize_text
+from voice_assistant.config import resolve_path
+from voice_assistant.core import dsp
+from voice_assistant.core.audio_encoder import EncoderConfig, UploadEncoder
+from voice_assistant.core.audio_stream import CaptureConfig, CaptureStream, TappedSource
+from voice_assistant.core.endpointer import AdaptiveEndpointer, EndpointDecision, EndpointerConfig
+from voice_assistant.core.providers import GroqProvider
+from voice_assistant.core.resilience import OPEN, BreakerConfig, CircuitBreaker, hedged_call
+from voice_assistant.core.streaming import StreamingConfig, StreamingSession
+from voice_assistant.core.vad import VADConfig, VADResult, VoiceActivityDetector
+from voice_assistant.core.wake_word import WakeDetection, WakeWordConfig, WakeWordDetector
+from voice_assistant.utils.helpers import strip_punctuation
+from voice_assistant.utils.tracing import get_tracer
+
+
+# Common STT spellings of wake word tokens, folded before fuzzy matching.
+WAKE_TOKEN_ALIASES: Dict[str, str] = {
+	"okay": "ok",
+	"okey": "ok",
+}
+
+# Trailing audio (seconds) after a local wake word match that is treated as
+# an inline command rather than silence or noise.
+INLINE_COMMAND_MIN_SECONDS = 0.5
+
+
+class TranscriptionError(RuntimeError):
+	"""Raised when no STT provider could transcribe the audio."""
 
 
 @dataclass
@@ -17,75 +44,464 @@ class RecognizerConfig:
 	language: str
 	use_groq: bool
 	groq_model: str
+	capture: Optional[CaptureConfig] = None
+	wake_detector: Optional[WakeWordConfig] = None
+	wake_word_tolerance: float = 0.8
+	upload: Optional[EncoderConfig] = None
+	vad: Optional[VADConfig] = None
+	# Start the fallback STT provider if the primary has not answered after
+	# this many seconds (None: only fall back after a failure).
+	hedge_after: Optional[float] = 1.5
+	breaker: BreakerConfig = field(default_factory=BreakerConfig)
+	streaming: Optional[StreamingConfig] = None
+	endpointer: Optional[EndpointerConfig] = None
 
 
 class SpeechRecognizer:
 	"""Wrapper around microphone + Groq/OpenAI-compatible STT.
 
-	Uses Groq's OpenAI-compatible audio transcription endpoint when
-	``use_groq`` is True and ``GROQ_API_KEY`` is configured; otherwise
+	Uses Groq's OpenAI-compatible audio transcription endpoint (through the
+	shared ``provider`` client) when ``use_groq`` is True and
+	``GROQ_API_KEY`` is configured; otherwise
 	falls back to the local Google Web Speech API via SpeechRecognition.
+
+	When ``config.capture`` is set, the microphone is kept open by a
+	:class:`CaptureStream` and calibrated in the background, so
+	``listen_once`` has no per-call device or calibration cost.
+
+	When ``config.wake_detector`` is set, wake attempts are scored locally
+	by :class:`WakeWordDetector` and never reach the STT provider.
+
+	When ``config.vad`` is set, leading/trailing non-speech is trimmed
+	before transcription and utterances with no speech are dropped without
+	calling any provider. Audio is then re-encoded by
+	:class:`UploadEncoder` (16 kHz mono FLAC by default) before it is sent
+	to Groq.
+
+	Each STT provider has a :class:`CircuitBreaker`; slow Groq requests are
+	hedged with Google (see ``transcribe``). With ``config.streaming`` set,
+	``listen_once`` transcribes while the user is still speaking.
+
+	With ``config.endpointer`` set, the end of each utterance is decided by
+	an :class:`AdaptiveEndpointer` instead of SpeechRecognition's fixed
+	pause threshold; ``last_endpoint`` describes the latest decision.
 	"""
 
-	def __init__(self, logger, config: RecognizerConfig) -> None:
+	def __init__(
+		self,
+		logger,
+		config: RecognizerConfig,
+		provider: Optional[GroqProvider] = None,
+		source_factory: Optional[Callable[[], Any]] = None,
+	) -> None:
 		self.logger = logger
 		self.config = config
 		self._recognizer = sr.Recognizer()
-		self._client: Optional[OpenAI] = None
+		self._provider = provider
+		self.tracer = get_tracer()
+		# Consecutive capture failures, so callers can back off a broken microphone.
+		self.microphone_failures = 0
+		# Most recent captured utterance and its transcript (for the flight recorder).
+		self.last_audio: Optional[sr.AudioData] = None
+		self.last_transcript: Optional[str] = None
+		self.last_endpoint: Optional[EndpointDecision] = None
+		self.endpointer = AdaptiveEndpointer(self.config.endpointer) if self.config.endpointer is not None else None
+		self.encoder = UploadEncoder(self.logger, self.config.upload)
+		self._vad = VoiceActivityDetector(self.config.vad) if self.config.vad is not None else None
+		self._breakers = {
+			name: CircuitBreaker(f"{name} STT", self.config.breaker, self.logger) for name in ("groq", "google")
+		}
+		self._hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="stt-hedge")
+		self._source_factory = source_factory or sr.Microphone
+		self._capture: Optional[CaptureStream] = None
+		if self.config.capture is not None:
+			self._capture = CaptureStream(self.logger, self._recognizer, self.config.capture, source_factory)
+
+		self._wake_key = self._wake_token_key(self.config.wake_word.split())
+		self._last_wake_audio: Optional[sr.AudioData] = None
+		self._wake_detector: Optional[WakeWordDetector] = None
+		if self.config.wake_detector is not None:
+			self._wake_detector = self._load_wake_detector(self.config.wake_detector)
 
 		if self.config.use_groq:
-			api_key = os.getenv("GROQ_API_KEY")
-			if not api_key:
+			if provider is None or not provider.available:
 				self.logger.warning("GROQ_API_KEY not set; disabling Groq STT.")
 				self.config.use_groq = False
-			else:
-				self._client = OpenAI(
-					api_key=api_key,
-					base_url="https://api.groq.com/openai/v1",
-				)
 
-	def listen_once(self, *, timeout: float = 5.0, phrase_time_limit: float = 10.0) -> Optional[str]:
-		"""Capture a single utterance from the default microphone and transcribe it."""
+	@property
+	def has_local_wake_word(self) -> bool:
+		return self._wake_detector is not None
+
+	def _load_wake_detector(self, config: WakeWordConfig) -> Optional[WakeWordDetector]:
+		paths = [resolve_path(p) for p in config.templates]
+		missing = [str(p) for p in paths if not p.exists()]
+		if missing:
+			self.logger.warning("Wake word templates not found (%s); using STT wake word.", ", ".join(missing))
+			return None
+		try:
+			detector = WakeWordDetector.from_wav_files(config, paths)
+		except Exception as exc:
+			self.logger.warning("Failed to train wake word detector; using STT wake word: %s", exc)
+			return None
+		self.logger.info("Local wake word detector ready (%d templates, threshold %.3f).", len(paths), detector.threshold)
+		return detector
+
+	def enable_barge_in(self, callback, *, is_active) -> bool:
+		"""Call ``callback`` when the user talks over active speech output.
+
+		Requires the persistent capture stream; returns ``False`` otherwise.
+		"""
+
+		if self._capture is None:
+			return False
+		self._capture.set_barge_in(callback, is_active=is_active)
+		return True
+
+	def prepare(self, *, wait: float = 2.0) -> None:
+		"""Open the microphone and calibrate it before the first ``listen_once``.
+
+		Only the persistent capture stream can be prepared; without it the
+		device is opened for every utterance.
+		"""
+
+		if self._capture is not None:
+			self._capture.wait_ready(wait=wait)
+
+	def listen_for_wake_word(self, *, phrase_time_limit: float = 5.0) -> Optional[WakeDetection]:
+		"""Capture one utterance and score it with the local wake word detector.
+
+		Returns ``None`` if nothing was captured. No audio is sent to the STT
+		provider.
+		"""
+
+		if self._wake_detector is None:
+			raise RuntimeError("Local wake word detection is not configured.")
 
 		try:
-			with sr.Microphone() as source:
-				self.logger.info("Adjusting for ambient noise...")
-				self._recognizer.adjust_for_ambient_noise(source, duration=0.5)
-				self.logger.info("Listening for speech input...")
-				audio = self._recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+			audio = self._capture_audio(timeout=None, phrase_time_limit=phrase_time_limit)
+		except Exception as exc:
+			self.microphone_failures += 1
+			self.logger.error("Microphone error: %s", exc)
+			return None
+		self.microphone_failures = 0
+
+		with self.tracer.span("wake"):
+			detection = self._wake_detector.detect(_audio_samples(audio), audio.sample_rate)
+		self.logger.debug("Wake word score %.3f (threshold %.3f)", detection.score, self._wake_detector.threshold)
+		self._last_wake_audio = audio if detection.detected else None
+		return detection
+
+	def command_after_wake(self, detection: WakeDetection) -> Optional[str]:
+		"""Transcribe a command spoken in the same utterance as the wake word.
+
+		Returns ``None`` when the detected utterance ends with the wake word,
+		in which case the caller should listen for the command separately.
+		"""
+
+		audio, self._last_wake_audio = self._last_wake_audio, None
+		if audio is None or detection.duration_seconds - detection.end_seconds < INLINE_COMMAND_MIN_SECONDS:
+			return None
+
+		text = self._transcribe_audio(audio)
+		if not text:
+			return None
+		remainder = self.split_wake_word(text)
+		return text if remainder is None else (remainder or None)
+
+	def listen_once(
+		self,
+		*,
+		timeout: float = 5.0,
+		phrase_time_limit: Optional[float] = None,
+		on_partial: Optional[Callable[[str], None]] = None,
+	) -> Optional[str]:
+		"""Capture a single utterance from the default microphone and transcribe it.
+
+		With ``config.streaming`` set, the utterance is transcribed
+		incrementally while it is spoken and ``on_partial`` receives each
+		partial transcript. ``phrase_time_limit`` defaults to the
+		endpointer's ``max_phrase_seconds`` (10 seconds without one).
+		"""
+
+		if phrase_time_limit is None:
+			phrase_time_limit = self.endpointer.config.max_phrase_seconds if self.endpointer is not None else 10.0
+		session: Optional[StreamingSession] = None
+		try:
+			if self.config.streaming is not None:
+				audio, session = self._capture_streaming(timeout, phrase_time_limit, on_partial)
+			else:
+				audio = self._capture_audio(timeout=timeout, phrase_time_limit=phrase_time_limit)
 		except Exception as exc:
+			# A timeout only means nobody spoke; the microphone itself works.
+			self.microphone_failures = 0 if isinstance(exc, sr.WaitTimeoutError) else self.microphone_failures + 1
 			self.logger.error("Microphone error: %s", exc)
 			return None
+		self.microphone_failures = 0
 
+		if session is not None:
+			with self.tracer.span("stt.final"):
+				text = session.finish()
+			if text:
+				self.logger.info("Streaming transcript ready after %d partial requests.", session.partials)
+				self.last_transcript = text
+				return text
 		return self._transcribe_audio(audio)
 
-	def _transcribe_audio(self, audio: sr.AudioData) -> Optional[str]:
-		if self.config.use_groq and self._client is not None:
-			try:
-				wav_bytes = audio.get_wav_data()
-				file_obj = io.BytesIO(wav_bytes)
-				file_obj.name = "audio.wav"
-
-				self.logger.info("Sending audio to Groq STT model '%s'", self.config.groq_model)
-				response = self._client.audio.transcriptions.create(
-					model=self.config.groq_model,
-					file=file_obj,
+	def _capture_audio(
+		self,
+		*,
+		timeout: Optional[float],
+		phrase_time_limit: float,
+		tap: Optional[Callable[[sr.AudioSource], sr.AudioSource]] = None,
+		transcript: Optional[Callable[[], Optional[str]]] = None,
+	) -> sr.AudioData:
+		self.last_audio = self.last_transcript = None
+		self.last_endpoint = None
+		with self.tracer.span("capture", wait=True):
+			audio = self._listen(timeout=timeout, phrase_time_limit=phrase_time_limit, tap=tap, transcript=transcript)
+		self.last_audio = audio
+		return audio
+
+	def _capture_streaming(
+		self,
+		timeout: Optional[float],
+		phrase_time_limit: float,
+		on_partial: Optional[Callable[[str], None]],
+	) -> Tuple[sr.AudioData, StreamingSession]:
+		holder: List[StreamingSession] = []
+
+		def tap(source: sr.AudioSource) -> sr.AudioSource:
+			session = StreamingSession(
+				self.logger,
+				self.config.streaming,
+				sample_rate=source.SAMPLE_RATE,
+				sample_width=source.SAMPLE_WIDTH,
+				transcribe=self._transcribe_partial,
+				executor=self._hedge_pool,
+				energy_threshold=lambda: self._recognizer.energy_threshold,
+				on_partial=on_partial,
+			)
+			holder.append(session)
+			return TappedSource(source, session.feed)
+
+		audio = self._capture_audio(
+			timeout=timeout,
+			phrase_time_limit=phrase_time_limit,
+			tap=tap,
+			transcript=lambda: holder[0].text if holder else None,
+		)
+		return audio, holder[0]
+
+	def _listen(
+		self,
+		*,
+		timeout: Optional[float],
+		phrase_time_limit: float,
+		tap: Optional[Callable[[sr.AudioSource], sr.AudioSource]] = None,
+		transcript: Optional[Callable[[], Optional[str]]] = None,
+	) -> sr.AudioData:
+		if self._capture is not None:
+			with self._capture.open_reader() as source:
+				self.logger.debug("Listening for speech input...")
+				return self._record(tap(source) if tap else source, timeout, phrase_time_limit, transcript)
+
+		with self._source_factory() as source:
+			self.logger.debug("Adjusting for ambient noise...")
+			self._recognizer.adjust_for_ambient_noise(source, duration=0.5)
+			self.logger.debug("Listening for speech input...")
+			return self._record(tap(source) if tap else source, timeout, phrase_time_limit, transcript)
+
+	def _record(
+		self,
+		source: sr.AudioSource,
+		timeout: Optional[float],
+		phrase_time_limit: float,
+		transcript: Optional[Callable[[], Optional[str]]],
+	) -> sr.AudioData:
+		if self.endpointer is None:
+			return self._recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+
+		audio, decision = self.endpointer.listen(
+			self._recognizer, source, timeout=timeout, phrase_time_limit=phrase_time_limit, transcript=transcript
+		)
+		self.last_endpoint = decision
+		self.tracer.record("endpoint", decision.wait_ms)
+		self.logger.debug(
+			"Endpoint (%s) after %.0fms of silence: %.1fs of speech, learned pause %.0fms.",
+			decision.reason,
+			decision.wait_ms,
+			decision.speech_seconds,
+			decision.learned_seconds * 1000.0,
+		)
+		return audio
+
+	def _transcribe_partial(self, audio: sr.AudioData) -> Optional[str]:
+		"""Primary provider only: no VAD, no hedging, failures are not fatal."""
+
+		name, method = self._stt_providers()[0]
+		try:
+			with self.tracer.span("stt.partial"):
+				return self._call_provider(name, method, audio)
+		except Exception as exc:
+			self.logger.debug("Partial transcription failed: %s", exc)
+			return None
+
+	def close(self) -> None:
+		if self._capture is not None:
+			self._capture.stop()
+		self._hedge_pool.shutdown(wait=False)
+
+	def transcribe(self, audio: sr.AudioData) -> Optional[str]:
+		"""Transcribe ``audio`` with Groq, hedged with or falling back to Google.
+
+		Providers whose circuit is open are skipped. If Groq has not answered
+		within ``hedge_after`` seconds, Google is started concurrently and
+		the first answer wins. Returns ``None`` if the audio contained no
+		recognizable speech and raises :class:`TranscriptionError` if every
+		provider failed.
+		"""
+
+		if self._vad is not None:
+			with self.tracer.span("vad"):
+				audio = self.trim_silence(audio)
+			if audio is None:
+				return None
+
+		calls = [
+			(name, functools.partial(self._call_provider, name, method, audio))
+			for name, method in self._stt_providers()
+		]
+		try:
+			with self.tracer.span("stt"):
+				return hedged_call(
+					self._hedge_pool,
+					calls,
+					hedge_after=self.config.hedge_after,
+					on_hedge=lambda name: self.logger.info(
+						"STT slower than %.1fs; hedging with %s.", self.config.hedge_after, name
+					),
 				)
-				text = getattr(response, "text", None) or getattr(response, "output_text", None)
-				if not text:
-					self.logger.error("Groq STT response did not contain text field.")
-					return None
-				return text.strip()
-			except Exception as exc:
-				self.logger.error("Groq STT failed, falling back to Google: %s", exc)
+		except Exception as exc:
+			raise TranscriptionError(str(exc)) from exc
+
+	def _stt_providers(self) -> List[Tuple[str, Callable[[sr.AudioData], Optional[str]]]]:
+		providers: List[Tuple[str, Callable[[sr.AudioData], Optional[str]]]] = []
+		if self.config.use_groq and self._provider is not None:
+			providers.append(("groq", self._transcribe_groq))
+		providers.append(("google", self._transcribe_google))
 
+		healthy = [p for p in providers if self._breakers[p[0]].state != OPEN]
+		# With every circuit open, trying anyway beats failing outright.
+		return healthy or providers
+
+	def _call_provider(self, name: str, method, audio: sr.AudioData) -> Optional[str]:
+		breaker = self._breakers[name]
+		# An open circuit only gets here when every provider is open; a
+		# half-open one admits a single probe at a time.
+		if breaker.state != OPEN and not breaker.allow():
+			raise TranscriptionError(f"{name} STT circuit is half-open and already probing")
+		started = time.perf_counter()
 		try:
-			text = self._recognizer.recognize_google(audio, language=self.config.language)
-			return text.strip()
+			text = method(audio)
 		except Exception as exc:
+			breaker.record((time.perf_counter() - started) * 1000.0, error=True)
+			self.logger.error("%s STT failed: %s", name.capitalize(), exc)
+			raise
+		breaker.record((time.perf_counter() - started) * 1000.0)
+		return text
+
+	def _transcribe_groq(self, audio: sr.AudioData) -> Optional[str]:
+		with self.tracer.span("stt.encode"):
+			encoded = self.encoder.encode(audio)
+		self.logger.info(
+			"Sending %d bytes of %s audio to Groq STT model '%s'",
+			len(encoded.payload),
+			encoded.format,
+			self.config.groq_model,
+		)
+		with self.tracer.span("stt.groq"):
+			response = self._provider.client.audio.transcriptions.create(
+				model=self.config.groq_model,
+				file=encoded.as_upload(),
+			)
+		text = getattr(response, "text", None) or getattr(response, "output_text", None)
+		if not text:
+			self.logger.error("Groq STT response did not contain text field.")
+			return None
+		return text.strip()
+
+	def _transcribe_google(self, audio: sr.AudioData) -> Optional[str]:
+		try:
+			with self.tracer.span("stt.google"):
+				text = self._recognizer.recognize_google(audio, language=self.config.language)
+		except sr.UnknownValueError:
+			self.logger.info("No speech recognized.")
+			return None
+		return text.strip()
+
+	def trim_silence(self, audio: sr.AudioData) -> Optional[sr.AudioData]:
+		"""Cut ``audio`` to its speech span, or return ``None`` if it has none."""
+
+		result: VADResult = self._vad.analyze(_audio_samples(audio), audio.sample_rate)
+		if not result.has_speech:
+			self.logger.info("No speech detected in %.2fs of audio; skipping STT.", result.duration_seconds)
+			return None
+
+		self.logger.info(
+			"VAD kept %.2fs of %.2fs (trimmed %.2fs).",
+			result.kept_seconds,
+			result.duration_seconds,
+			result.trimmed_seconds,
+		)
+		frame_bytes = audio.sample_width
+		start = int(result.start_seconds * audio.sample_rate) * frame_bytes
+		end = int(result.end_seconds * audio.sample_rate) * frame_bytes
+		if start == 0 and end >= len(audio.frame_data):
+			return audio
+		return sr.AudioData(audio.frame_data[start:end], audio.sample_rate, audio.sample_width)
+
+	def _transcribe_audio(self, audio: sr.AudioData) -> Optional[str]:
+		try:
+			text = self.transcribe(audio)
+		except TranscriptionError as exc:
 			self.logger.error("Speech recognition failed: %s", exc)
 			return None
+		if audio is self.last_audio:
+			self.last_transcript = text
+		return text
 
 	def is_wake_word(self, text: str) -> bool:
-		return normalize_text(text) == normalize_text(self.config.wake_word)
+		return self.split_wake_word(text) == ""
+
+	def split_wake_word(self, text: str) -> Optional[str]:
+		"""Strip a leading wake phrase from ``text``.
+
+		Returns the remaining command (``""`` if the transcript is only the
+		wake phrase) or ``None`` if ``text`` does not start with it. Matching
+		ignores punctuation and spacing and tolerates small misspellings such
+		as "okay google" or "ok gogle".
+		"""
+
+		tokens = strip_punctuation(text).split()
+		wake_len = len(self.config.wake_word.split())
+		best_ratio, best_k = 0.0, 0
+		for k in range(1, min(len(tokens), wake_len + 1) + 1):
+			ratio = difflib.SequenceMatcher(None, self._wake_token_key(tokens[:k]), self._wake_key).ratio()
+			if ratio > best_ratio:
+				best_ratio, best_k = ratio, k
+
+		if best_ratio < self.config.wake_word_tolerance:
+			return None
+		return " ".join(tokens[best_k:])
+
+	@staticmethod
+	def _wake_token_key(tokens) -> str:
+		return "".join(WAKE_TOKEN_ALIASES.get(t, t) for t in strip_punctuation(" ".join(tokens)).split())
+
+
+def _audio_samples(audio: sr.AudioData):
+	"""Return ``audio`` as mono float32 samples."""
 
+	if audio.sample_width == 2:
+		return dsp.pcm_to_float(audio.frame_data, 2)
+	return dsp.pcm_to_float(audio.get_raw_data(convert_width=2), 2)
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+# File layout (all integers little-endian):
+#
+#   MAGIC
+#   chunk*            tag (4s) | payload length (u32) | crc32 (u32) | payload
+#   [INDX chunk]      written on close: one _ENTRY per turn
+#   [footer]          offset of the INDX chunk (u64) | FOOTER_TAG
+#
+# Chunks are only ever appended and flushed one at a time, so a session cut
+# short by a crash loses at most the turn being written; its index is then
+# rebuilt by walking the chunk headers.
+MAGIC = b"VAREC\x001\n"
+FOOTER_TAG = b"VIDX"
+SUFFIX = ".varec"
+
+_CHUNK = struct.Struct("<4sII")
+# turn chunk offset, turn payload length, audio chunk offset, audio payload length, start time
+_ENTRY = struct.Struct("<QIQId")
+_FOOTER = struct.Struct("<Q4s")
+
+_META, _AUDIO, _TURN, _INDEX = b"META", b"AUDI", b"TURN", b"INDX"
+
+
+class RecordingError(ValueError):
+	"""Raised for files that are not (readable) session recordings."""
+
+
+@dataclass
+class RecorderConfig:
+	directory: Path = Path(".cache/recordings")
+	audio: bool = True
+	# Audio is stored as 16-bit mono PCM at this rate (0: keep the capture rate).
+	audio_sample_rate: int = 16000
+	# Oldest session files beyond this many are deleted on start.
+	max_sessions: int = 20
+
+	@classmethod
+	def from_settings(cls, recorder_settings: Dict[str, Any]) -> "RecorderConfig":
+		from voice_assistant.config import resolve_path
+
+		return cls(
+			directory=resolve_path(recorder_settings.get("path", ".cache/recordings")),
+			audio=recorder_settings.get("audio", True),
+			audio_sample_rate=int(recorder_settings.get("audio_sample_rate", 16000)),
+			max_sessions=int(recorder_settings.get("max_sessions", 20)),
+		)
+
+
+@dataclass
+class TurnRecord:
+	"""Everything recorded about one turn; filled in while the turn runs."""
+
+	mode: str
+	started: float = field(default_factory=time.time)
+	correlation: Optional[str] = None
+	# Raw transcript of the captured utterance (voice mode) and the command
+	# that was routed after the wake word was stripped.
+	heard: Optional[str] = None
+	command: Optional[str] = None
+	route: Optional[Dict[str, Any]] = None
+	# How the utterance was endpointed (reason, wait and speech seconds).
+	endpoint: Optional[Dict[str, Any]] = None
+	response: Optional[str] = None
+	outcome: Optional[str] = None
+	spans: Dict[str, float] = field(default_factory=dict)
+	turn_ms: float = 0.0
+	sample_rate: int = 0
+	# Captured ``(frame_data, sample_rate, sample_width)``; converted and
+	# written as a separate chunk, never serialized into the turn chunk.
+	audio: Optional[Tuple[bytes, int, int]] = field(default=None, repr=False)
+
+	def to_dict(self) -> Dict[str, Any]:
+		data = asdict(self)
+		del data["audio"]
+		return data
+
+
+def describe_route(route: Any) -> Dict[str, Any]:
+	"""The parts of a :class:`RouteResult` that are recorded and compared on replay."""
+
+	return {
+		"intent": route.intent,
+		"matched_by": route.matched_by,
+		"confidence": None if route.confidence is None else round(route.confidence, 3),
+		"args": [str(arg) for arg in route.args],
+		"suggestions": list(route.suggestions),
+	}
+
+
+@dataclass
+class IndexEntry:
+	number: int
+	offset: int
+	length: int
+	audio_offset: int
+	audio_length: int
+	started: float
+
+
+class FlightRecorder:
+	"""Append each turn of a session to a chunked, indexed recording file.
+
+	Writes happen on a single background thread, so committing a turn only
+	costs queueing it. Read recordings back with :class:`Recording`.
+	"""
+
+	def __init__(self, logger, config: RecorderConfig, meta: Optional[Dict[str, Any]] = None) -> None:
+		self.logger = logger
+		self.config = config
+		self.config.directory.mkdir(parents=True, exist_ok=True)
+		self._prune()
+		stamp = time.strftime("%Y%m%d-%H%M%S")
+		self.path = self.config.directory / f"session-{stamp}-{os.getpid()}{SUFFIX}"
+		self._file = self.path.open("xb")
+		self._file.write(MAGIC)
+		self._write_chunk(_META, json.dumps({"version": 1, "created": time.time(), **(meta or {})}).encode("utf-8"))
+		self._entries: List[IndexEntry] = []
+		self._lock = threading.Lock()
+		self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recorder")
+		self._closed = False
+		self.logger.info("Recording session to %s", self.path)
+
+	def begin(self, mode: str, correlation: Optional[str] = None) -> TurnRecord:
+		return TurnRecord(mode=mode, correlation=correlation)
+
+	def commit(self, record: TurnRecord) -> None:
+		if not self.config.audio:
+			record.audio = None
+		with self._lock:
+			if self._closed:
+				return
+			self._writer.submit(self._append, record)
+
+	def close(self) -> None:
+		with self._lock:
+			if self._closed:
+				return
+			self._closed = True
+		self._writer.shutdown(wait=True)
+		try:
+			index = b"".join(
+				_ENTRY.pack(e.offset, e.length, e.audio_offset, e.audio_length, e.started) for e in self._entries
+			)
+			offset = self._write_chunk(_INDEX, index)
+			self._file.write(_FOOTER.pack(offset, FOOTER_TAG))
+		finally:
+			self._file.close()
+		self.logger.info("Recorded %d turns to %s", len(self._entries), self.path)
+
+	@property
+	def turns(self) -> int:
+		return len(self._entries)
+
+	def _append(self, record: TurnRecord) -> None:
+		try:
+			audio_offset = audio_length = 0
+			if record.audio is not None:
+				pcm, record.sample_rate = _pcm16(*record.audio, self.config.audio_sample_rate)
+				audio_offset = self._write_chunk(_AUDIO, pcm)
+				audio_length = len(pcm)
+			payload = json.dumps(record.to_dict(), ensure_ascii=False, default=str).encode("utf-8")
+			offset = self._write_chunk(_TURN, payload)
+			self._file.flush()
+		except OSError as exc:
+			self.logger.warning("Could not record turn: %s", exc)
+			return
+		self._entries.append(
+			IndexEntry(len(self._entries), offset, len(payload), audio_offset, audio_length, record.started)
+		)
+
+	def _write_chunk(self, tag: bytes, payload: bytes) -> int:
+		"""Append one chunk; returns the offset of its payload."""
+
+		offset = self._file.tell() + _CHUNK.size
+		self._file.write(_CHUNK.pack(tag, len(payload), zlib.crc32(payload)))
+		self._file.write(payload)
+		return offset
+
+	def _prune(self) -> None:
+		sessions = sorted(self.config.directory.glob(f"session-*{SUFFIX}"), key=lambda p: p.stat().st_mtime)
+		for path in sessions[: max(0, len(sessions) - self.config.max_sessions + 1)]:
+			path.unlink(missing_ok=True)
+
+
+class Recording:
+	"""Read-only, memory-mapped view of a session recording.
+
+	Opening a recording reads only the header and the index; turns and
+	their audio are decoded on access, so any turn of a long session can
+	be inspected without loading the rest.
+	"""
+
+	def __init__(self, path: Path) -> None:
+		self.path = path
+		with path.open("rb") as handle:
+			try:
+				self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+			except ValueError as exc:
+				raise RecordingError(f"{path}: empty file") from exc
+		if self._map[: len(MAGIC)] != MAGIC:
+			self._map.close()
+			raise RecordingError(f"{path}: not a session recording")
+		tag, offset, length = self._chunk_at(len(MAGIC))
+		self.meta: Dict[str, Any] = json.loads(self._payload(offset, length)) if tag == _META else {}
+		self.complete, self.entries = self._read_index()
+
+	def __len__(self) -> int:
+		return len(self.entries)
+
+	def __iter__(self) -> Iterator[Tuple[IndexEntry, Dict[str, Any]]]:
+		for number in range(len(self.entries)):
+			yield self.entries[number], self.turn(number)
+
+	def __enter__(self) -> "Recording":
+		return self
+
+	def __exit__(self, *exc_info) -> None:
+		self.close()
+
+	def close(self) -> None:
+		self._map.close()
+
+	def turn(self, number: int) -> Dict[str, Any]:
+		entry = self.entries[number]
+		return json.loads(self._payload(entry.offset, entry.length, verify=True))
+
+	def audio(self, number: int) -> Optional[bytes]:
+		"""16-bit mono PCM of the turn (sample rate in the turn's ``sample_rate``)."""
+
+		entry = self.entries[number]
+		if not entry.audio_length:
+			return None
+		return self._payload(entry.audio_offset, entry.audio_length, verify=True)
+
+	def _read_index(self) -> Tuple[bool, List[IndexEntry]]:
+		size = len(self._map)
+		if size >= len(MAGIC) + _FOOTER.size:
+			offset, tag = _FOOTER.unpack_from(self._map, size - _FOOTER.size)
+			if tag == FOOTER_TAG and _CHUNK.size <= offset <= size - _FOOTER.size:
+				chunk_tag, length, _ = _CHUNK.unpack_from(self._map, offset - _CHUNK.size)
+				if chunk_tag == _INDEX and length % _ENTRY.size == 0:
+					return True, [
+						IndexEntry(number, *fields)
+						for number, fields in enumerate(_ENTRY.iter_unpack(self._map[offset : offset + length]))
+					]
+		return False, self._scan()
+
+	def _scan(self) -> List[IndexEntry]:
+		"""Rebuild the index of a recording that was not closed cleanly."""
+
+		entries: List[IndexEntry] = []
+		position = len(MAGIC)
+		audio: Tuple[int, int] = (0, 0)
+		while True:
+			try:
+				tag, offset, length = self._chunk_at(position)
+			except RecordingError:
+				break
+			if tag == _AUDIO:
+				audio = (offset, length)
+			elif tag == _TURN:
+				try:
+					started = float(json.loads(self._payload(offset, length, verify=True)).get("started", 0.0))
+				except (RecordingError, ValueError):
+					break
+				entries.append(IndexEntry(len(entries), offset, length, audio[0], audio[1], started))
+				audio = (0, 0)
+			position = offset + length
+		return entries
+
+	def _chunk_at(self, position: int) -> Tuple[bytes, int, int]:
+		if position + _CHUNK.size > len(self._map):
+			raise RecordingError(f"{self.path}: truncated at byte {position}")
+		tag, length, _ = _CHUNK.unpack_from(self._map, position)
+		offset = position + _CHUNK.size
+		if offset + length > len(self._map):
+			raise RecordingError(f"{self.path}: truncated chunk at byte {position}")
+		return tag, offset, length
+
+	def _payload(self, offset: int, length: int, *, verify: bool = False) -> bytes:
+		payload = self._map[offset : offset + length]
+		if verify:
+			_, _, crc = _CHUNK.unpack_from(self._map, offset - _CHUNK.size)
+			if zlib.crc32(payload) != crc:
+				raise RecordingError(f"{self.path}: corrupt chunk at byte {offset - _CHUNK.size}")
+		return payload
+
+
+def _pcm16(frame_data: bytes, sample_rate: int, sample_width: int, target_rate: int) -> Tuple[bytes, int]:
+	if sample_width == 2 and (not target_rate or target_rate == sample_rate):
+		return bytes(frame_data), sample_rate
+
+	from voice_assistant.core.dsp import float_to_pcm16, pcm_to_float, resample
+
+	samples = pcm_to_float(frame_data, sample_width)
+	if target_rate:
+		samples, sample_rate = resample(samples, sample_rate, target_rate), target_rate
+	return float_to_pcm16(samples).tobytes(), sample_rate
+
+
+def find_recordings(directory: Path) -> List[Path]:
+	"""Session files in ``directory``, newest first."""
+
+	return sorted(directory.glob(f"session-*{SUFFIX}"), key=lambda p: p.stat().st_mtime, reverse=True)
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import collections
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+@dataclass
+class BreakerConfig:
+	window: int = 20
+	min_calls: int = 4
+	# Open when this share of recent calls failed or were slower than slow_ms...
+	error_rate: float = 0.5
+	slow_ms: float = 5000.0
+	# ...or after this many failures in a row.
+	consecutive_failures: int = 3
+	open_seconds: float = 30.0
+
+	@classmethod
+	def from_settings(cls, breaker_settings: Dict[str, Any]) -> "BreakerConfig":
+		return cls(
+			error_rate=float(breaker_settings.get("error_rate", 0.5)),
+			slow_ms=float(breaker_settings.get("slow_ms", 5000.0)),
+			consecutive_failures=int(breaker_settings.get("consecutive_failures", 3)),
+			open_seconds=float(breaker_settings.get("open_seconds", 30.0)),
+		)
+
+
+class CircuitBreaker:
+	"""Per-provider circuit breaker over a rolling window of outcomes.
+
+	While open, ``allow`` returns ``False`` so callers skip the provider.
+	After ``open_seconds`` a single probe call is let through (half-open);
+	its outcome closes or re-opens the circuit. Calls slower than
+	``slow_ms`` count as failures even if they eventually succeed.
+	"""
+
+	def __init__(self, name: str, config: BreakerConfig, logger=None, clock: Callable[[], float] = time.monotonic) -> None:
+		self.name = name
+		self.config = config
+		self.logger = logger
+		self._clock = clock
+		self._lock = threading.Lock()
+		self._outcomes: Deque[bool] = collections.deque(maxlen=config.window)
+		self._consecutive = 0
+		self._state = CLOSED
+		self._opened_at = 0.0
+		self._probing = False
+
+	@property
+	def state(self) -> str:
+		with self._lock:
+			self._maybe_half_open()
+			return self._state
+
+	def allow(self) -> bool:
+		with self._lock:
+			self._maybe_half_open()
+			if self._state == CLOSED:
+				return True
+			if self._state == HALF_OPEN and not self._probing:
+				self._probing = True
+				return True
+			return False
+
+	def record(self, millis: float, *, error: bool = False) -> None:
+		failed = error or millis > self.config.slow_ms
+		with self._lock:
+			self._outcomes.append(not failed)
+			self._consecutive = self._consecutive + 1 if failed else 0
+			if self._state == HALF_OPEN:
+				self._probing = False
+				if failed:
+					self._open("probe failed")
+				else:
+					self._transition(CLOSED, "probe succeeded")
+					self._outcomes.clear()
+				return
+			if self._state == CLOSED and failed and self._should_open():
+				self._open(f"{self._consecutive} consecutive failures" if self._tripped_by_streak() else "error rate")
+
+	def _should_open(self) -> bool:
+		if self._tripped_by_streak():
+			return True
+		if len(self._outcomes) < self.config.min_calls:
+			return False
+		failures = sum(1 for ok in self._outcomes if not ok)
+		return failures / len(self._outcomes) >= self.config.error_rate
+
+	def _tripped_by_streak(self) -> bool:
+		return self._consecutive >= self.config.consecutive_failures
+
+	def _open(self, reason: str) -> None:
+		self._opened_at = self._clock()
+		self._transition(OPEN, reason)
+
+	def _maybe_half_open(self) -> None:
+		if self._state == OPEN and self._clock() - self._opened_at >= self.config.open_seconds:
+			self._transition(HALF_OPEN, "cool-down elapsed")
+
+	def _transition(self, state: str, reason: str) -> None:
+		if state == self._state:
+			return
+		self._state = state
+		if self.logger is not None:
+			log = self.logger.warning if state == OPEN else self.logger.info
+			log("Circuit for %s is now %s (%s).", self.name, state, reason)
+
+
+def hedged_call(
+	executor: Executor,
+	calls: List[Tuple[str, Callable[[], T]]],
+	*,
+	hedge_after: Optional[float],
+	on_hedge: Optional[Callable[[str], None]] = None,
+) -> T:
+	"""Run ``calls`` in order of preference and return the first success.
+
+	The first call starts immediately. The next one is started when the
+	current one fails, or, if ``hedge_after`` is set, when it has not
+	finished within that many seconds; the slower request is abandoned
+	(its result is discarded). A ``None`` result (nothing recognized) only
+	wins once no other call is still running. Raises the last error if
+	every call fails.
+	"""
+
+	if not calls:
+		raise ValueError("hedged_call needs at least one call")
+
+	remaining = list(calls)
+	pending: Set[Future] = set()
+	errors: List[BaseException] = []
+	empty = False
+
+	def launch() -> None:
+		name, fn = remaining.pop(0)
+		if pending and on_hedge is not None:
+			on_hedge(name)
+		# Keep the caller's context (log correlation ID) on the worker thread.
+		pending.add(executor.submit(contextvars.copy_context().run, fn))
+
+	launch()
+	while pending:
+		timeout = hedge_after if remaining and hedge_after is not None else None
+		done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+		if not done:
+			launch()
+			continue
+		for future in done:
+			pending.discard(future)
+			try:
+				result = future.result()
+			except Exception as exc:
+				errors.append(exc)
+				continue
+			if result is not None or not pending:
+				return result
+			empty = True
+		if not pending and remaining and not empty:
+			launch()
+
+	if empty:
+		return None
+	raise errors[-1]
@@ -1,10 +1,32 @@
 from __future__ import annotations
 
-import os
+import collections
+import itertools
+import queue
+import threading
+import time
+import wave
 from dataclasses import dataclass
-from typing import Optional
+from pathlib import Path
+from typing import TYPE_CHECKING, Deque, List, Optional, Set
 
-import pyttsx3
+from voice_assistant.core.phrase_cache import PhraseCache
+from voice_assistant.core.providers import GroqProvider
+from voice_assistant.utils.tracing import get_tracer
+
+if TYPE_CHECKING:
+	import pyttsx3
+
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+_STOP = object()
+
+# How long the worker must be idle before it renders the next cached phrase.
+_RENDER_IDLE_SECONDS = 0.5
+_PLAYBACK_FRAMES = 1024
 
 
 @dataclass
@@ -14,53 +36,297 @@ class SpeakerConfig:
 	rate: int
 	volume: float
 	voice: Optional[str] = None
+	queue_size: int = 32
 
 
 class Speaker:
-	"""Text-to-speech abstraction."""
+	"""Text-to-speech abstraction.
+
+	Speech runs on a dedicated worker thread that owns the TTS engine, so
+	``speak`` only enqueues and returns immediately. Lower ``priority``
+	values are spoken first; ``flush`` drops pending utterances and
+	``interrupt`` additionally cuts off the one currently playing.
+
+	The ``null`` provider discards speech without loading an engine, for
+	benchmarks and headless runs.
 
-	def __init__(self, logger, config: SpeakerConfig) -> None:
+	With a :class:`PhraseCache`, fixed phrases (and the fixed parts of
+	templated ones) are played from pre-rendered clips instead of being
+	synthesized again. Missing clips are rendered by the worker while it is
+	idle, so precomputing never delays speech.
+	"""
+
+	def __init__(
+		self,
+		logger,
+		config: SpeakerConfig,
+		provider: Optional[GroqProvider] = None,
+		phrase_cache: Optional[PhraseCache] = None,
+	) -> None:
 		self.logger = logger
 		self.config = config
+		self.provider = provider
+		self.tracer = get_tracer()
+		self.phrase_cache = phrase_cache
+
+		self._engine: Optional["pyttsx3.Engine"] = None
+		self._audio = None
+		self._render_backlog: Deque[str] = collections.deque()
+		self._render_queued: Set[str] = set()
+		self._queue: "queue.PriorityQueue[tuple[int, int, int, object, float]]" = queue.PriorityQueue(
+			maxsize=max(1, config.queue_size)
+		)
+		self._seq = itertools.count()
+		# Bumped by flush(); queued items from an older generation are skipped.
+		# The lock keeps a flush from interleaving with an enqueue.
+		self._generation = 0
+		self._generation_lock = threading.Lock()
+		self._interrupt = threading.Event()
+		self._speaking = threading.Event()
+		self._idle = threading.Condition()
+		self._pending = 0
+		self._worker: Optional[threading.Thread] = None
+		# Set once the worker has loaded the engine (or there is none to load).
+		self._ready = threading.Event()
 
-		self._engine: Optional[pyttsx3.Engine] = None
 		if self.config.enabled:
-			self._setup_local_engine()
+			self._worker = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+			self._worker.start()
+		else:
+			self._ready.set()
 
-		if self.config.provider.lower() == "groq" and not os.getenv("GROQ_API_KEY"):
+		if self.config.provider.lower() == "groq" and (provider is None or not provider.available):
 			self.logger.warning("Groq TTS selected but GROQ_API_KEY not set; using local TTS.")
 
+	@property
+	def is_speaking(self) -> bool:
+		return self._speaking.is_set()
+
+	@property
+	def engine_available(self) -> bool:
+		return self._engine is not None
+
+	def wait_ready(self, timeout: Optional[float] = None) -> bool:
+		"""Wait for the worker to finish loading the TTS engine."""
+
+		return self._ready.wait(timeout=timeout)
+
 	def _setup_local_engine(self) -> None:
 		try:
+			import pyttsx3
+
 			engine = pyttsx3.init()
 			engine.setProperty("rate", self.config.rate)
 			engine.setProperty("volume", self.config.volume)
 			if self.config.voice:
 				engine.setProperty("voice", self.config.voice)
+			engine.connect("started-word", self._on_word)
 			self._engine = engine
 		except Exception as exc:
 			self.logger.error("Failed to initialize local TTS engine: %s", exc)
 			self._engine = None
 
-	def speak(self, text: str) -> None:
+	def _setup_phrase_cache(self) -> None:
+		if self.phrase_cache is None:
+			return
+		if self._engine is None:
+			self.phrase_cache = None
+			return
+		try:
+			import pyaudio
+
+			self._audio = pyaudio.PyAudio()
+		except Exception as exc:
+			self.logger.info("Audio output unavailable (%s); cached phrases are synthesized live.", exc)
+			self.phrase_cache = None
+			return
+
+		self.phrase_cache.set_voice(
+			voice=self._engine.getProperty("voice"),
+			rate=self.config.rate,
+			volume=self.config.volume,
+		)
+		if self.phrase_cache.config.precompute:
+			self._queue_renders(self.phrase_cache.missing())
+
+	def speak(self, text: str, *, priority: int = PRIORITY_NORMAL, flush: bool = False) -> None:
+		"""Queue ``text`` for speech and return immediately."""
+
 		if not self.config.enabled:
 			self.logger.info("TTS is disabled; skipping speech output.")
 			return
+		if flush:
+			self.flush()
+
+		with self._idle:
+			self._pending += 1
+		try:
+			with self._generation_lock:
+				self._queue.put_nowait((priority, next(self._seq), self._generation, text, time.perf_counter()))
+		except queue.Full:
+			self._done()
+			self.logger.warning("TTS queue full; dropping utterance: %s", text[:60])
+
+	def flush(self) -> None:
+		"""Drop all queued utterances that have not started playing."""
+
+		with self._generation_lock:
+			self._generation += 1
+			while True:
+				try:
+					item = self._queue.get_nowait()
+				except queue.Empty:
+					break
+				if item[3] is _STOP:
+					self._queue.put_nowait(item)
+					break
+				self._done()
+
+	def interrupt(self) -> None:
+		"""Stop the current utterance and drop everything queued (barge-in)."""
+
+		self.flush()
+		if self._speaking.is_set():
+			self.logger.debug("Interrupting speech output.")
+			self._interrupt.set()
+
+	def wait_until_idle(self, timeout: Optional[float] = None) -> bool:
+		with self._idle:
+			return self._idle.wait_for(lambda: self._pending == 0, timeout=timeout)
+
+	def close(self, *, timeout: float = 30.0) -> None:
+		"""Finish queued speech, then stop the worker thread."""
+
+		if self._worker is None:
+			return
+		with self._generation_lock:
+			generation = self._generation
+		self._queue.put((PRIORITY_LOW + 1, next(self._seq), generation, _STOP, 0.0))
+		self._worker.join(timeout=timeout)
+		self._worker = None
+
+	def _done(self) -> None:
+		with self._idle:
+			self._pending -= 1
+			if self._pending <= 0:
+				self._pending = 0
+				self._idle.notify_all()
+
+	def _run(self) -> None:
+		# pyttsx3 engines are bound to the thread that created them.
+		try:
+			if self.config.provider.lower() != "null":
+				self._setup_local_engine()
+				self._setup_phrase_cache()
+		finally:
+			self._ready.set()
+		while True:
+			try:
+				item = self._queue.get(timeout=_RENDER_IDLE_SECONDS if self._render_backlog else None)
+			except queue.Empty:
+				self._render_next()
+				continue
+			_, _, generation, text, queued = item
+			if text is _STOP:
+				break
+			with self._generation_lock:
+				current = generation == self._generation
+			try:
+				if current:
+					self.tracer.record("tts.queue", (time.perf_counter() - queued) * 1000.0)
+					with self.tracer.span("tts.play"):
+						self._speak(text)
+			finally:
+				self._done()
+		if self._audio is not None:
+			self._audio.terminate()
+			self._audio = None
 
+	def _speak(self, text: str) -> None:
 		provider = self.config.provider.lower()
+		if provider == "null":
+			return
 		if provider == "local" or self._engine is not None:
 			self._speak_local(text)
 		elif provider == "groq":
 			self.logger.info("Groq TTS not implemented yet, falling back to local TTS.")
 			self._speak_local(text)
 
+	def _on_word(self, name, location, length) -> None:
+		if self._interrupt.is_set() and self._engine is not None:
+			self._engine.stop()
+
 	def _speak_local(self, text: str) -> None:
 		if not self._engine:
 			self.logger.warning("Local TTS engine not available; cannot speak.")
 			return
+		segments = self.phrase_cache.segments(text) if self.phrase_cache is not None else [(text, None)]
+		self._interrupt.clear()
+		self._speaking.set()
 		try:
-			self._engine.say(text)
-			self._engine.runAndWait()
+			for segment, clip in segments:
+				if self._interrupt.is_set():
+					break
+				if clip is not None and self._play_clip(clip):
+					continue
+				self._engine.say(segment)
+				self._engine.runAndWait()
+				if self.phrase_cache is not None and self.phrase_cache.is_cacheable(segment):
+					self._queue_renders([segment])
 		except Exception as exc:
 			self.logger.error("Local TTS failed: %s", exc)
+		finally:
+			self._speaking.clear()
+			self._interrupt.clear()
+
+	def _play_clip(self, clip: Path) -> bool:
+		"""Play a cached clip; ``False`` if it could not be played."""
+
+		stream = None
+		try:
+			with wave.open(str(clip), "rb") as reader:
+				stream = self._audio.open(
+					format=self._audio.get_format_from_width(reader.getsampwidth()),
+					channels=reader.getnchannels(),
+					rate=reader.getframerate(),
+					output=True,
+				)
+				while not self._interrupt.is_set():
+					frames = reader.readframes(_PLAYBACK_FRAMES)
+					if not frames:
+						break
+					stream.write(frames)
+			return True
+		except Exception as exc:
+			self.logger.warning("Could not play cached clip (%s); disabling the phrase cache.", exc)
+			self.phrase_cache = None
+			return False
+		finally:
+			if stream is not None:
+				stream.stop_stream()
+				stream.close()
+
+	def _queue_renders(self, phrases: List[str]) -> None:
+		for phrase in phrases:
+			if phrase not in self._render_queued:
+				self._render_queued.add(phrase)
+				self._render_backlog.append(phrase)
 
+	def _render_next(self) -> None:
+		"""Render one missing phrase to the cache (worker thread, while idle)."""
+
+		phrase = self._render_backlog.popleft()
+		self._render_queued.discard(phrase)
+		if self.phrase_cache is None or self._engine is None or self.phrase_cache.lookup(phrase) is not None:
+			return
+		target = self.phrase_cache.path_for(phrase)
+		partial = target.with_name(f"{target.stem}.tmp.wav")
+		try:
+			self._engine.save_to_file(phrase, str(partial))
+			self._engine.runAndWait()
+		except Exception as exc:
+			self.logger.warning("Rendering %r for the phrase cache failed: %s", phrase[:40], exc)
+			partial.unlink(missing_ok=True)
+			return
+		if self.phrase_cache.store(phrase, partial) is not None:
+			self.logger.debug("Cached rendered phrase: %s", phrase[:60])
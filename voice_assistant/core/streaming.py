@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import collections
+import contextvars
+import difflib
+import threading
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import speech_recognition as sr
+
+from voice_assistant.core import dsp
+from voice_assistant.utils.helpers import strip_punctuation
+
+
+@dataclass
+class StreamingConfig:
+	# New speech audio between partial requests.
+	interval_seconds: float = 0.6
+	# Longest window sent per request; longer utterances are transcribed in
+	# overlapping windows and stitched.
+	window_seconds: float = 6.0
+	min_speech_seconds: float = 0.4
+	preroll_chunks: int = 3
+	final_wait_seconds: float = 3.0
+
+	@classmethod
+	def from_settings(cls, streaming_settings: Dict[str, Any]) -> "StreamingConfig":
+		return cls(
+			interval_seconds=float(streaming_settings.get("interval_seconds", 0.6)),
+			window_seconds=float(streaming_settings.get("window_seconds", 6.0)),
+		)
+
+
+class StreamingSession:
+	"""Incremental transcription of one utterance while it is being spoken.
+
+	``feed`` receives every captured chunk (on the capture/listen thread).
+	Once speech starts, a partial request is issued every
+	``interval_seconds`` of new audio (at most one in flight) for the last
+	``window_seconds``; each result is stitched onto the running hypothesis
+	and passed to ``on_partial``. ``finish`` returns the final text as soon
+	as a partial has covered all of the speech, which usually happens
+	during the endpointing pause.
+	"""
+
+	def __init__(
+		self,
+		logger,
+		config: StreamingConfig,
+		*,
+		sample_rate: int,
+		sample_width: int,
+		transcribe: Callable[[sr.AudioData], Optional[str]],
+		executor: Executor,
+		energy_threshold: Callable[[], float],
+		on_partial: Optional[Callable[[str], None]] = None,
+	) -> None:
+		self.logger = logger
+		self.config = config
+		self.sample_rate = sample_rate
+		self.sample_width = sample_width
+		self._transcribe = transcribe
+		self._executor = executor
+		self._energy_threshold = energy_threshold
+		self._on_partial = on_partial
+
+		self._bytes_per_second = sample_rate * sample_width
+		self._preroll: Deque[bytes] = collections.deque(maxlen=max(0, config.preroll_chunks))
+		self._buffer = bytearray()
+		self._started = False
+		self._speech_bytes = 0
+		self._last_speech_end = 0
+		self._submitted_end = 0
+
+		self._lock = threading.Lock()
+		self._inflight: Optional[Future] = None
+		self._hypothesis = ""
+		self._covered_end = 0
+		self.partials = 0
+
+	@property
+	def text(self) -> str:
+		with self._lock:
+			return self._hypothesis
+
+	def feed(self, chunk: bytes) -> None:
+		if not chunk:
+			return
+		loud = dsp.pcm_rms(chunk, self.sample_width) > self._energy_threshold()
+		if not self._started:
+			if not loud:
+				self._preroll.append(chunk)
+				return
+			self._started = True
+			for earlier in self._preroll:
+				self._buffer.extend(earlier)
+			self._preroll.clear()
+
+		self._buffer.extend(chunk)
+		if loud:
+			self._speech_bytes += len(chunk)
+			self._last_speech_end = len(self._buffer)
+
+		interval = int(self.config.interval_seconds * self._bytes_per_second)
+		enough_speech = self._speech_bytes >= self.config.min_speech_seconds * self._bytes_per_second
+		if enough_speech and len(self._buffer) - self._submitted_end >= interval:
+			self._submit(len(self._buffer))
+
+	def finish(self) -> Optional[str]:
+		"""Final text, or ``None`` if the caller should transcribe the full utterance."""
+
+		if not self._started or self._speech_bytes == 0:
+			return None
+
+		inflight = self._inflight
+		if inflight is not None:
+			try:
+				inflight.result(timeout=self.config.final_wait_seconds)
+			except Exception:
+				pass
+		with self._lock:
+			if self._hypothesis and self._covered_end >= self._last_speech_end:
+				return self._hypothesis
+
+		# The endpoint fired before a partial covered the end of speech.
+		future = self._submit(len(self._buffer), force=True)
+		if future is None:
+			return None
+		try:
+			future.result(timeout=self.config.final_wait_seconds)
+		except Exception as exc:
+			self.logger.warning("Final streaming transcription failed: %s", exc)
+			return None
+		return self.text or None
+
+	def _submit(self, end: int, *, force: bool = False) -> Optional[Future]:
+		with self._lock:
+			if self._inflight is not None and not self._inflight.done() and not force:
+				return None
+			window = int(self.config.window_seconds * self._bytes_per_second)
+			window -= window % self.sample_width
+			start = max(0, end - window)
+			frames = bytes(self._buffer[start:end])
+			self._submitted_end = end
+			future = self._executor.submit(contextvars.copy_context().run, self._run, frames, start, end)
+			self._inflight = future
+		return future
+
+	def _run(self, frames: bytes, start: int, end: int) -> None:
+		text = self._transcribe(sr.AudioData(frames, self.sample_rate, self.sample_width)) or ""
+		with self._lock:
+			if end <= self._covered_end:
+				return
+			self._hypothesis = text.strip() if start == 0 else stitch(self._hypothesis, text)
+			self._covered_end = end
+			self.partials += 1
+			hypothesis = self._hypothesis
+		if self._on_partial is not None and hypothesis:
+			try:
+				self._on_partial(hypothesis)
+			except Exception as exc:
+				self.logger.debug("Partial transcript callback failed: %s", exc)
+
+
+def stitch(previous: str, window_text: str) -> str:
+	"""Merge the transcript of an overlapping window onto ``previous``.
+
+	The window's opening words are aligned with the tail of ``previous``
+	(ignoring case and punctuation); everything from the aligned position
+	on is replaced by the newer window text.
+	"""
+
+	window_text = window_text.strip()
+	if not previous:
+		return window_text
+	if not window_text:
+		return previous
+
+	old_words = previous.split()
+	new_words = window_text.split()
+	old_keys = _keys(old_words)
+	new_keys = _keys(new_words)
+	matcher = difflib.SequenceMatcher(None, old_keys, new_keys, autojunk=False)
+	match = matcher.find_longest_match(0, len(old_keys), 0, len(new_keys))
+	if match.size == 0 or (match.size < 2 and len(new_keys) > 2):
+		return f"{previous} {window_text}"
+	cut = max(0, match.a - match.b)
+	return " ".join(old_words[:cut] + new_words)
+
+
+def _keys(words: List[str]) -> List[str]:
+	return [strip_punctuation(word).lower() for word in words]
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict
+
+import numpy as np
+
+from voice_assistant.core import dsp
+
+
+@dataclass
+class VADConfig:
+	frame_ms: float = 20.0
+	hop_ms: float = 10.0
+	# A frame is speech when it is this far above the clip's noise floor...
+	energy_margin_db: float = 10.0
+	# ...and never when it is below this absolute level.
+	min_energy_db: float = -55.0
+	# Noise-like frames (high zero-crossing rate) need this much extra energy.
+	noise_zcr: float = 0.35
+	noise_extra_db: float = 6.0
+	min_speech_ms: float = 120.0
+	padding_ms: float = 150.0
+
+	@classmethod
+	def from_settings(cls, vad_settings: Dict[str, Any]) -> "VADConfig":
+		return cls(
+			energy_margin_db=float(vad_settings.get("energy_margin_db", 10.0)),
+			min_speech_ms=float(vad_settings.get("min_speech_ms", 120.0)),
+			padding_ms=float(vad_settings.get("padding_ms", 150.0)),
+		)
+
+
+@dataclass
+class VADResult:
+	has_speech: bool
+	start_seconds: float
+	end_seconds: float
+	duration_seconds: float
+	speech_seconds: float
+
+	@property
+	def kept_seconds(self) -> float:
+		return max(0.0, self.end_seconds - self.start_seconds)
+
+	@property
+	def trimmed_seconds(self) -> float:
+		return self.duration_seconds - self.kept_seconds
+
+
+class VoiceActivityDetector:
+	"""Frame energy + zero-crossing voice activity detector.
+
+	The noise floor is estimated per clip (low percentile of frame energy),
+	so the detector adapts to whatever background level the microphone
+	recorded. Voiced speech is loud with a low zero-crossing rate; hiss
+	and fan noise cross zero often and must clear a higher bar. Everything
+	from the first to the last speech frame is kept, padded so that word
+	onsets and releases are not clipped.
+	"""
+
+	def __init__(self, config: VADConfig) -> None:
+		self.config = config
+
+	def analyze(self, samples: np.ndarray, sample_rate: int) -> VADResult:
+		config = self.config
+		duration = samples.size / sample_rate if sample_rate else 0.0
+		hop = max(1, int(sample_rate * config.hop_ms / 1000.0))
+		frame_len = max(hop, int(sample_rate * config.frame_ms / 1000.0))
+		if samples.size < frame_len:
+			return VADResult(False, 0.0, 0.0, duration, 0.0)
+
+		frames = dsp.frame_signal(samples, frame_len, hop)
+		energy = dsp.frame_energy_db(frames)
+		zcr = dsp.zero_crossing_rate(frames)
+
+		floor = float(np.percentile(energy, 10))
+		threshold = max(config.min_energy_db, floor + config.energy_margin_db)
+		speech = (energy > threshold) & ((zcr < config.noise_zcr) | (energy > threshold + config.noise_extra_db))
+
+		hop_seconds = hop / sample_rate
+		speech_seconds = float(np.count_nonzero(speech)) * hop_seconds
+		if speech_seconds * 1000.0 < config.min_speech_ms:
+			return VADResult(False, 0.0, 0.0, duration, speech_seconds)
+
+		active = np.flatnonzero(speech)
+		padding = config.padding_ms / 1000.0
+		start = max(0.0, active[0] * hop_seconds - padding)
+		end = min(duration, (active[-1] * hop + frame_len) / sample_rate + padding)
+		return VADResult(True, float(start), float(end), duration, speech_seconds)
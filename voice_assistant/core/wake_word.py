@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import wave
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from voice_assistant.core import dsp
+
+
+HOP_SECONDS = 0.01
+
+
+@dataclass
+class WakeWordConfig:
+	templates: Sequence[str]
+	threshold: Optional[float] = None
+	sample_rate: int = 16000
+	speech_db: float = -45.0
+	threshold_margin: float = 1.25
+	default_threshold: float = 0.35
+
+
+@dataclass
+class WakeDetection:
+	detected: bool
+	score: float
+	end_seconds: float = 0.0
+	duration_seconds: float = 0.0
+
+
+def load_wav(path: Path, sample_rate: int) -> np.ndarray:
+	"""Load a PCM WAV file as mono float32 at ``sample_rate``."""
+
+	with wave.open(str(path), "rb") as wav:
+		channels = wav.getnchannels()
+		rate = wav.getframerate()
+		samples = dsp.pcm_to_float(wav.readframes(wav.getnframes()), wav.getsampwidth())
+	if channels > 1:
+		samples = samples.reshape(-1, channels).mean(axis=1)
+	return dsp.resample(samples, rate, sample_rate)
+
+
+class WakeWordDetector:
+	"""On-device wake-word spotter using MFCC template matching.
+
+	Templates are MFCC sequences extracted from a few sample recordings of
+	the wake phrase. An utterance is first gated on frame energy, then
+	aligned against each template with open-ended DTW so that speech
+	following the wake phrase does not count against the match.
+	"""
+
+	def __init__(self, config: WakeWordConfig, templates: List[np.ndarray]) -> None:
+		if not templates:
+			raise ValueError("At least one wake word template is required.")
+		self.config = config
+		self._templates = templates
+		self._min_frames = min(len(t) for t in templates)
+		self.threshold = config.threshold if config.threshold is not None else self._calibrate_threshold()
+
+	@classmethod
+	def from_wav_files(cls, config: WakeWordConfig, paths: Sequence[Path]) -> "WakeWordDetector":
+		templates = []
+		for path in paths:
+			samples = load_wav(path, config.sample_rate)
+			speech = cls._trim_silence(samples, config)
+			if speech.size:
+				templates.append(cls._features(speech, config.sample_rate))
+		return cls(config, templates)
+
+	def detect(self, samples: np.ndarray, sample_rate: int) -> WakeDetection:
+		"""Score float samples (any rate) against the wake word templates."""
+
+		samples = dsp.resample(samples, sample_rate, self.config.sample_rate)
+		duration = samples.size / self.config.sample_rate
+		speech = self._trim_silence(samples, self.config)
+		if speech.size < self._min_frames * HOP_SECONDS * self.config.sample_rate * 0.5:
+			return WakeDetection(detected=False, score=float("inf"), duration_seconds=duration)
+
+		offset = (samples.size - speech.size) / self.config.sample_rate
+		features = self._features(speech, self.config.sample_rate)
+		best_score, best_end = float("inf"), 0
+		for template in self._templates:
+			score, end = self._open_end_dtw(template, features)
+			if score < best_score:
+				best_score, best_end = score, end
+
+		return WakeDetection(
+			detected=best_score <= self.threshold,
+			score=best_score,
+			end_seconds=offset + (best_end + 1) * HOP_SECONDS,
+			duration_seconds=duration,
+		)
+
+	def _calibrate_threshold(self) -> float:
+		if len(self._templates) < 2:
+			return self.config.default_threshold
+		scores = [
+			self._open_end_dtw(a, b)[0]
+			for i, a in enumerate(self._templates)
+			for j, b in enumerate(self._templates)
+			if i != j
+		]
+		return max(scores) * self.config.threshold_margin
+
+	@staticmethod
+	def _trim_silence(samples: np.ndarray, config: WakeWordConfig) -> np.ndarray:
+		"""Drop leading/trailing frames below ``speech_db``."""
+
+		hop = int(config.sample_rate * HOP_SECONDS)
+		frames = dsp.frame_signal(samples, hop * 2, hop)
+		active = np.flatnonzero(dsp.frame_energy_db(frames) > config.speech_db)
+		if active.size == 0:
+			return samples[:0]
+		return samples[active[0] * hop : (active[-1] + 2) * hop]
+
+	@staticmethod
+	def _features(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+		# Drop c0 (overall energy) and normalize so that cosine distance
+		# compares spectral shape only.
+		feats = dsp.mfcc(samples, sample_rate, hop_ms=HOP_SECONDS * 1000)[:, 1:]
+		feats = feats - feats.mean(axis=0)
+		return feats / (np.linalg.norm(feats, axis=1, keepdims=True) + 1e-8)
+
+	@staticmethod
+	def _open_end_dtw(template: np.ndarray, candidate: np.ndarray) -> Tuple[float, int]:
+		"""Align all of ``template`` to a prefix of ``candidate``.
+
+		Steps are slope-constrained (candidate advances by 0, 1 or 2 frames per
+		template frame) so each row is a single vectorized update. Returns the
+		mean per-frame cosine distance and the candidate frame where the
+		match ends.
+		"""
+
+		n = min(candidate.shape[0], template.shape[0] * 2)
+		cost = 1.0 - template @ candidate[:n].T
+		acc = np.full(n, np.inf, dtype=np.float64)
+		acc[0] = cost[0, 0]
+		for i in range(1, template.shape[0]):
+			prev = acc
+			step = prev.copy()
+			step[1:] = np.minimum(step[1:], prev[:-1])
+			step[2:] = np.minimum(step[2:], prev[:-2])
+			acc = cost[i] + step
+		end = int(np.argmin(acc))
+		return float(acc[end] / template.shape[0]), end
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Literal, Optional
+
+
+WarmupState = Literal["starting", "ready", "failed"]
+
+
+@dataclass
+class WarmupConfig:
+	enabled: bool = True
+	# Open and calibrate the microphone before voice mode is chosen (it is
+	# released again if text mode is picked).
+	microphone: bool = True
+
+	@classmethod
+	def from_settings(cls, warmup_settings: Dict[str, Any]) -> "WarmupConfig":
+		return cls(
+			enabled=warmup_settings.get("enabled", True),
+			microphone=warmup_settings.get("microphone", True),
+		)
+
+
+@dataclass
+class WarmupTask:
+	name: str
+	started: float = field(default_factory=time.perf_counter)
+	future: Future = field(default_factory=Future, repr=False)
+	elapsed_ms: Optional[float] = None
+
+	@property
+	def state(self) -> WarmupState:
+		if not self.future.done():
+			return "starting"
+		return "failed" if self.future.exception() is not None else "ready"
+
+	@property
+	def error(self) -> Optional[str]:
+		if not self.future.done() or self.future.exception() is None:
+			return None
+		return str(self.future.exception()) or type(self.future.exception()).__name__
+
+
+class WarmupOrchestrator:
+	"""Start independent component initializations concurrently.
+
+	Each task runs on its own daemon thread from the moment it is started;
+	callers block on a task (``wait``/``result``) only when they first need
+	what it produces. Failures are logged and reported, never raised into
+	the thread that started the task.
+	"""
+
+	def __init__(self, logger) -> None:
+		self.logger = logger
+		self._lock = threading.Lock()
+		self._tasks: Dict[str, WarmupTask] = {}
+
+	def start(self, name: str, function: Callable[[], Any]) -> None:
+		task = WarmupTask(name)
+		with self._lock:
+			if name in self._tasks:
+				raise ValueError(f"warm-up task {name!r} already started")
+			self._tasks[name] = task
+
+		def run() -> None:
+			task.future.set_running_or_notify_cancel()
+			try:
+				result = function()
+			except BaseException as exc:
+				task.elapsed_ms = (time.perf_counter() - task.started) * 1000.0
+				self.logger.warning("Warm-up of %s failed after %.0fms: %s", name, task.elapsed_ms, exc)
+				task.future.set_exception(exc)
+			else:
+				task.elapsed_ms = (time.perf_counter() - task.started) * 1000.0
+				self.logger.debug("Warm-up of %s finished in %.0fms.", name, task.elapsed_ms)
+				task.future.set_result(result)
+
+		threading.Thread(target=run, name=f"warmup-{name}", daemon=True).start()
+
+	def started(self, name: str) -> bool:
+		with self._lock:
+			return name in self._tasks
+
+	def wait(self, name: str, timeout: Optional[float] = None) -> bool:
+		"""Wait for ``name`` to finish; ``True`` if it succeeded (``False`` if unknown)."""
+
+		with self._lock:
+			task = self._tasks.get(name)
+		if task is None:
+			return False
+		try:
+			task.future.result(timeout=timeout)
+		except Exception:
+			return False
+		return True
+
+	def result(self, name: str, timeout: Optional[float] = None) -> Any:
+		"""The task's return value; re-raises its exception."""
+
+		with self._lock:
+			task = self._tasks[name]
+		return task.future.result(timeout=timeout)
+
+	def when_done(self, name: str, callback: Callable[[Future], None]) -> None:
+		"""Run ``callback`` once ``name`` finishes (immediately if it has)."""
+
+		with self._lock:
+			task = self._tasks.get(name)
+		if task is not None:
+			task.future.add_done_callback(callback)
+
+	def tasks(self) -> List[WarmupTask]:
+		with self._lock:
+			return list(self._tasks.values())
+
+	def summary(self) -> str:
+		parts = []
+		for task in self.tasks():
+			if task.state == "starting":
+				parts.append(f"{task.name} starting")
+			elif task.state == "ready":
+				parts.append(f"{task.name} ready ({task.elapsed_ms:.0f}ms)")
+			else:
+				parts.append(f"{task.name} failed ({task.error})")
+		return ", ".join(parts)
@@ -1,13 +1,49 @@
 from __future__ import annotations
 
-from voice_assistant.core.assistant import create_assistant
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
 
+from voice_assistant.utils.profiling import StartupProfiler
+from voice_assistant.utils.tracing import get_tracer
 
-def main() -> None:
-	assistant = create_assistant()
-	assistant.run()
+
+def main(argv: Optional[List[str]] = None) -> None:
+	parser = argparse.ArgumentParser(description="CLI voice assistant powered by Groq.")
+	parser.add_argument(
+		"--profile-startup",
+		action="store_true",
+		help="Print an import and initialization timing breakdown once the assistant is ready.",
+	)
+	parser.add_argument(
+		"--trace",
+		action="store_true",
+		help="Record per-turn latency spans (see /stats) and print p50/p95/p99 on exit.",
+	)
+	parser.add_argument(
+		"--metrics-file",
+		type=Path,
+		help="Record latency spans and write their histograms to this JSON file on exit.",
+	)
+	args = parser.parse_args(argv)
+
+	tracer = get_tracer()
+	tracer.enabled = args.trace or args.metrics_file is not None
+
+	profiler = StartupProfiler(enabled=args.profile_startup)
+	with profiler.phase("import assistant"):
+		from voice_assistant.core.assistant import create_assistant
+
+	assistant = create_assistant(profiler=profiler)
+	try:
+		assistant.run()
+	finally:
+		if args.trace:
+			print(tracer.summary_table(), file=sys.stderr)
+		if args.metrics_file is not None:
+			tracer.export(args.metrics_file)
 
 
 if __name__ == "__main__":
 	main()
-
@@ -0,0 +1,266 @@
+"""Replay flight recordings against the current recognizer and router.
+
+Re-runs the turns of a session recorded with ``recorder.enabled`` through
+the current :class:`SpeechRecognizer` and :class:`CommandRouter` and shows
+where transcripts, routes and latencies differ from the recording::
+
+    python -m voice_assistant.replay                    # newest session
+    python -m voice_assistant.replay session.varec --list
+    python -m voice_assistant.replay session.varec --turn 3 --turn -1
+
+Command handlers and the LLM are not re-run (they open browsers, cost
+tokens); the recorded response is kept for reference. Turns that were
+transcribed in streaming mode are replayed through the one-shot STT path.
+Exits with 1 when any transcript or route changed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO
+
+from voice_assistant.config import load_settings
+from voice_assistant.core.assistant import create_router
+from voice_assistant.core.command_router import CommandRouter
+from voice_assistant.core.recorder import RecorderConfig, Recording, RecordingError, describe_route, find_recordings
+from voice_assistant.utils.helpers import strip_punctuation
+from voice_assistant.utils.logger import LoggingConfig, configure_logging, get_logger
+from voice_assistant.utils.tracing import Histogram
+
+# Recorded spans that together make up "time to transcript".
+STT_SPANS = ("vad", "stt", "stt.final")
+
+
+@dataclass
+class TurnDiff:
+	number: int
+	mode: str
+	recorded_heard: Optional[str]
+	recorded_command: Optional[str]
+	recorded_route: Optional[Dict[str, Any]]
+	recorded_stt_ms: Optional[float]
+	recorded_route_ms: Optional[float]
+	heard: Optional[str] = None
+	command: Optional[str] = None
+	route: Optional[Dict[str, Any]] = None
+	stt_ms: Optional[float] = None
+	route_ms: Optional[float] = None
+	replayed_audio: bool = False
+	error: Optional[str] = None
+
+	@property
+	def heard_changed(self) -> bool:
+		return self.replayed_audio and _normalize(self.heard) != _normalize(self.recorded_heard)
+
+	@property
+	def route_changed(self) -> bool:
+		return _route_key(self.route) != _route_key(self.recorded_route)
+
+	@property
+	def changed(self) -> bool:
+		return self.heard_changed or self.route_changed
+
+	def to_dict(self) -> Dict[str, Any]:
+		return {**asdict(self), "heard_changed": self.heard_changed, "route_changed": self.route_changed}
+
+
+class Replayer:
+	"""Re-run recorded turns; ``recognizer=None`` routes the recorded commands only."""
+
+	def __init__(self, router: CommandRouter, recognizer=None) -> None:
+		self.router = router
+		self.recognizer = recognizer
+		# Build the classifier now so that it is not timed as part of a turn.
+		router.classifier
+
+	def replay(self, recording: Recording, number: int) -> TurnDiff:
+		turn = recording.turn(number)
+		spans = turn.get("spans") or {}
+		stt_spans = [spans[name] for name in STT_SPANS if name in spans]
+		diff = TurnDiff(
+			number=recording.entries[number].number,
+			mode=turn.get("mode", "?"),
+			recorded_heard=turn.get("heard"),
+			recorded_command=turn.get("command"),
+			recorded_route=turn.get("route"),
+			recorded_stt_ms=round(sum(stt_spans), 3) if stt_spans else None,
+			recorded_route_ms=spans.get("route"),
+			command=turn.get("command"),
+		)
+
+		pcm = recording.audio(number) if self.recognizer is not None else None
+		if pcm:
+			import speech_recognition as sr
+
+			from voice_assistant.core.recognizer import TranscriptionError
+
+			diff.replayed_audio = True
+			started = time.perf_counter()
+			try:
+				diff.heard = self.recognizer.transcribe(sr.AudioData(pcm, int(turn["sample_rate"]), 2))
+			except TranscriptionError as exc:
+				diff.error = str(exc)
+			diff.stt_ms = round((time.perf_counter() - started) * 1000.0, 3)
+			diff.command = self._command_for(diff)
+
+		if diff.command:
+			started = time.perf_counter()
+			route = self.router.route(diff.command)
+			diff.route_ms = round((time.perf_counter() - started) * 1000.0, 3)
+			diff.route = describe_route(route)
+		return diff
+
+	def _command_for(self, diff: TurnDiff) -> Optional[str]:
+		"""Derive the command from a new transcript the way the voice loop did.
+
+		The recorded utterance either carried the wake word (the command is
+		what follows it), was the command said after a separate wake word,
+		or was ignored because it had no wake word.
+		"""
+
+		text = diff.heard
+		if not text:
+			return None
+		remainder = self.recognizer.split_wake_word(text)
+		wake_in_recording = diff.recorded_heard and self.recognizer.split_wake_word(diff.recorded_heard) is not None
+		if not wake_in_recording and diff.recorded_command is not None:
+			return text
+		return remainder
+
+
+def _normalize(text: Optional[str]) -> str:
+	return strip_punctuation(text or "").lower()
+
+
+def _route_key(route: Optional[Dict[str, Any]]) -> Any:
+	if not route:
+		return None
+	return route.get("intent"), route.get("matched_by"), tuple(route.get("args") or ())
+
+
+def _describe(heard: Optional[str], route: Optional[Dict[str, Any]]) -> str:
+	if route is None:
+		target = "not routed"
+	elif route.get("intent") is None:
+		target = "llm"
+	else:
+		target = f"{route['intent']} ({route.get('matched_by')})"
+		if route.get("args"):
+			target += f" {route['args']}"
+	return f"heard {json.dumps(heard, ensure_ascii=False)} -> {target}"
+
+
+def _millis(before: Optional[float], after: Optional[float]) -> str:
+	fmt = lambda value: "-" if value is None else f"{value:.1f}"
+	return f"{fmt(before)} -> {fmt(after)} ms"
+
+
+def write_report(diff: TurnDiff, out: TextIO) -> None:
+	status = "changed" if diff.changed else "same"
+	timings = f"route {_millis(diff.recorded_route_ms, diff.route_ms)}"
+	if diff.replayed_audio:
+		timings = f"stt {_millis(diff.recorded_stt_ms, diff.stt_ms)} | {timings}"
+	print(f"[{diff.number}] {diff.mode:<5} {status:<7} {timings}", file=out)
+	heard = diff.heard if diff.replayed_audio else diff.recorded_heard
+	if diff.changed:
+		print(f"    - {_describe(diff.recorded_heard or diff.recorded_command, diff.recorded_route)}", file=out)
+		print(f"    + {_describe(heard or diff.command, diff.route)}", file=out)
+	else:
+		print(f"      {_describe(heard or diff.command, diff.route)}", file=out)
+	if diff.error:
+		print(f"    ! {diff.error}", file=out)
+
+
+def list_turns(recording: Recording, out: TextIO) -> None:
+	for entry, turn in recording:
+		stamp = time.strftime("%H:%M:%S", time.localtime(entry.started))
+		seconds = entry.audio_length / (2 * (turn.get("sample_rate") or 1))
+		audio = f"{seconds:4.1f}s audio" if entry.audio_length else "  no audio"
+		route = (turn.get("route") or {}).get("intent") or "-"
+		print(
+			f"[{entry.number}] {stamp} {turn.get('mode', '?'):<5} {turn.get('outcome') or '-':<8} {audio}  "
+			f"{turn.get('turn_ms', 0.0):7.0f}ms  {route:<12} {json.dumps(turn.get('heard') or turn.get('command'))}",
+			file=out,
+		)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	parser = argparse.ArgumentParser(description="Replay a flight recording through the current recognizer and router.")
+	parser.add_argument("recording", type=Path, nargs="?", help="Session file (default: the newest recording).")
+	parser.add_argument("-t", "--turn", type=int, action="append", help="Replay only this turn (repeatable; -1 is the last).")
+	parser.add_argument("--list", action="store_true", help="List the recorded turns and exit.")
+	parser.add_argument("--no-stt", action="store_true", help="Route the recorded commands without re-transcribing audio.")
+	parser.add_argument("--json", action="store_true", help="Write one JSON object per turn instead of a report.")
+	args = parser.parse_args(argv)
+
+	settings = load_settings()
+	configure_logging(LoggingConfig.from_settings(settings.get("logging", {})))
+	logger = get_logger("voice_assistant.replay")
+
+	path = args.recording
+	if path is None:
+		recordings = find_recordings(RecorderConfig.from_settings(settings.get("recorder", {})).directory)
+		if not recordings:
+			logger.error("No recordings found; enable recorder in settings.yaml first.")
+			return 2
+		path = recordings[0]
+
+	try:
+		recording = Recording(path)
+	except (OSError, RecordingError) as exc:
+		logger.error("Cannot open recording: %s", exc)
+		return 2
+
+	with recording:
+		if not recording.complete:
+			logger.warning("%s was not closed cleanly; replaying the %d complete turns.", path, len(recording))
+		if args.list:
+			list_turns(recording, sys.stdout)
+			return 0
+
+		numbers = list(range(len(recording)))
+		if args.turn:
+			try:
+				numbers = [numbers[number] for number in args.turn]
+			except IndexError:
+				logger.error("%s has %d turns.", path, len(recording))
+				return 2
+
+		recognizer = None
+		if not args.no_stt:
+			from voice_assistant.batch import create_file_recognizer
+
+			recognizer = create_file_recognizer(logger, settings)
+		replayer = Replayer(create_router(settings), recognizer)
+
+		stt_before, stt_after = Histogram(), Histogram()
+		changed = 0
+		try:
+			for number in numbers:
+				diff = replayer.replay(recording, number)
+				changed += diff.changed
+				if diff.replayed_audio and diff.recorded_stt_ms is not None and diff.stt_ms is not None:
+					stt_before.record(diff.recorded_stt_ms)
+					stt_after.record(diff.stt_ms)
+				if args.json:
+					print(json.dumps(diff.to_dict(), ensure_ascii=False), flush=True)
+				else:
+					write_report(diff, sys.stdout)
+		finally:
+			if recognizer is not None:
+				recognizer.close()
+
+	summary = f"{len(numbers)} turns replayed from {path.name}: {changed} changed"
+	if stt_after.count:
+		summary += f"; stt p50 {stt_before.percentile(0.5):.0f} -> {stt_after.percentile(0.5):.0f} ms"
+	print(summary, file=sys.stderr)
+	return 1 if changed else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,592 @@
+"""Multi-session assistant server.
+
+Serves text (and uploaded-audio) turns over HTTP/1.1 on TCP or a Unix
+socket, one asyncio event loop for all sessions::
+
+    python -m voice_assistant.server --port 8765
+    python -m voice_assistant.server --unix /tmp/voice-assistant.sock
+
+Endpoints (JSON in and out):
+
+    POST   /v1/sessions              -> {"session_id": ...}
+    POST   /v1/sessions/<id>/turns   {"text": ...}, or a WAV/AIFF/FLAC body
+    DELETE /v1/sessions/<id>
+    GET    /v1/health
+
+Every session has its own router and conversation memory. LLM calls use
+the async OpenAI client; command handlers and speech recognition run on a
+bounded thread pool. When ``max_pending_turns`` turns are already waiting
+for one of the ``max_concurrent_turns`` slots, new turns get ``503`` with
+``Retry-After`` instead of queueing without bound. Uploaded audio is
+transcribed inside the turn's slot, so it is held to the same limits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextvars
+import io
+import json
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from http import HTTPStatus
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from voice_assistant.config import load_settings, resolve_path
+from voice_assistant.core.assistant import (
+	COMMAND_BUSY,
+	COMMAND_TIMEOUT,
+	HANDLER_FAILED,
+	LLM_EMPTY_ANSWER,
+	LLM_UNAVAILABLE,
+	PLACEHOLDER_ANSWER,
+	create_router,
+)
+from voice_assistant.core.command_executor import CommandExecutor, ExecutorBusy, ExecutorConfig
+from voice_assistant.core.command_registry import CommandRegistry
+from voice_assistant.core.command_router import CommandRouter, RouterStats
+from voice_assistant.core.llm import LLMClient, LLMConfig
+from voice_assistant.core.llm_cache import CacheConfig, ResponseCache
+from voice_assistant.core.memory import ConversationMemory, MemoryConfig
+from voice_assistant.core.providers import GroqProvider
+from voice_assistant.utils.helpers import is_exit_command
+from voice_assistant.utils.logger import LoggingConfig, configure_logging, correlation, get_logger
+from voice_assistant.utils.tracing import Histogram
+
+if TYPE_CHECKING:
+	from voice_assistant.core.recognizer import SpeechRecognizer
+
+
+_MAX_HEADER_BYTES = 16 * 1024
+
+
+@dataclass
+class ServerConfig:
+	host: str = "127.0.0.1"
+	port: int = 8765
+	unix_socket: Optional[Path] = None
+	max_sessions: int = 1000
+	# Turns executing at once, and turns allowed to wait for a slot.
+	max_concurrent_turns: int = 64
+	max_pending_turns: int = 256
+	handler_workers: int = 16
+	handler_timeout_seconds: float = 10.0
+	session_idle_seconds: float = 900.0
+	keepalive_seconds: float = 30.0
+	max_body_bytes: int = 10 * 1024 * 1024
+	# Run browser/file-manager commands on the server host; otherwise they
+	# are answered as questions.
+	local_actions: bool = False
+
+	@classmethod
+	def from_settings(cls, server_settings: Dict[str, Any]) -> "ServerConfig":
+		unix_socket = server_settings.get("unix_socket")
+		return cls(
+			host=server_settings.get("host", "127.0.0.1"),
+			port=int(server_settings.get("port", 8765)),
+			unix_socket=resolve_path(unix_socket) if unix_socket else None,
+			max_sessions=int(server_settings.get("max_sessions", 1000)),
+			max_concurrent_turns=int(server_settings.get("max_concurrent_turns", 64)),
+			max_pending_turns=int(server_settings.get("max_pending_turns", 256)),
+			handler_workers=int(server_settings.get("handler_workers", 16)),
+			handler_timeout_seconds=float(server_settings.get("handler_timeout_seconds", 10.0)),
+			session_idle_seconds=float(server_settings.get("session_idle_seconds", 900.0)),
+			keepalive_seconds=float(server_settings.get("keepalive_seconds", 30.0)),
+			max_body_bytes=int(server_settings.get("max_body_bytes", 10 * 1024 * 1024)),
+			local_actions=server_settings.get("local_actions", False),
+		)
+
+
+class HTTPError(Exception):
+	def __init__(self, status: HTTPStatus, message: str, headers: Optional[Dict[str, str]] = None) -> None:
+		super().__init__(message)
+		self.status = status
+		self.message = message
+		self.headers = headers or {}
+
+
+@dataclass
+class Session:
+	id: str
+	router: CommandRouter
+	memory: Optional[ConversationMemory]
+	last_active: float = field(default_factory=time.monotonic)
+	turns: int = 0
+	# One turn at a time per session, in arrival order.
+	lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+@dataclass
+class ServerStats:
+	turns: int = 0
+	rejected: int = 0
+	failed: int = 0
+	sessions_created: int = 0
+	sessions_expired: int = 0
+
+
+class AssistantServer:
+	"""Hosts many independent assistant sessions on one event loop."""
+
+	def __init__(self, logger, settings: Dict[str, Any], config: ServerConfig) -> None:
+		self.logger = logger
+		self.settings = settings
+		self.config = config
+		self.provider = GroqProvider.from_settings(logger, settings)
+		self.llm = self._create_llm()
+		self.stats = ServerStats()
+		self.routing = RouterStats()
+		self.turn_latency = Histogram()
+		self.commands = CommandRegistry.from_settings(settings.get("commands", {}), logger)
+		# Turns always wait for the handler (no early acknowledgement over HTTP).
+		self.command_executor = CommandExecutor(
+			logger,
+			ExecutorConfig(
+				workers=config.handler_workers,
+				timeout_seconds=config.handler_timeout_seconds,
+				ack_after_seconds=0.0,
+			),
+		)
+
+		self._memory_settings = settings.get("llm", {}).get("memory", {})
+		self._sessions: Dict[str, Session] = {}
+		self._executor = ThreadPoolExecutor(max_workers=max(1, config.handler_workers), thread_name_prefix="server-worker")
+		self._summary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory-summary")
+		self._slots: Optional[asyncio.Semaphore] = None
+		self._active = 0
+		self._pending = 0
+		self._recognizer: Optional[SpeechRecognizer] = None
+		self._recognizer_lock = threading.Lock()
+		self._server: Optional[asyncio.AbstractServer] = None
+
+	def _create_llm(self) -> LLMClient:
+		llm_settings = self.settings.get("llm", {})
+		cache_settings = llm_settings.get("cache", {})
+		cache = None
+		if cache_settings.get("enabled", True):
+			# In memory only: the SQLite mirror belongs to the interactive assistant.
+			cache = ResponseCache(
+				self.logger,
+				CacheConfig(
+					max_entries=int(cache_settings.get("max_entries", 256)),
+					ttl_seconds=float(cache_settings.get("ttl_seconds", 86400)),
+				),
+			)
+		return LLMClient(
+			logger=self.logger,
+			config=LLMConfig(model=llm_settings.get("model", "llama-3.1-8b-instant"), stream=False),
+			provider=self.provider,
+			cache=cache,
+		)
+
+	async def start(self) -> None:
+		self._slots = asyncio.Semaphore(max(1, self.config.max_concurrent_turns))
+		if self.config.unix_socket is not None:
+			self.config.unix_socket.unlink(missing_ok=True)
+			self._server = await asyncio.start_unix_server(
+				self._handle_connection, path=str(self.config.unix_socket), limit=_MAX_HEADER_BYTES
+			)
+			self.logger.info("Serving on unix:%s", self.config.unix_socket)
+		else:
+			self._server = await asyncio.start_server(
+				self._handle_connection, self.config.host, self.config.port, limit=_MAX_HEADER_BYTES
+			)
+			host, port = self._server.sockets[0].getsockname()[:2]
+			self.logger.info("Serving on http://%s:%s", host, port)
+
+	async def serve_forever(self) -> None:
+		await self.start()
+		reaper = asyncio.create_task(self._expire_sessions())
+		try:
+			await self._server.serve_forever()
+		finally:
+			reaper.cancel()
+			await self.close()
+
+	async def close(self) -> None:
+		if self._server is not None:
+			self._server.close()
+			await self._server.wait_closed()
+			self._server = None
+		for session in self._sessions.values():
+			if session.memory is not None:
+				session.memory.close()
+		self._sessions.clear()
+		self._executor.shutdown(wait=False, cancel_futures=True)
+		self.command_executor.close()
+		self._summary_executor.shutdown(wait=False, cancel_futures=True)
+		if self._recognizer is not None:
+			self._recognizer.close()
+		await self.provider.aclose()
+		self.provider.close()
+
+	def create_session(self) -> Session:
+		if len(self._sessions) >= self.config.max_sessions:
+			raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "session limit reached", {"Retry-After": "5"})
+		session = Session(id=uuid.uuid4().hex, router=create_router(self.settings, self.routing, self.commands), memory=self._create_memory())
+		self._sessions[session.id] = session
+		self.stats.sessions_created += 1
+		return session
+
+	def _create_memory(self) -> Optional[ConversationMemory]:
+		if not self._memory_settings.get("enabled", True):
+			return None
+		config = MemoryConfig.from_settings(self._memory_settings)
+		summarizer = None
+		if self.llm.available:
+			words = max(20, config.summary_tokens * 3 // 4)
+			summarizer = lambda previous, exchanges: self.llm.summarize(previous, exchanges, max_words=words)
+		return ConversationMemory(self.logger, config, summarizer, executor=self._summary_executor)
+
+	def end_session(self, session_id: str) -> None:
+		session = self._sessions.pop(session_id, None)
+		if session is not None and session.memory is not None:
+			session.memory.close()
+
+	def _session(self, session_id: str) -> Session:
+		session = self._sessions.get(session_id)
+		if session is None:
+			raise HTTPError(HTTPStatus.NOT_FOUND, "unknown session")
+		session.last_active = time.monotonic()
+		return session
+
+	async def _expire_sessions(self) -> None:
+		interval = max(1.0, min(60.0, self.config.session_idle_seconds / 4))
+		while True:
+			await asyncio.sleep(interval)
+			cutoff = time.monotonic() - self.config.session_idle_seconds
+			for session in [s for s in self._sessions.values() if s.last_active < cutoff and not s.lock.locked()]:
+				self.end_session(session.id)
+				self.stats.sessions_expired += 1
+
+	async def turn(self, session: Session, text: str = "", *, audio: Optional[bytes] = None) -> Dict[str, Any]:
+		"""Run one turn, waiting for a slot unless too many turns already are.
+
+		With ``audio`` the turn's text is transcribed from it once the slot
+		is taken.
+		"""
+
+		if self._pending >= self.config.max_pending_turns:
+			self.stats.rejected += 1
+			raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "server busy", {"Retry-After": "1"})
+		started = time.perf_counter()
+		waiting = True
+		self._pending += 1
+		try:
+			async with session.lock:
+				await self._slots.acquire()
+				self._pending -= 1
+				waiting = False
+				self._active += 1
+				try:
+					if session.id not in self._sessions:
+						raise HTTPError(HTTPStatus.NOT_FOUND, "session ended")
+					with correlation(f"{session.id[:8]}-{session.turns + 1}"):
+						if audio is not None:
+							text = await self.transcribe(audio)
+						result = await self._run_turn(session, text)
+				finally:
+					self._active -= 1
+					self._slots.release()
+		except HTTPError:
+			raise
+		except Exception:
+			self.stats.failed += 1
+			raise
+		finally:
+			if waiting:
+				self._pending -= 1
+		session.turns += 1
+		self.stats.turns += 1
+		self.turn_latency.record((time.perf_counter() - started) * 1000.0)
+		return result
+
+	async def _run_turn(self, session: Session, text: str) -> Dict[str, Any]:
+		result: Dict[str, Any] = {"session_id": session.id, "text": text, "intent": None}
+		route = session.router.route(text)
+		if route.is_exit or is_exit_command(text):
+			self.end_session(session.id)
+			return {**result, "reply": "Goodbye!", "end_session": True}
+
+		local_only = self.commands.is_local(route.intent) and not self.config.local_actions
+		if route.handler is not None and not local_only:
+			result["intent"] = route.intent
+			result["reply"] = await self._run_handler(route.intent, route.handler, route.args, route.kwargs)
+			if session.memory is not None:
+				session.memory.add_turn(text, result["reply"])
+			return result
+
+		if route.suggestions:
+			result["suggestions"] = list(route.suggestions)
+		result["reply"] = await self._answer(session, text)
+		return result
+
+	async def _run_handler(self, name: str, handler, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+		spec = self.commands.spec(name)
+		timeout = spec.timeout if spec is not None and spec.timeout is not None else self.config.handler_timeout_seconds
+		try:
+			future = self.command_executor.submit(handler, args, kwargs)
+		except ExecutorBusy as exc:
+			self.logger.warning("Command %s rejected: %s", name, exc)
+			return COMMAND_BUSY
+		try:
+			return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+		except asyncio.TimeoutError:
+			self.command_executor.record_timeout(name, timeout)
+			return COMMAND_TIMEOUT
+		except Exception as exc:
+			self.logger.error("Command handler %s failed: %r", name, exc)
+			return HANDLER_FAILED
+
+	async def _answer(self, session: Session, text: str) -> str:
+		if not self.llm.available:
+			return PLACEHOLDER_ANSWER
+		context: Dict[str, Any] = {}
+		if session.memory is not None:
+			messages, key = session.memory.context()
+			context = {"context": messages, "context_key": key}
+		try:
+			answer = await self.llm.answer_async(text, **context)
+		except Exception as exc:
+			self.logger.error("Groq LLM call failed: %s", exc)
+			return LLM_UNAVAILABLE
+		if not answer:
+			return LLM_EMPTY_ANSWER
+		if session.memory is not None:
+			session.memory.add_turn(text, answer)
+		return answer
+
+	async def transcribe(self, audio: bytes) -> str:
+		loop = asyncio.get_running_loop()
+		try:
+			text = await loop.run_in_executor(
+				self._executor, contextvars.copy_context().run, self._transcribe_blocking, audio
+			)
+		except HTTPError:
+			raise
+		except Exception as exc:
+			self.logger.warning("Transcription failed: %s", exc)
+			raise HTTPError(HTTPStatus.BAD_GATEWAY, "transcription failed") from exc
+		if not text:
+			raise HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY, "no speech recognized")
+		return text
+
+	def _transcribe_blocking(self, audio: bytes) -> Optional[str]:
+		import speech_recognition as sr
+
+		try:
+			with sr.AudioFile(io.BytesIO(audio)) as source:
+				data = sr.Recognizer().record(source)
+		except Exception as exc:
+			raise HTTPError(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, f"unreadable audio: {exc}") from exc
+		return self._get_recognizer().transcribe(data)
+
+	def _get_recognizer(self) -> "SpeechRecognizer":
+		# Built on the first audio turn (pulls in SpeechRecognition and NumPy).
+		# Concurrent first turns would otherwise each build one, hedge pool
+		# included.
+		with self._recognizer_lock:
+			if self._recognizer is None:
+				self._recognizer = self._create_recognizer()
+			return self._recognizer
+
+	def _create_recognizer(self) -> "SpeechRecognizer":
+		from voice_assistant.core.audio_encoder import EncoderConfig
+		from voice_assistant.core.recognizer import RecognizerConfig, SpeechRecognizer
+		from voice_assistant.core.resilience import BreakerConfig
+		from voice_assistant.core.vad import VADConfig
+
+		stt_settings = self.settings.get("stt", {})
+		vad_settings = self.settings.get("vad", {})
+		return SpeechRecognizer(
+			logger=self.logger,
+			config=RecognizerConfig(
+				wake_word=self.settings["wake_word"],
+				language=self.settings.get("language", "en-US"),
+				use_groq=stt_settings.get("provider", "groq").lower() == "groq",
+				groq_model=stt_settings.get("model", "whisper-large-v3"),
+				upload=EncoderConfig.from_settings(stt_settings),
+				vad=VADConfig.from_settings(vad_settings) if vad_settings.get("enabled", True) else None,
+				hedge_after=stt_settings.get("hedge_after_seconds", 1.5),
+				breaker=BreakerConfig.from_settings(stt_settings.get("breaker", {})),
+			),
+			provider=self.provider,
+		)
+
+	def health(self) -> Dict[str, Any]:
+		return {
+			"status": "ok",
+			"sessions": len(self._sessions),
+			"active_turns": self._active,
+			"pending_turns": self._pending,
+			"turns": self.stats.turns,
+			"rejected": self.stats.rejected,
+			"failed": self.stats.failed,
+			"sessions_expired": self.stats.sessions_expired,
+			"routing": {**asdict(self.routing), "fallback_rate": round(self.routing.fallback_rate, 3)},
+			"commands": asdict(self.command_executor.stats()),
+			"turn_ms": self.turn_latency.to_dict(),
+		}
+
+	async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+		try:
+			while True:
+				try:
+					request = await asyncio.wait_for(self._read_request(reader), timeout=self.config.keepalive_seconds)
+				except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+					break
+				except HTTPError as exc:
+					await self._respond(writer, exc.status, {"error": exc.message}, exc.headers, keep_alive=False)
+					break
+				if request is None:
+					break
+				method, path, headers, body = request
+				keep_alive = headers.get("connection", "").lower() != "close"
+				try:
+					status, payload = await self._dispatch(method, path, headers, body)
+					extra: Dict[str, str] = {}
+				except HTTPError as exc:
+					status, payload, extra = exc.status, {"error": exc.message}, exc.headers
+				except Exception as exc:
+					self.logger.exception("Request %s %s failed: %s", method, path, exc)
+					status, payload, extra = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "internal error"}, {}
+				await self._respond(writer, status, payload, extra, keep_alive=keep_alive)
+				if not keep_alive:
+					break
+		except ConnectionError:
+			pass
+		finally:
+			writer.close()
+			try:
+				await writer.wait_closed()
+			except ConnectionError:
+				pass
+
+	async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+		try:
+			head = await reader.readuntil(b"\r\n\r\n")
+		except asyncio.IncompleteReadError as exc:
+			if not exc.partial:
+				return None
+			raise
+		except asyncio.LimitOverrunError as exc:
+			raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "headers too large") from exc
+
+		lines = head.decode("latin-1").split("\r\n")
+		try:
+			method, target, _ = lines[0].split(" ", 2)
+		except ValueError as exc:
+			raise HTTPError(HTTPStatus.BAD_REQUEST, "malformed request line") from exc
+		headers: Dict[str, str] = {}
+		for line in lines[1:]:
+			if ":" in line:
+				name, value = line.split(":", 1)
+				headers[name.strip().lower()] = value.strip()
+
+		if "chunked" in headers.get("transfer-encoding", "").lower():
+			raise HTTPError(HTTPStatus.LENGTH_REQUIRED, "chunked request bodies are not supported")
+		try:
+			length = int(headers.get("content-length", "0") or 0)
+		except ValueError as exc:
+			raise HTTPError(HTTPStatus.BAD_REQUEST, "invalid Content-Length") from exc
+		if length < 0:
+			raise HTTPError(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+		if length > self.config.max_body_bytes:
+			raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "request body too large")
+		body = await reader.readexactly(length) if length else b""
+		return method.upper(), target.split("?", 1)[0], headers, body
+
+	async def _dispatch(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Tuple[HTTPStatus, Any]:
+		parts = [part for part in path.split("/") if part]
+		if parts[:1] != ["v1"]:
+			raise HTTPError(HTTPStatus.NOT_FOUND, "not found")
+		parts = parts[1:]
+
+		if parts == ["health"] and method == "GET":
+			return HTTPStatus.OK, self.health()
+		if parts == ["sessions"] and method == "POST":
+			return HTTPStatus.CREATED, {"session_id": self.create_session().id}
+		if len(parts) == 2 and parts[0] == "sessions" and method == "DELETE":
+			self._session(parts[1])
+			self.end_session(parts[1])
+			return HTTPStatus.OK, {"session_id": parts[1], "ended": True}
+		if len(parts) == 3 and parts[0] == "sessions" and parts[2] == "turns" and method == "POST":
+			session = self._session(parts[1])
+			text, audio = self._turn_input(headers, body)
+			return HTTPStatus.OK, await self.turn(session, text, audio=audio)
+		raise HTTPError(HTTPStatus.NOT_FOUND, "not found")
+
+	def _turn_input(self, headers: Dict[str, str], body: bytes) -> Tuple[str, Optional[bytes]]:
+		"""The turn's text, or its audio body (transcribed by :meth:`turn`)."""
+
+		content_type = headers.get("content-type", "application/json").split(";", 1)[0].strip().lower()
+		if content_type.startswith("audio/") or content_type == "application/octet-stream":
+			if not body:
+				raise HTTPError(HTTPStatus.BAD_REQUEST, "empty audio body")
+			return "", body
+		try:
+			text = str(json.loads(body or b"{}").get("text", "")).strip()
+		except (ValueError, AttributeError) as exc:
+			raise HTTPError(HTTPStatus.BAD_REQUEST, "expected a JSON object with 'text'") from exc
+		if not text:
+			raise HTTPError(HTTPStatus.BAD_REQUEST, "empty 'text'")
+		return text, None
+
+	async def _respond(
+		self,
+		writer: asyncio.StreamWriter,
+		status: HTTPStatus,
+		payload: Any,
+		headers: Dict[str, str],
+		*,
+		keep_alive: bool,
+	) -> None:
+		body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+		lines: List[str] = [
+			f"HTTP/1.1 {status.value} {status.phrase}",
+			"Content-Type: application/json; charset=utf-8",
+			f"Content-Length: {len(body)}",
+			f"Connection: {'keep-alive' if keep_alive else 'close'}",
+			*(f"{name}: {value}" for name, value in headers.items()),
+		]
+		writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+		await writer.drain()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	parser = argparse.ArgumentParser(description="Serve assistant sessions over HTTP.")
+	parser.add_argument("--host", help="Bind address (default from settings).")
+	parser.add_argument("--port", type=int, help="TCP port (default from settings).")
+	parser.add_argument("--unix", type=Path, help="Listen on this Unix socket instead of TCP.")
+	args = parser.parse_args(argv)
+
+	settings = load_settings()
+	configure_logging(LoggingConfig.from_settings(settings.get("logging", {})))
+	logger = get_logger("voice_assistant.server")
+	config = ServerConfig.from_settings(settings.get("server", {}))
+	if args.host:
+		config.host = args.host
+	if args.port is not None:
+		config.port = args.port
+	if args.unix is not None:
+		config.unix_socket = args.unix
+	if not settings.get("groq", {}).get("api_key"):
+		logger.warning("GROQ_API_KEY not configured; questions get a placeholder answer.")
+
+	server = AssistantServer(logger, settings, config)
+	try:
+		asyncio.run(server.serve_forever())
+	except KeyboardInterrupt:
+		pass
+	print(f"Served {server.stats.turns} turns ({server.stats.rejected} rejected).", file=sys.stderr)
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
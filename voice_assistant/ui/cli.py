@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Literal
+from typing import Iterable, Literal, Optional, Tuple
 
 from colorama import Fore, Style, init as colorama_init
 
@@ -16,6 +16,7 @@ class CLI:
 
 	def __init__(self) -> None:
 		colorama_init(autoreset=True)
+		self._partial_width = 0
 
 	def render_banner(self) -> None:
 		title = f"{Fore.CYAN}{Style.BRIGHT}Voice Assistant v1.0{Style.RESET_ALL}"
@@ -25,18 +26,63 @@ class CLI:
 		print(f"{Fore.CYAN}Hackathon-ready CLI assistant powered by Groq AI{Style.RESET_ALL}")
 		print(border)
 
-	def show_message(self, sender: str, message: str) -> None:
+	def _prefix(self, sender: str) -> str:
 		if sender.lower() == "assistant":
-			prefix = f"{Fore.GREEN}[Assistant]{Style.RESET_ALL}"
-		elif sender.lower() == "user":
-			prefix = f"{Fore.BLUE}[You]{Style.RESET_ALL}"
-		else:
-			prefix = f"{Fore.MAGENTA}[{sender}]{Style.RESET_ALL}"
-		print(f"{prefix} {message}")
+			return f"{Fore.GREEN}[Assistant]{Style.RESET_ALL}"
+		if sender.lower() == "user":
+			return f"{Fore.BLUE}[You]{Style.RESET_ALL}"
+		return f"{Fore.MAGENTA}[{sender}]{Style.RESET_ALL}"
+
+	def show_message(self, sender: str, message: str) -> None:
+		print(f"{self._prefix(sender)} {message}")
+
+	def begin_stream(self, sender: str) -> None:
+		"""Start a message whose text arrives incrementally via ``stream_text``."""
+
+		print(f"{self._prefix(sender)} ", end="", flush=True)
+
+	def stream_text(self, text: str) -> None:
+		print(text, end="", flush=True)
+
+	def end_stream(self) -> None:
+		print(flush=True)
+
+	def show_partial(self, text: str) -> None:
+		"""Overwrite the current line with a live (partial) transcript."""
+
+		line = f"{Fore.BLUE}[You…]{Style.RESET_ALL} {text}"
+		padding = " " * max(0, self._partial_width - len(line))
+		self._partial_width = len(line)
+		print(f"\r{line}{padding}", end="", flush=True)
+
+	def clear_partial(self) -> None:
+		if self._partial_width:
+			print(f"\r{' ' * self._partial_width}\r", end="", flush=True)
+			self._partial_width = 0
 
 	def show_status(self, message: str) -> None:
 		print(f"{Fore.YELLOW}[Status]{Style.RESET_ALL} {message}")
 
+	def show_readiness(self, components: Iterable[Tuple[str, str, Optional[float], Optional[str]]]) -> None:
+		"""One status line of ``(name, state, elapsed_ms, error)`` startup components."""
+
+		colors = {"ready": Fore.GREEN, "starting": Fore.YELLOW, "failed": Fore.RED}
+		parts = []
+		for name, state, elapsed_ms, error in components:
+			if state == "ready" and elapsed_ms is not None:
+				detail = f"{elapsed_ms:.0f}ms"
+			else:
+				detail = f"{state} ({error})" if error else state
+			parts.append(f"{colors.get(state, '')}{name}{Style.RESET_ALL} {detail}")
+		if parts:
+			self.show_status("Ready: " + ", ".join(parts))
+
+	def show_block(self, text: str) -> None:
+		"""Print preformatted multi-line output (tables, reports) indented."""
+
+		for line in text.splitlines():
+			print(f"  {line}")
+
 	def show_error(self, message: str) -> None:
 		print(f"{Fore.RED}[Error]{Style.RESET_ALL} {message}")
 
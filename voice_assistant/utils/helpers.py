@@ -1,13 +1,23 @@
 from __future__ import annotations
 
 import difflib
+import re
 from typing import Iterable, List, Optional
 
 
+_PUNCTUATION_RE = re.compile(r"[^\w\s'-]+|(?<!\w)-|-(?!\w)")
+
+
 def normalize_text(text: str) -> str:
 	return " ".join(text.strip().lower().split())
 
 
+def strip_punctuation(text: str) -> str:
+	"""Lowercase, drop punctuation (apostrophes and inner hyphens are kept) and collapse whitespace."""
+
+	return normalize_text(_PUNCTUATION_RE.sub(" ", text))
+
+
 def suggest_closest(text: str, candidates: Iterable[str], *, n: int = 3) -> List[str]:
 	"""Return up to ``n`` closest matches from ``candidates`` for ``text``."""
 
@@ -1,38 +1,243 @@
 from __future__ import annotations
 
+import atexit
+import contextvars
+import itertools
+import json
 import logging
-from typing import Optional
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 
-_LOGGING_CONFIGURED = False
+CONSOLE_FORMAT = "[%(asctime)s] [%(levelname)s] %(name)s - %(message)s"
 
+# Correlation ID of the turn (or server request) being handled; copied onto
+# every record logged inside it, including from worker threads that run
+# with a copy of the caller's context.
+correlation_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("correlation_id", default=None)
 
-def _configure_root_logger(level: str = "INFO") -> None:
-	global _LOGGING_CONFIGURED
-	if _LOGGING_CONFIGURED:
-		return
+_configure_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_turn_numbers = itertools.count(1)
 
-	numeric_level = getattr(logging, level.upper(), logging.INFO)
-	logging.basicConfig(
-		level=numeric_level,
-		format="[%(asctime)s] [%(levelname)s] %(name)s - %(message)s",
-	)
-	_LOGGING_CONFIGURED = True
+
+@dataclass
+class LoggingConfig:
+	level: str = "INFO"
+	# Optional JSON-lines sink (rotated by size).
+	json_path: Optional[Path] = None
+	json_max_bytes: int = 10 * 1024 * 1024
+	json_backups: int = 3
+	# Identical warnings/errors beyond ``repeat_burst`` per ``repeat_window``
+	# seconds are dropped and later reported as a count.
+	repeat_burst: int = 3
+	repeat_window: float = 60.0
+
+	@classmethod
+	def from_settings(cls, logging_settings: Dict[str, Any]) -> "LoggingConfig":
+		from voice_assistant.config import resolve_path
+
+		json_path = logging_settings.get("json_path")
+		return cls(
+			level=str(logging_settings.get("level", "INFO")),
+			json_path=resolve_path(json_path) if json_path else None,
+			json_max_bytes=int(float(logging_settings.get("json_max_mb", 10)) * 1024 * 1024),
+			json_backups=int(logging_settings.get("json_backups", 3)),
+			repeat_burst=int(logging_settings.get("repeat_burst", 3)),
+			repeat_window=float(logging_settings.get("repeat_window_seconds", 60.0)),
+		)
+
+
+class _CorrelationFilter(logging.Filter):
+	"""Stamp records with the caller's correlation ID before they are queued."""
+
+	def filter(self, record: logging.LogRecord) -> bool:
+		if not hasattr(record, "correlation_id"):
+			record.correlation_id = correlation_id.get()
+		return True
+
+
+class RepeatFilter(logging.Filter):
+	"""Rate-limit identical warnings and errors.
+
+	Records are keyed by logger, level and message *template*, so "Microphone
+	error: %s" with changing arguments still counts as one message. The first
+	``burst`` in each window pass; the rest are dropped, and the next record
+	that passes carries a "suppressed N similar" note.
+	"""
+
+	def __init__(self, burst: int, window: float, clock=time.monotonic) -> None:
+		super().__init__()
+		self.burst = max(1, burst)
+		self.window = window
+		self._clock = clock
+		self._lock = threading.Lock()
+		# key -> [window start, passed in window, suppressed]
+		self._seen: Dict[Tuple[str, int, Any], list] = {}
+
+	def filter(self, record: logging.LogRecord) -> bool:
+		if record.levelno < logging.WARNING or self.window <= 0:
+			return True
+		key = (record.name, record.levelno, record.msg)
+		now = self._clock()
+		with self._lock:
+			state = self._seen.get(key)
+			if state is None or now - state[0] >= self.window:
+				suppressed = state[2] if state is not None else 0
+				self._seen[key] = [now, 1, 0]
+				if len(self._seen) > 1024:
+					self._expire(now)
+			elif state[1] < self.burst:
+				state[1] += 1
+				suppressed = 0
+			else:
+				state[2] += 1
+				return False
+		if suppressed:
+			record.suppressed = suppressed
+		return True
+
+	def _expire(self, now: float) -> None:
+		for key in [k for k, state in self._seen.items() if now - state[0] >= self.window and not state[2]]:
+			del self._seen[key]
+
+
+class _ConsoleFormatter(logging.Formatter):
+	def format(self, record: logging.LogRecord) -> str:
+		text = super().format(record)
+		suppressed = getattr(record, "suppressed", 0)
+		if suppressed:
+			text += f" (suppressed {suppressed} similar messages)"
+		return text
+
+
+class JsonLinesFormatter(logging.Formatter):
+	"""One compact JSON object per record."""
+
+	def format(self, record: logging.LogRecord) -> str:
+		entry: Dict[str, Any] = {
+			"ts": round(record.created, 3),
+			"level": record.levelname,
+			"logger": record.name,
+			"msg": record.getMessage(),
+			"thread": record.threadName,
+		}
+		if getattr(record, "correlation_id", None):
+			entry["turn"] = record.correlation_id
+		if getattr(record, "suppressed", 0):
+			entry["suppressed"] = record.suppressed
+		if record.exc_info:
+			entry["exc"] = self.formatException(record.exc_info)
+		return json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+	"""Enqueue records without formatting them on the caller's thread.
+
+	The listener lives in this process, so the record (with its arguments
+	and ``exc_info``) can be handed over as is; ``QueueHandler.prepare``
+	would otherwise format the message here, on the latency-critical path.
+	"""
+
+	def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+		return record
+
+
+def configure_logging(config: Optional[LoggingConfig] = None) -> None:
+	"""Route all logging through a queue drained by a background listener.
+
+	Only the first call configures handlers; later calls with a ``config``
+	only change the level. Console output goes to stderr; with
+	``json_path`` every record is also written as a JSON line.
+	"""
+
+	global _listener
+	explicit = config is not None
+	config = config or LoggingConfig()
+	level = getattr(logging, config.level.upper(), logging.INFO)
+	root = logging.getLogger()
+	sink_error: Optional[OSError] = None
+	with _configure_lock:
+		if _listener is not None:
+			if explicit and root.level != level:
+				root.setLevel(level)
+			return
+
+		console = logging.StreamHandler(sys.stderr)
+		console.setFormatter(_ConsoleFormatter(CONSOLE_FORMAT))
+		handlers = [console]
+		if config.json_path is not None:
+			try:
+				config.json_path.parent.mkdir(parents=True, exist_ok=True)
+				sink = logging.handlers.RotatingFileHandler(
+					config.json_path,
+					maxBytes=config.json_max_bytes,
+					backupCount=config.json_backups,
+					encoding="utf-8",
+				)
+				sink.setFormatter(JsonLinesFormatter())
+				handlers.append(sink)
+			except OSError as exc:
+				sink_error = exc
+
+		log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+		enqueue = _DeferredQueueHandler(log_queue)
+		enqueue.addFilter(_CorrelationFilter())
+		enqueue.addFilter(RepeatFilter(config.repeat_burst, config.repeat_window))
+
+		for handler in list(root.handlers):
+			root.removeHandler(handler)
+		root.addHandler(enqueue)
+		root.setLevel(level)
+
+		_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+		_listener.start()
+		atexit.register(shutdown_logging)
+	if sink_error is not None:
+		logging.getLogger(__name__).warning("JSON log sink disabled: %s", sink_error)
+
+
+def shutdown_logging() -> None:
+	"""Flush queued records and stop the listener thread."""
+
+	global _listener
+	with _configure_lock:
+		listener, _listener = _listener, None
+	if listener is not None:
+		listener.stop()
+		for handler in listener.handlers:
+			handler.close()
 
 
 def get_logger(name: str, level: Optional[str] = None) -> logging.Logger:
-	"""Return a configured logger instance.
+	"""Return a logger, configuring the logging pipeline on first use.
 
-	If ``level`` is provided, it is applied to the returned logger.
+	``level`` sets the process-wide level.
 	"""
 
-	if level:
-		_configure_root_logger(level)
-	else:
-		_configure_root_logger()
+	configure_logging(LoggingConfig(level=level) if level else None)
+	return logging.getLogger(name)
+
+
+def new_correlation_id(prefix: str = "t") -> str:
+	return f"{prefix}{next(_turn_numbers)}-{uuid.uuid4().hex[:6]}"
+
 
-	logger = logging.getLogger(name)
-	if level:
-		logger.setLevel(getattr(logging, level.upper(), logging.INFO))
-	return logger
+@contextmanager
+def correlation(value: Optional[str] = None) -> Iterator[str]:
+	"""Tag everything logged inside the block with one correlation ID."""
 
+	value = value or new_correlation_id()
+	token = correlation_id.set(value)
+	try:
+		yield value
+	finally:
+		correlation_id.reset(token)
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import sys
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+
+class StartupProfiler:
+	"""Record wall time and newly imported packages per startup phase.
+
+	When disabled every method is a no-op, so the profiler can be threaded
+	through startup code unconditionally.
+	"""
+
+	def __init__(self, enabled: bool = False) -> None:
+		self.enabled = enabled
+		self._started = time.perf_counter()
+		self._excluded = 0.0
+		self._phases: List[Tuple[str, float, List[str]]] = []
+		self._reported = False
+
+	@contextmanager
+	def phase(self, name: str) -> Iterator[None]:
+		if not self.enabled:
+			yield
+			return
+		before = set(sys.modules)
+		started = time.perf_counter()
+		try:
+			yield
+		finally:
+			elapsed = time.perf_counter() - started
+			loaded = {m.split(".")[0] for m in set(sys.modules) - before if not m.startswith("_")}
+			self._phases.append((name, elapsed, sorted(loaded)))
+
+	@contextmanager
+	def waiting(self) -> Iterator[None]:
+		"""Exclude time spent waiting on the user from the startup total."""
+
+		if not self.enabled:
+			yield
+			return
+		started = time.perf_counter()
+		try:
+			yield
+		finally:
+			self._excluded += time.perf_counter() - started
+
+	def report(self) -> None:
+		"""Print the breakdown once, to stderr."""
+
+		if not self.enabled or self._reported:
+			return
+		self._reported = True
+		total = time.perf_counter() - self._started - self._excluded
+		lines = ["Startup profile (excluding time waiting for input):"]
+		for name, elapsed, loaded in self._phases:
+			modules = ""
+			if loaded:
+				shown = ", ".join(loaded[:8])
+				more = f" +{len(loaded) - 8} more" if len(loaded) > 8 else ""
+				modules = f"  [imports: {shown}{more}]"
+			lines.append(f"  {elapsed * 1000:8.1f} ms  {name}{modules}")
+		lines.append(f"  {total * 1000:8.1f} ms  total until ready")
+		print("\n".join(lines), file=sys.stderr)
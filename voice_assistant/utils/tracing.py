@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+# Log-linear buckets in the style of HdrHistogram: values below
+# ``_SUB_BUCKETS`` microseconds are exact, larger ones keep 6 significant
+# bits (< 1.6% relative error) whatever their magnitude.
+_SUB_BUCKET_BITS = 7
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+_HALF = _SUB_BUCKETS >> 1
+
+
+def _bucket_index(micros: int) -> int:
+	if micros < _SUB_BUCKETS:
+		return micros
+	shift = micros.bit_length() - _SUB_BUCKET_BITS
+	return _SUB_BUCKETS + (shift - 1) * _HALF + ((micros >> shift) - _HALF)
+
+
+def _bucket_value(index: int) -> float:
+	"""Midpoint (in microseconds) of the values that map to ``index``."""
+
+	if index < _SUB_BUCKETS:
+		return float(index)
+	shift, offset = divmod(index - _SUB_BUCKETS, _HALF)
+	shift += 1
+	low = (offset + _HALF) << shift
+	return low + ((1 << shift) - 1) / 2.0
+
+
+class Histogram:
+	"""Fixed-precision latency histogram; memory grows with log(range), not samples."""
+
+	def __init__(self) -> None:
+		self._counts: Dict[int, int] = {}
+		self.count = 0
+		self.total_ms = 0.0
+		self.min_ms = float("inf")
+		self.max_ms = 0.0
+
+	def record(self, millis: float) -> None:
+		index = _bucket_index(max(0, int(millis * 1000.0)))
+		self._counts[index] = self._counts.get(index, 0) + 1
+		self.count += 1
+		self.total_ms += millis
+		self.min_ms = min(self.min_ms, millis)
+		self.max_ms = max(self.max_ms, millis)
+
+	@property
+	def mean_ms(self) -> float:
+		return self.total_ms / self.count if self.count else 0.0
+
+	def percentile(self, q: float) -> float:
+		if not self.count:
+			return 0.0
+		rank = max(1, int(q * self.count + 0.5))
+		seen = 0
+		for index in sorted(self._counts):
+			seen += self._counts[index]
+			if seen >= rank:
+				return min(self.max_ms, _bucket_value(index) / 1000.0)
+		return self.max_ms
+
+	def copy(self) -> "Histogram":
+		clone = Histogram()
+		clone._counts = dict(self._counts)
+		clone.count, clone.total_ms, clone.min_ms, clone.max_ms = self.count, self.total_ms, self.min_ms, self.max_ms
+		return clone
+
+	def to_dict(self) -> Dict[str, float]:
+		return {
+			"count": self.count,
+			"mean_ms": round(self.mean_ms, 3),
+			"min_ms": round(self.min_ms if self.count else 0.0, 3),
+			"p50_ms": round(self.percentile(0.50), 3),
+			"p95_ms": round(self.percentile(0.95), 3),
+			"p99_ms": round(self.percentile(0.99), 3),
+			"max_ms": round(self.max_ms, 3),
+		}
+
+
+@dataclass
+class Turn:
+	"""Spans recorded on one thread between ``Tracer.turn`` enter and exit."""
+
+	started: float
+	spans: List[Tuple[str, float]] = field(default_factory=list)
+	response_started: Optional[float] = None
+	discarded: bool = False
+
+	def discard(self) -> None:
+		"""Do not record this turn (e.g. nothing was said)."""
+
+		self.discarded = True
+
+	def breakdown(self) -> Dict[str, float]:
+		totals: Dict[str, float] = {}
+		for name, millis in self.spans:
+			totals[name] = totals.get(name, 0.0) + millis
+		return totals
+
+
+class _NullSpan:
+	__slots__ = ()
+
+	def __enter__(self) -> "_NullSpan":
+		return self
+
+	def __exit__(self, *exc_info) -> None:
+		return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+	__slots__ = ("_tracer", "_name", "_wait", "_started")
+
+	def __init__(self, tracer: "Tracer", name: str, wait: bool) -> None:
+		self._tracer = tracer
+		self._name = name
+		self._wait = wait
+
+	def __enter__(self) -> "_Span":
+		self._started = time.perf_counter()
+		return self
+
+	def __exit__(self, *exc_info) -> None:
+		ended = time.perf_counter()
+		self._tracer._finish(self._name, (ended - self._started) * 1000.0, ended if self._wait else None)
+
+
+class Tracer:
+	"""Named latency spans aggregated into per-name histograms.
+
+	``span`` returns a shared no-op context manager while disabled, so
+	instrumented code costs one attribute check per span. Spans recorded
+	on a thread inside ``turn()`` are also attached to that turn; the
+	``turn`` histogram measures from the end of the last ``wait`` span
+	(time the user spent talking) to the end of the turn.
+	"""
+
+	def __init__(self, enabled: bool = False) -> None:
+		self.enabled = enabled
+		self._lock = threading.Lock()
+		self._histograms: Dict[str, Histogram] = {}
+		self._local = threading.local()
+		self.last_turn: Optional[Turn] = None
+
+	def span(self, name: str, *, wait: bool = False):
+		if not self.enabled:
+			return _NULL_SPAN
+		return _Span(self, name, wait)
+
+	def record(self, name: str, millis: float) -> None:
+		if self.enabled:
+			self._finish(name, millis, None)
+
+	@contextmanager
+	def turn(self) -> Iterator[Turn]:
+		turn = Turn(started=time.perf_counter())
+		if not self.enabled:
+			yield turn
+			return
+		self._local.turn = turn
+		try:
+			yield turn
+		finally:
+			self._local.turn = None
+			if not turn.discarded:
+				ended = time.perf_counter()
+				self._add("turn", (ended - (turn.response_started or turn.started)) * 1000.0)
+				self.last_turn = turn
+
+	def reset(self) -> None:
+		with self._lock:
+			self._histograms.clear()
+		self.last_turn = None
+
+	def histograms(self) -> Dict[str, Histogram]:
+		with self._lock:
+			return {name: hist.copy() for name, hist in self._histograms.items()}
+
+	def summary_table(self) -> str:
+		histograms = self.histograms()
+		if not histograms:
+			return "No spans recorded yet."
+		width = max(len(name) for name in histograms)
+		lines = [f"{'span':<{width}}  {'n':>5}  {'p50':>8}  {'p95':>8}  {'p99':>8}  {'max':>8}  (ms)"]
+		for name in sorted(histograms):
+			hist = histograms[name]
+			lines.append(
+				f"{name:<{width}}  {hist.count:>5}  {hist.percentile(0.5):>8.2f}  "
+				f"{hist.percentile(0.95):>8.2f}  {hist.percentile(0.99):>8.2f}  {hist.max_ms:>8.2f}"
+			)
+		return "\n".join(lines)
+
+	def export(self, path: Path) -> None:
+		"""Write the current histograms as JSON to ``path``."""
+
+		payload = {
+			"generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+			"spans": {name: hist.to_dict() for name, hist in sorted(self.histograms().items())},
+		}
+		path.parent.mkdir(parents=True, exist_ok=True)
+		path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+	def _finish(self, name: str, millis: float, wait_ended: Optional[float]) -> None:
+		self._add(name, millis)
+		turn: Optional[Turn] = getattr(self._local, "turn", None)
+		if turn is not None:
+			turn.spans.append((name, millis))
+			if wait_ended is not None:
+				turn.response_started = wait_ended
+
+	def _add(self, name: str, millis: float) -> None:
+		with self._lock:
+			hist = self._histograms.get(name)
+			if hist is None:
+				hist = self._histograms[name] = Histogram()
+			hist.record(millis)
+
+
+_TRACER = Tracer()
+
+
+def get_tracer() -> Tracer:
+	"""Return the process-wide tracer (disabled until ``enabled`` is set)."""
+
+	return _TRACER